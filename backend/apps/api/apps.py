@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.api"
+
+    def ready(self):
+        from apps.api.climate import receivers  # noqa: F401
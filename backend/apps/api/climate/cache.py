@@ -0,0 +1,257 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from apps.api.climate.compression import (
+    ENCODINGS,
+    EncodedPayload,
+    compress,
+    encode,
+    should_compress,
+)
+from apps.climate_data.models import ClimateData, DatasetVersion, IndicatorGroup
+from utils.cache import TieredCache
+
+# 公開中バージョンのスタンプ（グループ名 → DatasetStamp）
+stamp_cache = TieredCache("climate-stamp", timeout=settings.CLIMATE_RESPONSE_STAMP_TTL)
+
+# エンコード済みのレスポンス本文。キーにバージョン ID を含み内容が変わらないため、
+# L1 にも猶予期間の間保持する（本文が大きいため件数は少なめ）
+payload_cache = TieredCache(
+    "climate-response",
+    timeout=settings.CLIMATE_VERSION_GRACE_PERIOD.total_seconds(),
+    l1_timeout=settings.CLIMATE_VERSION_GRACE_PERIOD.total_seconds(),
+    l1_max_entries=16,
+)
+
+# 指標ごとの時系列（series API）。キーに指標・バージョン・絞り込み条件を含み
+# 内容が変わらないため、L1 にも猶予期間の間保持する
+series_cache = TieredCache(
+    "climate-series",
+    timeout=settings.CLIMATE_VERSION_GRACE_PERIOD.total_seconds(),
+    l1_timeout=settings.CLIMATE_VERSION_GRACE_PERIOD.total_seconds(),
+    l1_max_entries=128,
+)
+
+
+def filters_key(filters: dict) -> str:
+    """
+    絞り込み条件のハッシュ。
+
+    キャッシュキー（filter() の条件）と ETag（ClimateDataFilterSerializer.fingerprint()）の
+    両方がこの関数を使う
+    """
+    canonical = json.dumps(filters, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class DatasetStamp(NamedTuple):
+    """
+    指標グループのデータの状態を表す軽量な識別子（キャッシュキー / ETag 用）
+    """
+
+    # 公開中バージョンの ID（None はバージョンなしのデータ）
+    version_id: int | None
+    # 公開日時（バージョンなしのデータは updated_at の最大値）
+    last_modified: datetime | None
+    # バージョンなしのデータの件数（削除の検知用）
+    count: int = 0
+
+    def etag(self, name: str) -> str:
+        """
+        name（エンドポイント名など）ごとの強い ETag を返す
+        """
+        if self.version_id is not None:
+            return f'"{name}-v{self.version_id}"'
+
+        timestamp = self.last_modified.timestamp() if self.last_modified else 0
+        return f'"{name}-u{self.count}-{timestamp}"'
+
+
+def _load_stamp(group_name: str) -> DatasetStamp | None:
+    """
+    グループの公開中バージョンを DB から読む（グループが存在しなければ None）。
+
+    バージョンなしのデータしかない場合は DatasetStamp(None, None) を返す。
+    """
+    row = (
+        IndicatorGroup.objects.filter(name=group_name)
+        .values_list("active_version_id", "active_version__published_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return DatasetStamp(*row)
+
+
+def get_dataset_stamp(group_name: str) -> DatasetStamp | None:
+    """
+    グループの DatasetStamp を返す（グループが存在しなければ None）。
+
+    公開中バージョンはキャッシュし、ヒットすれば DB にアクセスしない。
+    期限切れ直後は古いスタンプを返しながら裏で読み直す（公開時には即座に更新される）。
+    バージョンなしのデータしかない場合は、件数と updated_at の最大値を 1 クエリで集計する。
+    """
+    stamp = stamp_cache.get_or_set(group_name, lambda: _load_stamp(group_name))
+    if stamp is None or stamp.version_id is not None:
+        return stamp
+
+    aggregate = ClimateData.objects.filter(
+        indicator__group__name=group_name, version__isnull=True
+    ).aggregate(last_modified=Max("updated_at"), count=Count("id"))
+    return DatasetStamp(None, aggregate["last_modified"], aggregate["count"])
+
+
+def publish_dataset_stamp(version: DatasetVersion) -> None:
+    """
+    公開されたバージョンのスタンプをキャッシュに書き込む
+    """
+    stamp_cache.set(version.group.name, DatasetStamp(version.pk, version.published_at))
+
+
+def conditional_get(
+    request: HttpRequest,
+    name: str,
+    group_name: str,
+    respond: Callable[[DatasetStamp | None], HttpResponse],
+) -> HttpResponse:
+    """
+    DatasetStamp から ETag / Last-Modified を付け、条件付き GET を処理する。
+
+    If-None-Match / If-Modified-Since が一致すれば、respond を呼ばずに 304 を返す。
+    respond は DatasetStamp を受け取り、本文のレスポンスを返す関数。
+    """
+    stamp = get_dataset_stamp(group_name)
+    if stamp is None:
+        # グループがない場合の 404 などは respond に任せる
+        return respond(None)
+
+    etag = stamp.etag(name)
+    last_modified = (
+        int(stamp.last_modified.timestamp()) if stamp.last_modified else None
+    )
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = respond(stamp)
+
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # 認証が必要な API なので共有キャッシュには保存させず、毎回再検証させる
+        patch_cache_control(response, private=True, no_cache=True)
+
+    # Accept ヘッダーで形式（JSON / MessagePack / Arrow）が、
+    # Accept-Encoding ヘッダーで圧縮方式（br / gzip）が変わる
+    patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+
+    return response
+
+
+class VersionedResponseCache:
+    """
+    公開中の DatasetVersion ごとにエンコード済みのレスポンス本文を保持するキャッシュ。
+
+    - 本文のキーにバージョン ID を含めるため、公開のたびに自動的に別のキーになる
+    - 本文と一緒に圧縮済み（br / gzip）の本文も保存し、バージョンごとに 1 回だけ圧縮する
+    - 公開中バージョンがない（バージョンなしのデータしかない）場合はキャッシュしない
+    - dataset_published シグナルの受信時に publish() で作り直す（receivers.py）
+    """
+
+    # 作成されたキャッシュの一覧（シグナル受信時に対象グループのものを作り直す）
+    registry: list["VersionedResponseCache"] = []
+
+    def __init__(self, name: str, group_name: str, build: Callable[..., bytes]):
+        self.name = name
+        self.group_name = group_name
+        # build(バージョン ID, filters=None) → エンコード済みの本文
+        # バージョン ID が None のときはバージョンなしのデータ。
+        # filters は ClimateData の QuerySet.filter() に渡す絞り込み条件
+        self.build = build
+        self.registry.append(self)
+
+    def payload_key(self, version_id: int, encoding: str | None = None) -> str:
+        key = f"{self.name}:v{version_id}"
+        return f"{key}:{encoding}" if encoding else key
+
+    def _payload(self, version_id: int) -> bytes:
+        """
+        本文（無圧縮）。同時に要求されても作成は 1 回だけ
+        """
+        return payload_cache.get_or_set(
+            self.payload_key(version_id), lambda: self.build(version_id)
+        )
+
+    def _compressed(self, version_id: int, encoding: str) -> bytes | None:
+        """
+        圧縮済みの本文（小さい本文は圧縮しないため None）。圧縮はバージョンごとに 1 回だけ
+        """
+
+        def compute() -> bytes | None:
+            payload = self._payload(version_id)
+            return compress(payload, encoding) if should_compress(payload) else None
+
+        return payload_cache.get_or_set(self.payload_key(version_id, encoding), compute)
+
+    def get(
+        self,
+        stamp: DatasetStamp | None = None,
+        filters: dict | None = None,
+        encoding: str | None = None,
+    ) -> EncodedPayload:
+        """
+        公開中バージョンの本文を encoding（choose_encoding() の結果）で返す。
+        キャッシュになければ作成・圧縮して保存する。
+
+        - stamp を省略した場合は get_dataset_stamp() で取得する
+        - filters を指定した場合は絞り込んだ本文を都度作成・圧縮する（キャッシュしない）
+        - 小さい本文は圧縮せずに返す
+        - 同時に同じ本文を要求された場合（コールドスタート直後など）、
+          作成するのは 1 つのリクエストだけで、他はその結果を待つ
+        """
+        if stamp is None:
+            stamp = get_dataset_stamp(self.group_name)
+
+        version_id = stamp.version_id if stamp is not None else None
+        if filters:
+            return encode(self.build(version_id, filters), encoding)
+        if version_id is None:
+            return encode(self.build(None), encoding)
+
+        if encoding is not None:
+            compressed = self._compressed(version_id, encoding)
+            if compressed is not None:
+                return EncodedPayload(compressed, encoding)
+
+        return EncodedPayload(self._payload(version_id))
+
+    def publish(self, version_id: int) -> None:
+        """
+        公開されたバージョンの本文と圧縮済みの本文を作り直す
+        """
+        try:
+            payload = self.build(version_id)
+        except Http404:
+            # 指標がまだ揃っていないなど。リクエスト時に改めて判定する
+            return
+
+        entries = {self.payload_key(version_id): payload}
+        for encoding in ENCODINGS:
+            entries[self.payload_key(version_id, encoding)] = (
+                compress(payload, encoding) if should_compress(payload) else None
+            )
+
+        # 公開終了したバージョンのキーは参照されなくなり、期限切れで消える
+        payload_cache.set_many(entries)
@@ -0,0 +1,103 @@
+import gzip
+from typing import NamedTuple
+
+from django.http import HttpRequest, HttpResponse
+
+try:
+    import brotli
+except ModuleNotFoundError:
+    # brotli が無い環境では gzip のみ
+    brotli = None
+
+# これより小さい本文は圧縮しない（GZipMiddleware と同じ基準）
+MIN_COMPRESS_SIZE = 200
+
+# 対応する Content-Encoding（q 値が同じなら先頭を優先する）
+ENCODINGS: list[str] = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+# 圧縮レベル（キャッシュする本文は 1 回だけ圧縮するため最大、都度圧縮する本文は速度優先）
+BEST_LEVELS = {"br": 11, "gzip": 9}
+FAST_LEVELS = {"br": 5, "gzip": 6}
+
+
+class EncodedPayload(NamedTuple):
+    """
+    エンコード済みの本文と、その Content-Encoding（None は無圧縮）
+    """
+
+    body: bytes
+    encoding: str | None = None
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    """
+    Accept-Encoding ヘッダーを エンコーディング → q 値 の辞書にする
+    """
+    accepted: dict[str, float] = {}
+
+    for item in header.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.lower()] = q
+
+    return accepted
+
+
+def choose_encoding(request: HttpRequest) -> str | None:
+    """
+    Accept-Encoding から使う Content-Encoding を選ぶ（どれも受け付けなければ None）
+    """
+    accepted = _accepted_encodings(request.headers.get("Accept-Encoding", ""))
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+
+    return best
+
+
+def should_compress(body: bytes) -> bool:
+    return len(body) >= MIN_COMPRESS_SIZE
+
+
+def compress(body: bytes, encoding: str, *, best: bool = True) -> bytes:
+    """
+    body を encoding（"br" / "gzip"）で圧縮する
+    """
+    level = (BEST_LEVELS if best else FAST_LEVELS)[encoding]
+
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime を固定し、同じ本文からは常に同じ bytes を作る
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def encode(body: bytes, encoding: str | None) -> EncodedPayload:
+    """
+    キャッシュしない本文をその場で（速度優先で）圧縮する
+    """
+    if encoding is None or not should_compress(body):
+        return EncodedPayload(body)
+    return EncodedPayload(compress(body, encoding, best=False), encoding)
+
+
+def encoded_response(payload: EncodedPayload, content_type: str) -> HttpResponse:
+    """
+    EncodedPayload から Content-Encoding 付きのレスポンスを作る
+    """
+    response = HttpResponse(payload.body, content_type=content_type)
+    if payload.encoding is not None:
+        response["Content-Encoding"] = payload.encoding
+    return response
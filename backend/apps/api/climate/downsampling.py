@@ -0,0 +1,103 @@
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+# 間引きの方式
+# - lttb: Largest-Triangle-Three-Buckets（折れ線の形を保つ代表点を選ぶ）
+# - minmax: バケットごとの最小値・最大値（ピークを落とさない）
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+# LTTB は最初・最後の点と 1 つ以上のバケットが必要
+MIN_POINTS = 3
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets で残す点の位置を昇順で返す。
+
+    最初と最後の点は常に残し、残りを max_points - 2 個のバケットに分けて、
+    直前に選んだ点・次のバケットの平均とで作る三角形の面積が最大の点を選ぶ。
+    面積の計算はバケット単位でまとめて行う。
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    # バケットの境界（最初と最後の点は除く）
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+
+        # 次のバケットの平均（最後のバケットの次は最後の点）
+        next_start, next_stop = (
+            (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        )
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[anchor] - next_x) * (y[start:stop] - y[anchor])
+            - (x[anchor] - x[start:stop]) * (next_y - y[anchor])
+        )
+        anchor = start + int(area.argmax())
+        selected[i + 1] = anchor
+
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    max_points // 2 個のバケットに分け、各バケットの最小値・最大値の点の位置を昇順で返す
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    n_buckets = max(max_points // 2, 1)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+    buckets = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+    # バケット内を値の昇順 / 降順に並べたときの先頭が最小 / 最大の点
+    lowest = np.lexsort((y, buckets))[edges[:-1]]
+    highest = np.lexsort((-y, buckets))[edges[:-1]]
+
+    return np.unique(np.concatenate([lowest, highest]))
+
+
+class Downsampling(NamedTuple):
+    """
+    時系列の間引き方（max_points 点以下にする）
+    """
+
+    max_points: int
+    method: str = "lttb"
+
+    @property
+    def key(self) -> str:
+        """
+        キャッシュキー / ETag 用の識別子（例: lttb500）
+        """
+        return f"{self.method}{self.max_points}"
+
+    def indices(self, x: Sequence[float], y: Sequence[float | None]) -> np.ndarray:
+        """
+        残す点の位置を昇順で返す（max_points 点以下ならすべて）。
+
+        y が欠損（None / NaN）の点は代表点に選ばない。
+        """
+        y = np.array(y, dtype=np.float64)
+        if len(y) <= self.max_points:
+            return np.arange(len(y))
+
+        finite = np.flatnonzero(np.isfinite(y))
+        if len(finite) <= self.max_points:
+            return finite
+
+        select = lttb_indices if self.method == "lttb" else minmax_indices
+        x = np.asarray(x, dtype=np.float64)
+        return finite[select(x[finite], y[finite], self.max_points)]
@@ -0,0 +1,20 @@
+from django.dispatch import receiver
+
+from apps.api.climate.cache import VersionedResponseCache, publish_dataset_stamp
+
+# レスポンスキャッシュを registry に登録するため
+from apps.api.climate.views import co2  # noqa: F401
+from apps.climate_data.signals import dataset_published
+
+
+@receiver(dataset_published)
+def rebuild_response_caches(sender, version, **kwargs):
+    """
+    データセットの公開時に、スタンプを切り替えて対象グループのレスポンスキャッシュを作り直す
+    """
+    publish_dataset_stamp(version)
+    group_name = version.group.name
+
+    for response_cache in VersionedResponseCache.registry:
+        if response_cache.group_name == group_name:
+            response_cache.publish(version.pk)
@@ -0,0 +1,126 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import msgpack
+except ModuleNotFoundError:
+    # msgpack が無い環境では MessagePack 形式を提供しない
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ModuleNotFoundError:
+    # pyarrow が無い環境では Arrow 形式を提供しない
+    pa = None
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    ?format=columnar 用のレンダラー。
+
+    本文の形（years / regions / values の行列）はビュー側で作るため、
+    JSON としてのエンコードは JSONRenderer と同じ。
+    """
+
+    format = "columnar"
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack 用のレンダラー（Accept: application/msgpack または ?format=msgpack）。
+
+    本文の形は JSON と同じ。
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(data, use_bin_type=True)
+
+
+def to_arrow_table(data: dict) -> "pa.Table":
+    """
+    列名 → 値のリスト の辞書を Arrow のテーブルに変換する。
+
+    - year 列は int16
+    - region 列と文字列の列は辞書エンコード
+    - それ以外の列は float64（None は null）
+
+    エラー応答（値がリストでない本文）は error_table() で変換する。
+    """
+    columns = {}
+    for name, values in data.items():
+        if name == "year":
+            columns[name] = pa.array(values, type=pa.int16())
+        elif name == "region" or any(isinstance(value, str) for value in values):
+            columns[name] = pa.array(values, type=pa.string()).dictionary_encode()
+        else:
+            columns[name] = pa.array(values, type=pa.float64())
+
+    return pa.table(columns)
+
+
+def error_table(data: dict) -> "pa.Table":
+    """
+    エラー応答（{"detail": "..."} / {"year": ["..."]}）を 1 行の文字列のテーブルに変換する。
+
+    列の型は決めず、文字列以外の値は JSON の文字列にする。
+    """
+    columns = {}
+    for name, value in data.items():
+        text = (
+            value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+        )
+        columns[name] = pa.array([text], type=pa.string())
+    return pa.table(columns)
+
+
+class ArrowIPCRenderer(BaseRenderer):
+    """
+    Apache Arrow IPC（ストリーム形式）用のレンダラー
+    （Accept: application/vnd.apache.arrow.stream または ?format=arrow）。
+
+    本文は列ごとのリスト（year / region / 値の列）をビュー側で作り、
+    to_arrow_table() で変換して 1 つのレコードバッチとして書き出す。
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+
+        # 型付きのスキーマは成功した応答にだけ使う
+        # （値がリストでない本文もエラー応答として扱う）
+        response = (renderer_context or {}).get("response")
+        failed = response is not None and response.status_code >= 400
+        if failed or not all(
+            isinstance(values, (list, tuple)) for values in data.values()
+        ):
+            table = error_table(data)
+        else:
+            table = to_arrow_table(data)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+# インストールされているライブラリに応じて使えるバイナリ形式のレンダラー
+BINARY_RENDERER_CLASSES: list[type[BaseRenderer]] = [
+    renderer_class
+    for renderer_class, available in (
+        (MessagePackRenderer, msgpack is not None),
+        (ArrowIPCRenderer, pa is not None),
+    )
+    if available
+]
@@ -21,3 +21,25 @@ class CO2DataByYearSerializer(serializers.Serializer):
             "年ごとの国別CO2排出量。例: " "{ '2000': {'JPN': 1000.0, 'USA': 5000.0} }"
         ),
     )
+
+
+class CO2ColumnarSerializer(serializers.Serializer):
+    """
+    ?format=columnar 用の列指向の CO2 排出量。
+
+    構造例:
+    {
+        "years": [2000, 2001],
+        "regions": ["JPN", "USA"],
+        "values": [[1000.0, 5000.0], [1100.0, null]]
+    }
+    - values[i][j] は years[i] 年の regions[j] の値（データがなければ null）
+    - 地域コードを年ごとに繰り返さないため、co2_data 形式より小さい
+    """
+
+    years = serializers.ListField(child=serializers.IntegerField())
+    regions = serializers.ListField(child=serializers.CharField())
+    values = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField(allow_null=True)),
+        help_text="years × regions の行列。値がない箇所は null",
+    )
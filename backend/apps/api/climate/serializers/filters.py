@@ -0,0 +1,148 @@
+from rest_framework import serializers
+
+from apps.api.climate.cache import filters_key
+from apps.api.climate.downsampling import (
+    DOWNSAMPLE_METHODS,
+    MIN_POINTS,
+    Downsampling,
+)
+
+
+class ClimateDataFilterSerializer(serializers.Serializer):
+    """
+    気候データ API の絞り込み条件（クエリパラメータ）。
+
+    例: ?year_from=2000&year_to=2020&regions=JPN,USA,OWID_WRL
+    - year は year_from = year_to = year と同じ
+    - regions はカンマ区切りの地域コード
+    """
+
+    # 1 リクエストで指定できる地域コードの上限
+    MAX_REGIONS = 300
+
+    year = serializers.IntegerField(
+        required=False,
+        min_value=-10000,
+        max_value=10000,
+        help_text="この年のデータだけを返す（year_from / year_to とは併用不可）",
+    )
+    year_from = serializers.IntegerField(
+        required=False,
+        min_value=-10000,
+        max_value=10000,
+        help_text="この年以降のデータを返す",
+    )
+    year_to = serializers.IntegerField(
+        required=False,
+        min_value=-10000,
+        max_value=10000,
+        help_text="この年以前のデータを返す",
+    )
+    regions = serializers.CharField(
+        required=False,
+        help_text="カンマ区切りの地域コード（例: JPN,USA,OWID_WRL）",
+    )
+
+    def validate_regions(self, value: str) -> list[str]:
+        codes = sorted({code.strip() for code in value.split(",") if code.strip()})
+        if not codes:
+            raise serializers.ValidationError("Specify at least one region code.")
+        if len(codes) > self.MAX_REGIONS:
+            raise serializers.ValidationError(
+                f"Specify at most {self.MAX_REGIONS} region codes."
+            )
+        return codes
+
+    def validate(self, attrs):
+        if "year" in attrs:
+            if "year_from" in attrs or "year_to" in attrs:
+                raise serializers.ValidationError(
+                    "year cannot be combined with year_from or year_to."
+                )
+            attrs["year_from"] = attrs["year_to"] = attrs.pop("year")
+
+        year_from = attrs.get("year_from")
+        year_to = attrs.get("year_to")
+        if year_from is not None and year_to is not None and year_from > year_to:
+            raise serializers.ValidationError("year_from must not exceed year_to.")
+
+        return attrs
+
+    def filter_kwargs(self) -> dict:
+        """
+        ClimateData の QuerySet.filter() に渡す条件を返す
+        """
+        return self.kwargs_from(self.validated_data)
+
+    @staticmethod
+    def kwargs_from(data: dict) -> dict:
+        """
+        検証済みの条件（ネストした Serializer の要素など）から filter() の条件を作る
+        """
+        kwargs = {}
+
+        if "year_from" in data:
+            kwargs["year__gte"] = data["year_from"]
+        if "year_to" in data:
+            kwargs["year__lte"] = data["year_to"]
+        if "regions" in data:
+            kwargs["region__code__in"] = data["regions"]
+
+        return kwargs
+
+    def fingerprint(self) -> str:
+        """
+        正規化した条件のハッシュ（ETag をエンドポイント + 条件ごとに分けるため）
+        """
+        return filters_key(self.validated_data)
+
+
+class StreamSerializer(serializers.Serializer):
+    """
+    レスポンスの返し方（クエリパラメータ）。絞り込み条件ではない。
+
+    例: ?stream=true
+    """
+
+    stream = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="true の場合、年順に読み出しながら JSON をストリーミングで返す",
+    )
+
+
+class DownsampleSerializer(serializers.Serializer):
+    """
+    時系列の間引きの条件（クエリパラメータ）。
+
+    例: ?max_points=500&downsample=minmax
+    - max_points を超える地域（系列）は、サーバー側で max_points 点以下に間引く
+    - downsample は間引きの方式（既定は lttb）
+    """
+
+    max_points = serializers.IntegerField(
+        required=False,
+        min_value=MIN_POINTS,
+        max_value=100000,
+        help_text="地域（系列）ごとの点数の上限。超える場合は間引いて返す",
+    )
+    downsample = serializers.ChoiceField(
+        choices=DOWNSAMPLE_METHODS,
+        required=False,
+        help_text=(
+            "間引きの方式。lttb は折れ線の形を保つ代表点、"
+            "minmax は区間ごとの最小値・最大値（既定: lttb）"
+        ),
+    )
+
+    def downsampling(self) -> Downsampling | None:
+        return self.downsampling_from(self.validated_data)
+
+    @staticmethod
+    def downsampling_from(data: dict) -> Downsampling | None:
+        """
+        検証済みの条件から間引き方を返す（max_points がなければ None）
+        """
+        if data.get("max_points") is None:
+            return None
+        return Downsampling(data["max_points"], data.get("downsample", "lttb"))
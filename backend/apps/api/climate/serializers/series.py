@@ -0,0 +1,136 @@
+from rest_framework import serializers
+
+from apps.api.climate.serializers.filters import (
+    ClimateDataFilterSerializer,
+    DownsampleSerializer,
+)
+
+
+class SeriesQuerySerializer(DownsampleSerializer, ClimateDataFilterSerializer):
+    """
+    汎用の時系列 API の条件（クエリパラメータ）。
+
+    例: ?indicator=emissions_total,12&regions=JPN,USA&from=2000&to=2020
+    - indicator はカンマ区切りの Indicator.id または Indicator.key（同じ指標グループのもの）
+    - from / to は year_from / year_to と同じ（year も指定できる）
+    - max_points / downsample で地域ごとの系列を間引ける
+    """
+
+    # 1 リクエストで指定できる指標の上限
+    MAX_INDICATORS = 20
+
+    indicator = serializers.CharField(
+        help_text="カンマ区切りの Indicator.id または key（例: emissions_total）",
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # from / to は Python の予約語のためクラス属性にできない。
+        # year_from / year_to を別名で受け付ける
+        for name, source in (("from", "year_from"), ("to", "year_to")):
+            field = fields.pop(source)
+            field.source = source
+            fields[name] = field
+        fields["year"].help_text = "この年のデータだけを返す（from / to とは併用不可）"
+
+        return fields
+
+    def validate_indicator(self, value: str) -> list[str]:
+        # 指定順を保ったまま重複を除く
+        refs = list(
+            dict.fromkeys(ref.strip() for ref in value.split(",") if ref.strip())
+        )
+        if not refs:
+            raise serializers.ValidationError("Specify at least one indicator.")
+        if len(refs) > self.MAX_INDICATORS:
+            raise serializers.ValidationError(
+                f"Specify at most {self.MAX_INDICATORS} indicators."
+            )
+        return refs
+
+
+class SeriesIndicatorSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    key = serializers.CharField(allow_null=True)
+    name = serializers.CharField()
+    unit = serializers.CharField()
+
+
+class SeriesItemSerializer(serializers.Serializer):
+    """
+    1 指標・1 地域分の時系列。years[i] 年の値が values[i]
+    """
+
+    indicator = serializers.IntegerField(help_text="Indicator.id")
+    region = serializers.CharField(help_text="地域コード")
+    region_name = serializers.CharField()
+    years = serializers.ListField(child=serializers.IntegerField())
+    values = serializers.ListField(child=serializers.FloatField())
+
+
+class SeriesSerializer(serializers.Serializer):
+    """
+    汎用の時系列 API のレスポンス。
+
+    構造例:
+    {
+        "indicators": [{"id": 3, "key": "emissions_total", "name": "...", "unit": "tonnes"}],
+        "series": [
+            {"indicator": 3, "region": "JPN", "region_name": "Japan",
+             "years": [2000, 2001], "values": [1000.0, 1100.0]}
+        ]
+    }
+    - series は指定した指標の順、同じ指標の中では地域コード順
+    """
+
+    indicators = SeriesIndicatorSerializer(many=True)
+    series = SeriesItemSerializer(many=True)
+
+
+class BatchSpecSerializer(SeriesQuerySerializer):
+    """
+    バッチ API の 1 件分の条件（series API のクエリパラメータと同じ）。
+
+    例: {"id": "world", "indicator": "emissions_total", "regions": ["OWID_WRL"], "from": 2000}
+    - id は結果のキー（リクエスト内で一意）
+    - regions は地域コードのリスト（カンマ区切りの文字列も可）
+    """
+
+    id = serializers.CharField(
+        max_length=100, help_text="結果のキー（リクエスト内で一意）"
+    )
+
+    def to_internal_value(self, data):
+        # regions はリストでも受け付ける（カンマ区切りの文字列にそろえる）
+        regions = data.get("regions") if isinstance(data, dict) else None
+        if isinstance(regions, list):
+            data = {**data, "regions": ",".join(str(code) for code in regions)}
+        return super().to_internal_value(data)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    # 1 リクエストで指定できる条件の上限
+    MAX_REQUESTS = 50
+
+    requests = BatchSpecSerializer(
+        many=True, allow_empty=False, max_length=MAX_REQUESTS
+    )
+
+    def validate_requests(self, value: list[dict]) -> list[dict]:
+        ids = [spec["id"] for spec in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Request ids must be unique.")
+        return value
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    """
+    バッチ API のレスポンス。
+
+    - results: id → series API と同じ形の結果
+    - errors: id → エラーの内容（存在しない指標など）
+    """
+
+    results = serializers.DictField(child=SeriesSerializer())
+    errors = serializers.DictField(child=serializers.CharField())
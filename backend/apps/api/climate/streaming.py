@@ -0,0 +1,93 @@
+import json
+from typing import Iterable, Iterator
+
+# サーバーサイドカーソルで 1 回に取得する行数
+STREAM_CHUNK_SIZE = 2000
+
+# この文字数ごとにまとめてレスポンスに書き出す
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def _dumps(value) -> str:
+    # JSONRenderer と同じ形式（空白なし / 非 ASCII をエスケープしない）
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_json_chunks(parts: Iterable[str]) -> Iterator[bytes]:
+    """
+    JSON の断片をある程度の大きさにまとめて bytes で返す
+    """
+    buffer: list[str] = []
+    size = 0
+
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= STREAM_BUFFER_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def co2_data_parts(rows: Iterable[tuple[int, str, float]]) -> Iterator[str]:
+    """
+    (year, 地域コード, value) を year 順に受け取り、
+    {"co2_data": {"<year>": {"<code>": value, ...}, ...}} の断片を返す
+    """
+    yield '{"co2_data":{'
+
+    current_year = None
+    for year, code, value in rows:
+        if year != current_year:
+            if current_year is not None:
+                yield "},"
+            yield f"{_dumps(str(year))}:{{"
+            current_year = year
+        else:
+            yield ","
+        yield f"{_dumps(code)}:{_dumps(value)}"
+
+    if current_year is not None:
+        yield "}"
+    yield "}}"
+
+
+def temperature_parts(
+    rows: Iterable[tuple[str, int, str, float]], field_map: dict[str, str]
+) -> Iterator[str]:
+    """
+    (地域名, year, Indicator.name, value) を地域名・year 順に受け取り、
+    {"<地域名>": [{"year": ..., "upper": ..., ...}, ...], ...} の断片を返す。
+
+    field_map は Indicator.name → レスポンスのフィールド名。
+    """
+    yield "{"
+
+    current_region = None
+    current_year = None
+    year_data: dict = {}
+
+    for region, year, indicator_name, value in rows:
+        if region != current_region or year != current_year:
+            if current_year is not None:
+                yield _dumps(year_data)
+
+            if region != current_region:
+                if current_region is not None:
+                    yield "],"
+                yield f"{_dumps(region)}:["
+                current_region = region
+            else:
+                yield ","
+
+            current_year = year
+            year_data = {"year": year}
+
+        year_data[field_map[indicator_name]] = value
+
+    if current_year is not None:
+        yield _dumps(year_data)
+        yield "]"
+    yield "}"
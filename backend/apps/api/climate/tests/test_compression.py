@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+from django.test import RequestFactory
+
+from apps.api.climate import compression
+from apps.api.climate.compression import choose_encoding, compress, encode
+
+
+def _choose(accept_encoding):
+    return choose_encoding(
+        RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    )
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("*;q=0", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert _choose(accept_encoding) == expected
+
+
+def test_choose_encoding_prefers_brotli():
+    pytest.importorskip("brotli")
+
+    assert _choose("gzip, deflate, br") == "br"
+    assert _choose("*") == "br"
+
+
+def test_gzip_is_deterministic():
+    body = b'{"co2_data":{}}' * 100
+
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip")) == body
+
+
+def test_brotli_round_trip():
+    brotli = pytest.importorskip("brotli")
+    body = b'{"co2_data":{}}' * 100
+
+    assert brotli.decompress(compress(body, "br")) == body
+
+
+def test_encode_skips_small_body():
+    body = b"x" * (compression.MIN_COMPRESS_SIZE - 1)
+
+    assert encode(body, "gzip") == (body, None)
+    assert encode(body * 2, "gzip").encoding == "gzip"
@@ -0,0 +1,61 @@
+import numpy as np
+
+from apps.api.climate.downsampling import (
+    Downsampling,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def _series(n=1000):
+    x = np.arange(n, dtype=np.float64)
+    return x, np.sin(x / 50)
+
+
+def test_lttb_keeps_endpoints_and_limit():
+    x, y = _series()
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0
+    assert indices[-1] == len(x) - 1
+    assert (np.diff(indices) > 0).all()
+
+
+def test_lttb_keeps_spike():
+    x, y = _series()
+    y[500] = 10.0
+
+    assert 500 in lttb_indices(x, y, 50)
+
+
+def test_minmax_keeps_extremes():
+    x, y = _series()
+    y[123], y[456] = 10.0, -10.0
+
+    indices = minmax_indices(x, y, 100)
+
+    assert len(indices) <= 100
+    assert 123 in indices
+    assert 456 in indices
+    assert (np.diff(indices) > 0).all()
+
+
+def test_short_series_is_unchanged():
+    assert Downsampling(10).indices([1, 2, 3], [1.0, 2.0, 3.0]).tolist() == [0, 1, 2]
+
+
+def test_missing_values_are_not_selected():
+    years = list(range(100))
+    values = [None if year % 2 else float(year) for year in years]
+
+    indices = Downsampling(10).indices(years, values)
+
+    assert len(indices) == 10
+    assert all(values[i] is not None for i in indices)
+
+
+def test_key():
+    assert Downsampling(500).key == "lttb500"
+    assert Downsampling(20, "minmax").key == "minmax20"
@@ -0,0 +1,62 @@
+import pytest
+
+from apps.api.climate.renderers import ArrowIPCRenderer, MessagePackRenderer
+
+msgpack = pytest.importorskip("msgpack")
+pa = pytest.importorskip("pyarrow")
+
+
+def _read_arrow(payload: bytes):
+    return pa.ipc.open_stream(payload).read_all()
+
+
+def test_msgpack_round_trip():
+    data = {"co2_data": {"2000": {"JPN": 1.5, "USA": None}}}
+
+    assert msgpack.unpackb(MessagePackRenderer().render(data)) == data
+
+
+def test_arrow_column_types():
+    data = {
+        "year": [2000, 2000, 2001],
+        "region": ["JPN", "USA", "JPN"],
+        "value": [1.0, None, 3.0],
+    }
+
+    table = _read_arrow(ArrowIPCRenderer().render(data))
+
+    assert table.schema.field("year").type == pa.int16()
+    assert table.schema.field("region").type == pa.dictionary(pa.int32(), pa.string())
+    assert table.schema.field("value").type == pa.float64()
+    assert table.column("region").to_pylist() == data["region"]
+    assert table.column("value").to_pylist() == data["value"]
+
+
+def test_arrow_empty_columns_keep_types():
+    table = _read_arrow(
+        ArrowIPCRenderer().render({"year": [], "region": [], "value": []})
+    )
+
+    assert table.num_rows == 0
+    assert pa.types.is_dictionary(table.schema.field("region").type)
+
+
+def test_arrow_error_detail_becomes_single_row():
+    table = _read_arrow(ArrowIPCRenderer().render({"detail": "Not found."}))
+
+    assert table.to_pydict() == {"detail": ["Not found."]}
+
+
+def test_arrow_error_body_is_untyped():
+    class Response:
+        status_code = 400
+
+    payload = ArrowIPCRenderer().render(
+        {"year": ["A valid integer is required."], "detail": "Bad request"},
+        renderer_context={"response": Response()},
+    )
+
+    assert _read_arrow(payload).to_pydict() == {
+        "year": ['["A valid integer is required."]'],
+        "detail": ["Bad request"],
+    }
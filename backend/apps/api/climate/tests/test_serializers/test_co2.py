@@ -1,6 +1,9 @@
 import pytest
 
-from apps.api.climate.serializers.co2 import CO2DataByYearSerializer
+from apps.api.climate.serializers.co2 import (
+    CO2ColumnarSerializer,
+    CO2DataByYearSerializer,
+)
 
 
 @pytest.mark.django_db
@@ -35,3 +38,13 @@ class TestCO2DataByYearSerializer:
         serializer = CO2DataByYearSerializer(data=data)
         assert serializer.is_valid()
         assert serializer.validated_data == data
+
+
+class TestCO2ColumnarSerializer:
+    def test_null_values_are_kept(self):
+        data = {
+            "years": [2000, 2001],
+            "regions": ["JPN", "USA"],
+            "values": [[1000.0, 5000.0], [1100.0, None]],
+        }
+        assert CO2ColumnarSerializer(data).data == data
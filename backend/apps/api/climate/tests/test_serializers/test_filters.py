@@ -0,0 +1,71 @@
+from apps.api.climate.serializers.filters import (
+    ClimateDataFilterSerializer,
+    StreamSerializer,
+)
+
+
+class TestClimateDataFilterSerializer:
+    def _serializer(self, params):
+        serializer = ClimateDataFilterSerializer(data=params)
+        serializer.is_valid()
+        return serializer
+
+    def test_empty_params(self):
+        serializer = self._serializer({})
+        assert serializer.is_valid()
+        assert serializer.filter_kwargs() == {}
+
+    def test_year_range_and_regions(self):
+        serializer = self._serializer(
+            {"year_from": "2000", "year_to": "2010", "regions": "USA, JPN,,USA"}
+        )
+
+        assert serializer.filter_kwargs() == {
+            "year__gte": 2000,
+            "year__lte": 2010,
+            "region__code__in": ["JPN", "USA"],
+        }
+
+    def test_year_is_single_year_range(self):
+        serializer = self._serializer({"year": "2020"})
+        assert serializer.filter_kwargs() == {"year__gte": 2020, "year__lte": 2020}
+
+    def test_year_cannot_be_combined_with_range(self):
+        assert not self._serializer({"year": "2020", "year_from": "2000"}).is_valid()
+
+    def test_year_from_must_not_exceed_year_to(self):
+        assert not self._serializer({"year_from": "2020", "year_to": "2000"}).is_valid()
+
+    def test_empty_regions_are_rejected(self):
+        assert not self._serializer({"regions": " , "}).is_valid()
+
+    def test_too_many_regions_are_rejected(self):
+        codes = ",".join(
+            f"R{i}" for i in range(ClimateDataFilterSerializer.MAX_REGIONS + 1)
+        )
+        assert not self._serializer({"regions": codes}).is_valid()
+
+    def test_fingerprint_ignores_region_order(self):
+        first = self._serializer({"regions": "JPN,USA"})
+        second = self._serializer({"regions": "USA,JPN"})
+        other = self._serializer({"regions": "JPN"})
+
+        assert first.fingerprint() == second.fingerprint()
+        assert first.fingerprint() != other.fingerprint()
+
+    def test_stream_is_not_a_filter(self):
+        serializer = self._serializer({"regions": "JPN", "stream": "true"})
+
+        assert serializer.filter_kwargs() == {"region__code__in": ["JPN"]}
+        assert (
+            serializer.fingerprint()
+            == self._serializer({"regions": "JPN"}).fingerprint()
+        )
+
+
+class TestStreamSerializer:
+    def test_default_is_false(self):
+        serializer = StreamSerializer(data={})
+
+        assert serializer.is_valid()
+        assert serializer.validated_data == {"stream": False}
@@ -0,0 +1,70 @@
+import pytest
+
+from apps.api.climate.downsampling import Downsampling
+from apps.api.climate.serializers.series import (
+    BatchSpecSerializer,
+    SeriesQuerySerializer,
+)
+
+
+class TestSeriesQuerySerializer:
+    def _serializer(self, params):
+        serializer = SeriesQuerySerializer(data=params)
+        serializer.is_valid()
+        return serializer
+
+    def test_from_and_to_are_year_range(self):
+        serializer = self._serializer(
+            {"indicator": "emissions_total", "from": "2000", "to": "2010"}
+        )
+
+        assert serializer.is_valid()
+        assert serializer.filter_kwargs() == {"year__gte": 2000, "year__lte": 2010}
+
+    def test_indicators_keep_order_without_duplicates(self):
+        serializer = self._serializer({"indicator": "upper, 3,upper,,lower"})
+        assert serializer.validated_data["indicator"] == ["upper", "3", "lower"]
+
+    def test_indicator_is_required(self):
+        assert not self._serializer({}).is_valid()
+        assert not self._serializer({"indicator": " , "}).is_valid()
+
+    def test_too_many_indicators_are_rejected(self):
+        refs = ",".join(
+            f"i{i}" for i in range(SeriesQuerySerializer.MAX_INDICATORS + 1)
+        )
+        assert not self._serializer({"indicator": refs}).is_valid()
+
+    def test_from_must_not_exceed_to(self):
+        assert not self._serializer(
+            {"indicator": "x", "from": "2020", "to": "2000"}
+        ).is_valid()
+
+    def test_downsampling(self):
+        assert self._serializer({"indicator": "x"}).downsampling() is None
+        assert self._serializer(
+            {"indicator": "x", "max_points": "500"}
+        ).downsampling() == Downsampling(500, "lttb")
+        assert self._serializer(
+            {"indicator": "x", "max_points": "10", "downsample": "minmax"}
+        ).downsampling() == Downsampling(10, "minmax")
+
+    @pytest.mark.parametrize(
+        "params", [{"max_points": "2"}, {"max_points": "10", "downsample": "avg"}]
+    )
+    def test_invalid_downsampling_is_rejected(self, params):
+        assert not self._serializer({"indicator": "x", **params}).is_valid()
+
+
+class TestBatchSpecSerializer:
+    def test_regions_accept_list_and_string(self):
+        as_list = BatchSpecSerializer(
+            data={"id": "a", "indicator": "x", "regions": ["USA", "JPN"]}
+        )
+        as_string = BatchSpecSerializer(
+            data={"id": "a", "indicator": "x", "regions": "USA,JPN"}
+        )
+
+        assert as_list.is_valid() and as_string.is_valid()
+        assert as_list.filter_kwargs() == as_string.filter_kwargs()
+        assert as_list.filter_kwargs() == {"region__code__in": ["JPN", "USA"]}
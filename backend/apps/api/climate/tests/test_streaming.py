@@ -0,0 +1,50 @@
+import json
+
+from apps.api.climate.streaming import (
+    co2_data_parts,
+    iter_json_chunks,
+    temperature_parts,
+)
+
+
+def _decode(parts):
+    return json.loads(b"".join(iter_json_chunks(parts)))
+
+
+def test_co2_data_parts():
+    rows = [(2000, "JPN", 1.0), (2000, "USA", 2.0), (2001, "JPN", 3.0)]
+
+    assert _decode(co2_data_parts(rows)) == {
+        "co2_data": {"2000": {"JPN": 1.0, "USA": 2.0}, "2001": {"JPN": 3.0}}
+    }
+
+
+def test_co2_data_parts_empty():
+    assert _decode(co2_data_parts([])) == {"co2_data": {}}
+
+
+def test_temperature_parts():
+    field_map = {"Upper": "upper", "Lower": "lower"}
+    rows = [
+        ("Japan", 2000, "Upper", 1.0),
+        ("Japan", 2000, "Lower", 0.5),
+        ("Japan", 2001, "Upper", 1.1),
+        ("World", 2000, "Lower", 0.2),
+    ]
+
+    assert _decode(temperature_parts(rows, field_map)) == {
+        "Japan": [
+            {"year": 2000, "upper": 1.0, "lower": 0.5},
+            {"year": 2001, "upper": 1.1},
+        ],
+        "World": [{"year": 2000, "lower": 0.2}],
+    }
+
+
+def test_temperature_parts_empty():
+    assert _decode(temperature_parts([], {})) == {}
+
+
+def test_iter_json_chunks_buffers_small_parts():
+    chunks = list(iter_json_chunks(["a"] * 10))
+    assert chunks == [b"a" * 10]
@@ -1,10 +1,21 @@
+import gzip
+import json
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from apps.api.climate import cache as cache_module
+from apps.api.climate import compression
 from apps.climate_data.constants import CLIMATE_GROUPS
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -77,3 +88,300 @@ class TestCO2DataByYearView:
         url = reverse("co2-data")
         response = api_client.get(url)
         assert response.status_code == 404
+
+    # -----------------------------------------
+    # バージョンごとのレスポンスキャッシュ
+    # -----------------------------------------
+    def _publish(self, indicator):
+        version = DatasetVersion.objects.create(group=indicator.group)
+        version.copy_unversioned_rows()
+        version.publish()
+        indicator.group.refresh_from_db()
+        return version
+
+    def test_cached_response_does_not_query_database(
+        self, api_client, setup_data, django_assert_num_queries
+    ):
+        self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+        first = api_client.get(url)
+
+        with django_assert_num_queries(0):
+            second = api_client.get(url)
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.json()["co2_data"]["2000"]["JPN"] == 1000.0
+
+    def test_publish_rebuilds_cached_response(
+        self, api_client, setup_data, django_capture_on_commit_callbacks
+    ):
+        indicator = setup_data["indicator"]
+        with django_capture_on_commit_callbacks(execute=True):
+            self._publish(indicator)
+        url = reverse("co2-data")
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            version = self._publish(indicator)
+            ClimateData.objects.in_version(version.pk).filter(year=2000).update(
+                value=1.0
+            )
+
+        response = api_client.get(url)
+        assert response.json()["co2_data"]["2000"]["JPN"] == 1.0
+
+    # -----------------------------------------
+    # 条件付き GET（ETag / Last-Modified）
+    # -----------------------------------------
+    def test_if_none_match_returns_304(
+        self, api_client, setup_data, django_assert_num_queries
+    ):
+        version = self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+        response = api_client.get(url)
+        assert response["ETag"] == f'"co2-data-v{version.pk}"'
+        assert "Last-Modified" in response
+
+        with django_assert_num_queries(0):
+            not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    def test_etag_changes_after_publish(
+        self, api_client, setup_data, django_capture_on_commit_callbacks
+    ):
+        url = reverse("co2-data")
+        with django_capture_on_commit_callbacks(execute=True):
+            self._publish(setup_data["indicator"])
+        etag = api_client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self._publish(setup_data["indicator"])
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    # -----------------------------------------
+    # ?format=columnar
+    # -----------------------------------------
+    def test_columnar_format(self, api_client, setup_data):
+        ClimateData.objects.create(
+            indicator=setup_data["indicator"],
+            region=setup_data["regions"]["JPN"],
+            year=2002,
+            value=1200.0,
+        )
+
+        response = api_client.get(reverse("co2-data"), {"format": "columnar"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert response.json() == {
+            "years": [2000, 2001, 2002],
+            "regions": ["JPN", "USA"],
+            "values": [[1000.0, 5000.0], [1100.0, 5200.0], [1200.0, None]],
+        }
+
+    def test_columnar_format_has_own_etag(self, api_client, setup_data):
+        self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+        etag = api_client.get(url)["ETag"]
+
+        response = api_client.get(url, {"format": "columnar"}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert "years" in response.json()
+
+    def test_unknown_format_returns_404(self, api_client, setup_data):
+        response = api_client.get(reverse("co2-data"), {"format": "xml"})
+        assert response.status_code == 404
+
+    # -----------------------------------------
+    # 年・地域による絞り込み
+    # -----------------------------------------
+    def test_filter_by_year_and_region(self, api_client, setup_data):
+        response = api_client.get(reverse("co2-data"), {"year": 2001, "regions": "USA"})
+
+        assert response.status_code == 200
+        assert response.json() == {"co2_data": {"2001": {"USA": 5200.0}}}
+
+    def test_filter_with_columnar_format(self, api_client, setup_data):
+        response = api_client.get(
+            reverse("co2-data"), {"format": "columnar", "year_from": 2001}
+        )
+
+        assert response.json() == {
+            "years": [2001],
+            "regions": ["JPN", "USA"],
+            "values": [[1100.0, 5200.0]],
+        }
+
+    def test_filtered_response_has_own_etag(self, api_client, setup_data):
+        self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+        etag = api_client.get(url)["ETag"]
+
+        response = api_client.get(url, {"year": 2000}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json() == {"co2_data": {"2000": {"JPN": 1000.0, "USA": 5000.0}}}
+
+    def test_invalid_filter_returns_400(self, api_client, setup_data):
+        response = api_client.get(
+            reverse("co2-data"), {"year_from": 2010, "year_to": 2000}
+        )
+        assert response.status_code == 400
+
+    # -----------------------------------------
+    # ?stream=true
+    # -----------------------------------------
+    def test_stream_has_same_shape(self, api_client, setup_data):
+        url = reverse("co2-data")
+        response = api_client.get(url, {"stream": "true", "regions": "JPN"})
+
+        assert response.streaming
+        body = json.loads(b"".join(response.streaming_content))
+        assert body == api_client.get(url, {"regions": "JPN"}).json()
+
+    # -----------------------------------------
+    # MessagePack / Arrow IPC
+    # -----------------------------------------
+    def test_msgpack_has_same_shape(self, api_client, setup_data):
+        msgpack = pytest.importorskip("msgpack")
+        url = reverse("co2-data")
+
+        response = api_client.get(url, HTTP_ACCEPT="application/msgpack")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == api_client.get(url).json()
+
+    def test_arrow_format(self, api_client, setup_data):
+        pa = pytest.importorskip("pyarrow")
+
+        response = api_client.get(
+            reverse("co2-data"), {"format": "arrow", "regions": "JPN"}
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.field("year").type == pa.int16()
+        assert table.to_pydict() == {
+            "year": [2000, 2001],
+            "region": ["JPN", "JPN"],
+            "value": [1000.0, 1100.0],
+        }
+
+    def test_arrow_invalid_filter_returns_400(self, api_client, setup_data):
+        pa = pytest.importorskip("pyarrow")
+
+        response = api_client.get(
+            reverse("co2-data"), {"format": "arrow", "year": "abc"}
+        )
+
+        assert response.status_code == 400
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.field("year").type == pa.string()
+        assert table.num_rows == 1
+
+    def test_binary_formats_have_own_etag(self, api_client, setup_data):
+        pytest.importorskip("msgpack")
+        self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+        etag = api_client.get(url)["ETag"]
+
+        response = api_client.get(
+            url, HTTP_ACCEPT="application/msgpack", HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert "Accept" in response["Vary"]
+
+    def test_arrow_ignores_stream(self, api_client, setup_data):
+        pytest.importorskip("pyarrow")
+
+        response = api_client.get(
+            reverse("co2-data"), {"format": "arrow", "stream": "true"}
+        )
+
+        assert response.status_code == 200
+        assert not response.streaming
+
+    # -----------------------------------------
+    # gzip / Brotli
+    # -----------------------------------------
+    @pytest.fixture
+    def compress_all(self, monkeypatch):
+        # テストデータは小さいため、すべての本文を圧縮対象にする
+        monkeypatch.setattr(compression, "MIN_COMPRESS_SIZE", 0)
+
+    def test_gzip_response(self, api_client, setup_data, compress_all):
+        self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+
+        response = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert gzip.decompress(response.content) == api_client.get(url).content
+
+    def test_brotli_response(self, api_client, setup_data, compress_all):
+        brotli = pytest.importorskip("brotli")
+        url = reverse("co2-data")
+
+        response = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        assert response["Content-Encoding"] == "br"
+        assert brotli.decompress(response.content) == api_client.get(url).content
+
+    def test_encodings_have_own_etag(self, api_client, setup_data, compress_all):
+        self._publish(setup_data["indicator"])
+        url = reverse("co2-data")
+        etag = api_client.get(url)["ETag"]
+
+        response = api_client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_published_version_is_compressed_once(
+        self,
+        api_client,
+        setup_data,
+        compress_all,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            self._publish(setup_data["indicator"])
+
+        calls = []
+        monkeypatch.setattr(
+            cache_module, "compress", lambda *args, **kwargs: calls.append(args)
+        )
+        url = reverse("co2-data")
+        for _ in range(2):
+            response = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            assert response["Content-Encoding"] == "gzip"
+
+        # 公開時に圧縮した本文を返し、リクエストごとには圧縮しない
+        assert calls == []
+
+    def test_filtered_response_is_compressed(
+        self, api_client, setup_data, compress_all
+    ):
+        response = api_client.get(
+            reverse("co2-data"), {"year": 2000}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        assert json.loads(gzip.decompress(response.content)) == {
+            "co2_data": {"2000": {"JPN": 1000.0, "USA": 5000.0}}
+        }
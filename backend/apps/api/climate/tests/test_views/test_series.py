@@ -0,0 +1,314 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSeriesAPIView:
+    # ===============================
+    # 🔹 API クライアント（強制認証）
+    # ===============================
+    @pytest.fixture
+    def api_client(self):
+        user = User.objects.create_user(username="testuser", password="password123")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    @pytest.fixture
+    def url(self):
+        return reverse("climate-series")
+
+    # ===============================
+    # 🔹 指標 2 つ・地域 2 つ・3 年分のデータ
+    # ===============================
+    @pytest.fixture
+    def group(self):
+        return IndicatorGroup.objects.create(name="Temperature")
+
+    @pytest.fixture
+    def indicators(self, group):
+        return (
+            Indicator.objects.create(name="Upper", key="upper", unit="°C", group=group),
+            Indicator.objects.create(name="Lower", key="lower", unit="°C", group=group),
+        )
+
+    @pytest.fixture
+    def climate_data(self, indicators):
+        upper, lower = indicators
+        world = Region.objects.create(name="World", code="OWID_WRL")
+        japan = Region.objects.create(name="Japan", code="JPN")
+
+        for year in [2000, 2001, 2002]:
+            for region in [world, japan]:
+                ClimateData.objects.create(
+                    region=region, indicator=upper, year=year, value=year + 0.5
+                )
+        ClimateData.objects.create(region=world, indicator=lower, year=2001, value=-1)
+
+    @pytest.fixture
+    def published(self, group, climate_data):
+        version = DatasetVersion.objects.create(group=group)
+        version.copy_unversioned_rows()
+        version.publish()
+        return version
+
+    # ===============================
+    # ✅ 正常系
+    # ===============================
+    @pytest.mark.parametrize("versioned", [False, True])
+    def test_returns_arrays_per_indicator_and_region(
+        self, request, api_client, url, indicators, climate_data, versioned
+    ):
+        if versioned:
+            request.getfixturevalue("published")
+        upper, lower = indicators
+
+        response = api_client.get(url, {"indicator": f"upper,{lower.pk}", "from": 2001})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "indicators": [
+                {"id": upper.pk, "key": "upper", "name": "Upper", "unit": "°C"},
+                {"id": lower.pk, "key": "lower", "name": "Lower", "unit": "°C"},
+            ],
+            "series": [
+                {
+                    "indicator": upper.pk,
+                    "region": "JPN",
+                    "region_name": "Japan",
+                    "years": [2001, 2002],
+                    "values": [2001.5, 2002.5],
+                },
+                {
+                    "indicator": upper.pk,
+                    "region": "OWID_WRL",
+                    "region_name": "World",
+                    "years": [2001, 2002],
+                    "values": [2001.5, 2002.5],
+                },
+                {
+                    "indicator": lower.pk,
+                    "region": "OWID_WRL",
+                    "region_name": "World",
+                    "years": [2001],
+                    "values": [-1.0],
+                },
+            ],
+        }
+
+    def test_filter_by_regions_and_to(self, api_client, url, published):
+        response = api_client.get(
+            url, {"indicator": "upper", "regions": "OWID_WRL", "to": 2000}
+        )
+
+        assert [
+            (item["region"], item["years"]) for item in response.json()["series"]
+        ] == [("OWID_WRL", [2000])]
+
+    def test_published_result_is_cached(
+        self, api_client, url, published, django_assert_num_queries
+    ):
+        params = {"indicator": "upper", "regions": "JPN"}
+        body = api_client.get(url, params).json()
+
+        with django_assert_num_queries(0):
+            assert api_client.get(url, params).json() == body
+
+    def test_etag_is_per_parameter_set(self, api_client, url, published):
+        first = api_client.get(url, {"indicator": "upper"})
+        other = api_client.get(url, {"indicator": "upper", "regions": "JPN"})
+
+        assert first["ETag"] != other["ETag"]
+        response = api_client.get(
+            url, {"indicator": "upper"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.parametrize("versioned", [False, True])
+    def test_max_points_downsamples_each_series(
+        self, api_client, url, group, indicators, versioned
+    ):
+        upper, _ = indicators
+        world = Region.objects.create(name="World", code="OWID_WRL")
+        for year in range(1900, 2000):
+            ClimateData.objects.create(
+                region=world, indicator=upper, year=year, value=year % 7
+            )
+        if versioned:
+            version = DatasetVersion.objects.create(group=group)
+            version.copy_unversioned_rows()
+            version.publish()
+
+        full = api_client.get(url, {"indicator": "upper"})
+        sampled = api_client.get(url, {"indicator": "upper", "max_points": 10})
+
+        (item,) = sampled.json()["series"]
+        assert len(item["years"]) == 10
+        assert item["years"][0] == 1900
+        assert item["years"][-1] == 1999
+        assert item["values"] == [year % 7 for year in item["years"]]
+        assert len(full.json()["series"][0]["years"]) == 100
+        assert full["ETag"] != sampled["ETag"]
+
+    # ===============================
+    # ❌ 異常系
+    # ===============================
+    def test_unknown_indicator_returns_404(self, api_client, url, climate_data):
+        response = api_client.get(url, {"indicator": "upper,missing"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json() == {"detail": "Unknown indicator: missing"}
+
+    def test_indicators_from_different_groups_are_rejected(
+        self, api_client, url, climate_data
+    ):
+        other = IndicatorGroup.objects.create(name="CO2")
+        Indicator.objects.create(name="Total", key="emissions_total", group=other)
+
+        response = api_client.get(url, {"indicator": "upper,emissions_total"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_missing_indicator_param_returns_400(self, api_client, url):
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestBatchAPIView:
+    @pytest.fixture
+    def api_client(self):
+        user = User.objects.create_user(username="testuser", password="password123")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    @pytest.fixture
+    def url(self):
+        return reverse("climate-batch")
+
+    # ===============================
+    # 🔹 2 グループ（気温は公開中バージョン、CO2 はバージョンなし）
+    # ===============================
+    @pytest.fixture
+    def indicators(self):
+        temperature = IndicatorGroup.objects.create(name="Temperature")
+        co2 = IndicatorGroup.objects.create(name="CO2")
+        upper = Indicator.objects.create(name="Upper", key="upper", group=temperature)
+        total = Indicator.objects.create(name="Total", key="total", group=co2)
+        share = Indicator.objects.create(name="Share", key="share", group=co2)
+
+        world = Region.objects.create(name="World", code="OWID_WRL")
+        japan = Region.objects.create(name="Japan", code="JPN")
+        for indicator in [upper, total, share]:
+            for region in [world, japan]:
+                for year in [2000, 2001]:
+                    ClimateData.objects.create(
+                        region=region, indicator=indicator, year=year, value=year
+                    )
+
+        version = DatasetVersion.objects.create(group=temperature)
+        version.copy_unversioned_rows()
+        version.publish()
+        return upper, total, share
+
+    def _post(self, api_client, url, requests):
+        return api_client.post(url, {"requests": requests}, format="json")
+
+    def _get_series(self, api_client, **params):
+        return api_client.get(reverse("climate-series"), params).json()
+
+    # ===============================
+    # ✅ 正常系
+    # ===============================
+    def test_results_match_series_endpoint(self, api_client, url, indicators):
+        response = self._post(
+            api_client,
+            url,
+            [
+                {"id": "upper", "indicator": "upper", "regions": ["JPN"]},
+                {"id": "co2", "indicator": "total,share", "from": 2001},
+            ],
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["errors"] == {}
+        assert body["results"] == {
+            "upper": self._get_series(api_client, indicator="upper", regions="JPN"),
+            "co2": self._get_series(
+                api_client, indicator="total,share", **{"from": 2001}
+            ),
+        }
+
+    def test_unversioned_specs_share_one_query(
+        self, api_client, url, indicators, django_assert_num_queries
+    ):
+        requests = [
+            {"id": "total", "indicator": "total", "to": 2000},
+            {"id": "share", "indicator": "share", "to": 2000},
+        ]
+        # 指標の解決結果をキャッシュしておく
+        self._post(api_client, url, requests)
+
+        # バージョンなしのスタンプ集計 1 + 同じ条件の 2 指標をまとめた 1
+        with django_assert_num_queries(2):
+            response = self._post(api_client, url, requests)
+
+        assert [
+            item["indicator"]
+            for spec_id in ["total", "share"]
+            for item in response.json()["results"][spec_id]["series"]
+        ] == [indicators[1].pk, indicators[1].pk, indicators[2].pk, indicators[2].pk]
+
+    def test_published_specs_are_served_from_cache(
+        self, api_client, url, indicators, django_assert_num_queries
+    ):
+        requests = [{"id": "upper", "indicator": "upper"}]
+        body = self._post(api_client, url, requests).json()
+
+        with django_assert_num_queries(0):
+            assert self._post(api_client, url, requests).json() == body
+
+    def test_unknown_indicator_is_reported_per_id(self, api_client, url, indicators):
+        response = self._post(
+            api_client,
+            url,
+            [
+                {"id": "ok", "indicator": "upper"},
+                {"id": "ng", "indicator": "missing"},
+            ],
+        )
+
+        body = response.json()
+        assert list(body["results"]) == ["ok"]
+        assert body["errors"] == {"ng": "Unknown indicator: missing"}
+
+    # ===============================
+    # ❌ 異常系
+    # ===============================
+    @pytest.mark.parametrize(
+        "requests",
+        [
+            [],
+            [{"indicator": "upper"}],
+            [{"id": "a", "indicator": "upper"}, {"id": "a", "indicator": "upper"}],
+            [{"id": "a", "indicator": "upper", "from": 2001, "to": 2000}],
+        ],
+    )
+    def test_invalid_requests_return_400(self, api_client, url, indicators, requests):
+        response = self._post(api_client, url, requests)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,11 +1,21 @@
+import json
+from unittest.mock import patch
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.api.climate.views.temperature import TemperatureAPIView
 from apps.climate_data.constants import CLIMATE_GROUPS
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
 
 User = get_user_model()
 
@@ -129,6 +139,152 @@ class TestTemperatureAPIView:
         assert "lower" in first
         assert "global_average" in first
 
+    def test_values_are_pivoted_per_indicator(
+        self, api_client, url, indicators, regions
+    ):
+        upper, lower, global_average = indicators
+        world = regions[0]
+        ClimateData.objects.create(region=world, indicator=upper, year=1900, value=1.5)
+        ClimateData.objects.create(region=world, indicator=lower, year=1900, value=-0.5)
+        ClimateData.objects.create(
+            region=world, indicator=global_average, year=1900, value=0.5
+        )
+        # global_average だけのデータがない年
+        ClimateData.objects.create(region=world, indicator=upper, year=1901, value=2.0)
+        ClimateData.objects.create(region=world, indicator=lower, year=1901, value=0.0)
+
+        response = api_client.get(url)
+
+        assert response.json() == {
+            "World": [
+                {"year": 1900, "upper": 1.5, "lower": -0.5, "global_average": 0.5},
+                {"year": 1901, "upper": 2.0, "lower": 0.0},
+            ]
+        }
+
+    def test_pivot_runs_single_data_query(
+        self, api_client, url, climate_data, django_assert_num_queries
+    ):
+        # スタンプ（グループ + 件数 / 更新日時）、Indicator、ピボット集計の 4 クエリ
+        with django_assert_num_queries(4):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    # ===============================
+    # ✅ 公開中バージョン（メモリ上のストア）
+    # ===============================
+    @pytest.fixture
+    def published(self, temperature_group, climate_data):
+        version = DatasetVersion.objects.create(group=temperature_group)
+        version.copy_unversioned_rows()
+        ClimateData.objects.filter(
+            version=version, region__code="OWID_WRL", year=1901
+        ).update(value=2.5)
+        version.publish()
+        return version
+
+    def test_published_version_is_read_from_store(
+        self, api_client, url, published, django_assert_num_queries
+    ):
+        body = api_client.get(url).json()
+
+        assert body["World"][1] == {
+            "year": 1901,
+            "upper": 2.5,
+            "lower": 2.5,
+            "global_average": 2.5,
+        }
+        assert list(body) == ["Northern Hemisphere", "World"]
+
+        # スタンプ・Indicator・データはすべてプロセス内に保持される
+        with django_assert_num_queries(0):
+            assert api_client.get(url).json() == body
+
+    def test_published_version_stream_and_filter(self, api_client, url, published):
+        params = {"year": 1901, "regions": "OWID_WRL"}
+        expected = {
+            "World": [{"year": 1901, "upper": 2.5, "lower": 2.5, "global_average": 2.5}]
+        }
+
+        assert api_client.get(url, params).json() == expected
+        response = api_client.get(url, {**params, "stream": "true"})
+        assert json.loads(b"".join(response.streaming_content)) == expected
+
+    @pytest.mark.parametrize(
+        "params",
+        [{}, {"year_from": 1901, "regions": "OWID_WRL"}, {"max_points": 2}],
+    )
+    def test_unversioned_and_published_return_same_rows(
+        self, api_client, url, temperature_group, climate_data, params
+    ):
+        # バージョンなし（DB）とストアのピボットが同じ結果になる
+        unversioned = api_client.get(url, params).json()
+
+        version = DatasetVersion.objects.create(group=temperature_group)
+        version.copy_unversioned_rows()
+        version.publish()
+
+        assert api_client.get(url, params).json() == unversioned
+
+    def test_published_version_stream_does_not_build_row_list(
+        self, api_client, url, published
+    ):
+        expected = api_client.get(url).json()
+
+        # ストリーミングは全行のリスト（_store_rows）を作らず、少しずつ変換する
+        iter_rows = TemperatureAPIView._iter_store_rows
+        with (
+            patch.object(TemperatureAPIView, "_store_rows", side_effect=AssertionError),
+            patch.object(
+                TemperatureAPIView,
+                "_iter_store_rows",
+                side_effect=lambda *args: iter_rows(*args, chunk_size=1),
+            ),
+        ):
+            response = api_client.get(url, {"stream": "true"})
+            assert response.streaming
+            assert json.loads(b"".join(response.streaming_content)) == expected
+
+    # ===============================
+    # ✅ 間引き（max_points）
+    # ===============================
+    @pytest.mark.parametrize("versioned", [False, True])
+    def test_max_points_keeps_bands_aligned(
+        self, api_client, url, temperature_group, indicators, regions, versioned
+    ):
+        upper, lower, global_average = indicators
+        for year in range(1850, 2000):
+            value = (year % 11) / 10
+            for indicator, offset in [(upper, 1), (lower, -1), (global_average, 0)]:
+                ClimateData.objects.create(
+                    region=regions[0],
+                    indicator=indicator,
+                    year=year,
+                    value=value + offset,
+                )
+        if versioned:
+            version = DatasetVersion.objects.create(group=temperature_group)
+            version.copy_unversioned_rows()
+            version.publish()
+
+        full = api_client.get(url)
+        sampled = api_client.get(url, {"max_points": 20, "stream": "true"})
+
+        world = sampled.json()["World"]
+        assert len(world) == 20
+        assert world[0]["year"] == 1850
+        assert world[-1]["year"] == 1999
+        for row in world:
+            assert row["upper"] == pytest.approx(row["global_average"] + 1)
+            assert row["lower"] == pytest.approx(row["global_average"] - 1)
+        assert len(full.json()["World"]) == 150
+        assert full["ETag"] != sampled["ETag"]
+
+    def test_invalid_max_points_returns_400(self, api_client, url, climate_data):
+        response = api_client.get(url, {"max_points": 1})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     # ===============================
     # ❌ 異常系：Indicator 不足
     # ===============================
@@ -151,3 +307,112 @@ class TestTemperatureAPIView:
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert response.json()["detail"] == "Not all temperature indicators found."
+
+    # ===============================
+    # ✅ 条件付き GET（ETag / Last-Modified）
+    # ===============================
+    def test_response_has_etag_and_last_modified(self, api_client, url, climate_data):
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"].startswith('"temperature-')
+        assert "Last-Modified" in response
+        assert "no-cache" in response["Cache-Control"]
+
+    def test_if_none_match_returns_304_without_main_query(
+        self, api_client, url, climate_data, django_assert_num_queries
+    ):
+        etag = api_client.get(url)["ETag"]
+
+        # 集計クエリ（ClimateData の件数 / 更新日時）のみ。グループはキャッシュ済み
+        with django_assert_num_queries(1):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    def test_if_modified_since_returns_304(self, api_client, url, climate_data):
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_etag_changes_when_data_changes(
+        self, api_client, url, indicators, regions, climate_data
+    ):
+        etag = api_client.get(url)["ETag"]
+
+        ClimateData.objects.create(
+            region=regions[0], indicator=indicators[0], year=1902, value=1.0
+        )
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    # ===============================
+    # ✅ 年・地域による絞り込み
+    # ===============================
+    def test_filter_by_year_and_region(self, api_client, url, climate_data):
+        response = api_client.get(url, {"year": 1901, "regions": "OWID_NH"})
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert list(body) == ["Northern Hemisphere"]
+        assert [item["year"] for item in body["Northern Hemisphere"]] == [1901]
+
+    def test_invalid_year_returns_400(self, api_client, url, climate_data):
+        response = api_client.get(url, {"year": "abc"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    # ===============================
+    # ✅ ストリーミング
+    # ===============================
+    def test_stream_has_same_shape(self, api_client, url, climate_data):
+        response = api_client.get(url, {"stream": "true"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        body = json.loads(b"".join(response.streaming_content))
+        assert body == api_client.get(url).json()
+
+    # ===============================
+    # ✅ MessagePack / Arrow IPC
+    # ===============================
+    def test_msgpack_has_same_shape(self, api_client, url, climate_data):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = api_client.get(url, HTTP_ACCEPT="application/msgpack")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert msgpack.unpackb(response.content) == api_client.get(url).json()
+
+    def test_arrow_invalid_filter_returns_400(self, api_client, url, climate_data):
+        pa = pytest.importorskip("pyarrow")
+
+        response = api_client.get(url, {"format": "arrow", "year": "abc"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.field("year").type == pa.string()
+        assert table.num_rows == 1
+
+    def test_arrow_returns_columns(self, api_client, url, climate_data):
+        pa = pytest.importorskip("pyarrow")
+
+        response = api_client.get(url, {"format": "arrow", "regions": "OWID_WRL"})
+
+        assert response.status_code == status.HTTP_200_OK
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column_names == [
+            "year",
+            "region",
+            "upper",
+            "lower",
+            "global_average",
+        ]
+        assert table.column("year").to_pylist() == [1900, 1901]
+        assert table.column("region").to_pylist() == ["World", "World"]
+        assert table.column("upper").to_pylist() == [1.23, 1.23]
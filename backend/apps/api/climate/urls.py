@@ -1,6 +1,7 @@
 from django.urls import path
 
 from apps.api.climate.views.co2 import CO2DataByYearView
+from apps.api.climate.views.series import BatchAPIView, SeriesAPIView
 from apps.api.climate.views.temperature import TemperatureAPIView
 
 urlpatterns = [
@@ -14,4 +15,14 @@ urlpatterns = [
         CO2DataByYearView.as_view(),
         name="co2-data",
     ),
+    path(
+        "series/",
+        SeriesAPIView.as_view(),
+        name="climate-series",
+    ),
+    path(
+        "batch/",
+        BatchAPIView.as_view(),
+        name="climate-batch",
+    ),
 ]
@@ -1,42 +1,244 @@
 from collections import defaultdict
+from typing import Callable, Iterable
 
-from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
 from rest_framework.generics import GenericAPIView
-from rest_framework.response import Response
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
 
-from apps.api.climate.serializers.co2 import CO2DataByYearSerializer
+from apps.api.climate.cache import VersionedResponseCache, conditional_get
+from apps.api.climate.compression import choose_encoding, encoded_response
+from apps.api.climate.renderers import (
+    BINARY_RENDERER_CLASSES,
+    ArrowIPCRenderer,
+    ColumnarJSONRenderer,
+    MessagePackRenderer,
+)
+from apps.api.climate.serializers.co2 import (
+    CO2ColumnarSerializer,
+    CO2DataByYearSerializer,
+)
+from apps.api.climate.serializers.filters import (
+    ClimateDataFilterSerializer,
+    StreamSerializer,
+)
+from apps.api.climate.streaming import (
+    STREAM_CHUNK_SIZE,
+    co2_data_parts,
+    iter_json_chunks,
+)
 from apps.climate_data.constants import CLIMATE_GROUPS
-from apps.climate_data.models import ClimateData, Indicator
+from apps.climate_data.lookups import get_indicator_ids
+from apps.climate_data.models import ClimateData
+from apps.climate_data.store import climate_store
+from utils.schema import schema
+
+CO2_GROUP_NAME = CLIMATE_GROUPS["CO2"]["group"]["name"]
+CO2_INDICATOR_NAME = CLIMATE_GROUPS["CO2"]["indicator"]["name"]
+
+
+def _co2_rows(
+    version_id: int | None, filters: dict | None = None, *, stream: bool = False
+) -> Iterable[tuple[int, str, float]]:
+    """
+    指定バージョンの CO2 データを (year, 地域コード, value) のタプルで
+    year → 地域コードの順に返す
+
+    filters は ClimateDataFilterSerializer.filter_kwargs() の絞り込み条件。
+    """
+    indicator_ids = get_indicator_ids(CO2_GROUP_NAME, [CO2_INDICATOR_NAME])
+    if not indicator_ids:
+        raise Http404("CO2 indicator not found.")
+    indicator_id = indicator_ids[CO2_INDICATOR_NAME]
+
+    # 公開中バージョンはプロセス内のストアから返す（DB にアクセスしない）
+    if version_id is not None:
+        group_data = climate_store.get(CO2_GROUP_NAME, version_id)
+        return group_data.rows(indicator_id, filters).tuples(STREAM_CHUNK_SIZE)
+
+    # バージョンなしのデータは DB から読む
+    # モデルインスタンスを作らず、必要な列だけを取得する
+    rows = (
+        ClimateData.objects.filter(
+            indicator_id=indicator_id, version_id=None, **(filters or {})
+        )
+        .order_by("year", "region__code")
+        .values_list("year", "region__code", "value")
+    )
+    return rows.iterator(chunk_size=STREAM_CHUNK_SIZE) if stream else rows
+
+
+def co2_data(version_id: int | None, filters: dict | None = None) -> dict:
+    """
+    指定バージョンの CO2 データを年 → 地域コード → 値 の形で返す
+    """
+    # 年・国コードごとにまとめる
+    result = defaultdict(dict)
+    for year, code, value in _co2_rows(version_id, filters):
+        result[year][code] = value
+
+    return CO2DataByYearSerializer({"co2_data": dict(result)}).data
+
+
+def co2_columnar_data(version_id: int | None, filters: dict | None = None) -> dict:
+    """
+    指定バージョンの CO2 データを years / regions / values（行列）の形で返す
+    """
+    rows = list(_co2_rows(version_id, filters))
+    years = sorted({year for year, _, _ in rows})
+    regions = sorted({code for _, code, _ in rows})
+
+    year_index = {year: i for i, year in enumerate(years)}
+    region_index = {code: j for j, code in enumerate(regions)}
+
+    # データがない箇所は None（JSON では null）
+    values: list[list[float | None]] = [[None] * len(regions) for _ in years]
+    for year, code, value in rows:
+        values[year_index[year]][region_index[code]] = value
+
+    return CO2ColumnarSerializer(
+        {"years": years, "regions": regions, "values": values}
+    ).data
+
+
+def co2_table_data(
+    version_id: int | None, filters: dict | None = None
+) -> dict[str, list]:
+    """
+    指定バージョンの CO2 データを year / region / value の列ごとのリストで返す（Arrow 用）
+    """
+    rows = list(_co2_rows(version_id, filters))
+    return {
+        "year": [year for year, _, _ in rows],
+        "region": [code for _, code, _ in rows],
+        "value": [value for _, _, value in rows],
+    }
+
+
+def stream_co2_response(
+    version_id: int | None, filters: dict | None = None
+) -> StreamingHttpResponse:
+    """
+    CO2 データを年順に読み出し、JSON をストリーミングで返す。
+
+    全件を辞書に組み立てないため、メモリ使用量は件数に依存しない
+    （バージョンなしのデータはサーバーサイドカーソルで読み出す）。
+    """
+    rows = _co2_rows(version_id, filters, stream=True)
+    return StreamingHttpResponse(
+        iter_json_chunks(co2_data_parts(rows)), content_type="application/json"
+    )
+
+
+def _encoded(renderer_class: type[BaseRenderer], build_data) -> Callable[..., bytes]:
+    """
+    build_data の結果を renderer_class でエンコードする関数を返す
+    """
+
+    def build(version_id: int | None, filters: dict | None = None) -> bytes:
+        return renderer_class().render(build_data(version_id, filters))
+
+    return build
+
+
+# レンダラー → 本文のデータを作る関数
+# MessagePack は既定の形、Arrow は year / region / value の列で返す
+CO2_DATA_BUILDERS = {
+    JSONRenderer: co2_data,
+    ColumnarJSONRenderer: co2_columnar_data,
+    MessagePackRenderer: co2_data,
+    ArrowIPCRenderer: co2_table_data,
+}
+
+CO2_RENDERER_CLASSES = [JSONRenderer, ColumnarJSONRenderer, *BINARY_RENDERER_CLASSES]
+
+# 形式（?format= / Accept で選ばれたレンダラーの format）ごとのキャッシュ
+co2_response_caches: dict[str, tuple[type[BaseRenderer], VersionedResponseCache]] = {
+    renderer_class.format: (
+        renderer_class,
+        VersionedResponseCache(
+            (
+                "co2-data"
+                if renderer_class is JSONRenderer
+                else f"co2-data-{renderer_class.format}"
+            ),
+            CO2_GROUP_NAME,
+            _encoded(renderer_class, CO2_DATA_BUILDERS[renderer_class]),
+        ),
+    )
+    for renderer_class in CO2_RENDERER_CLASSES
+}
 
 
 class CO2DataByYearView(GenericAPIView):
     """
     フロント用 API
     /climate/co2-data/
+
+    ?format=columnar を指定すると years / regions / values（行列）の形で返す。
+    Accept（または ?format=msgpack / ?format=arrow）で MessagePack /
+    Arrow IPC（year: int16, region: 辞書エンコード文字列, value: float64）でも返す。
+    year / year_from / year_to / regions で絞り込める。
+    ?stream=true を指定すると JSON をストリーミングで返す（既定の形の JSON のみ）。
+    Accept-Encoding に応じて br / gzip で圧縮済みの本文を返す。
     """
 
     serializer_class = CO2DataByYearSerializer
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        ColumnarJSONRenderer,
+        *BINARY_RENDERER_CLASSES,
+    ]
+
+    @schema(
+        summary="CO2 排出量データ取得",
+        parameters=[ClimateDataFilterSerializer, StreamSerializer],
+    )
+    def get(self, request, *args, **kwargs):
+        filter_serializer = ClimateDataFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        filters = filter_serializer.filter_kwargs()
 
-    def get_queryset(self):
-        co2_info = CLIMATE_GROUPS["CO2"]
-        group_name = co2_info["group"]["name"]
-        name = co2_info["indicator"]["name"]
+        stream_serializer = StreamSerializer(data=request.query_params)
+        stream_serializer.is_valid(raise_exception=True)
 
-        indicator = get_object_or_404(
-            Indicator,
-            group__name=group_name,
-            name=name,
+        # ブラウザブル API などは JSON と同じ本文を返す
+        renderer_class, response_cache = co2_response_caches.get(
+            request.accepted_renderer.format, co2_response_caches[JSONRenderer.format]
         )
 
-        return ClimateData.objects.filter(indicator=indicator).select_related("region")
+        # ETag は絞り込み条件ごとに分ける
+        name = response_cache.name
+        if filters:
+            name = f"{name}-{filter_serializer.fingerprint()}"
 
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        if (
+            stream_serializer.validated_data["stream"]
+            and renderer_class is JSONRenderer
+        ):
+            # 大量データのエクスポート向け。キャッシュせず、読み出しながら返す
+            return conditional_get(
+                request,
+                f"{name}-stream",
+                CO2_GROUP_NAME,
+                lambda stamp: stream_co2_response(
+                    stamp.version_id if stamp is not None else None, filters
+                ),
+            )
 
-        # 年・国コードごとにまとめる
-        result = defaultdict(dict)
-        for cd in queryset:
-            result[cd.year][cd.region.code] = cd.value
+        # 圧縮方式ごとに本文の bytes が変わるため、ETag も分ける
+        encoding = choose_encoding(request)
+        if encoding is not None:
+            name = f"{name}-{encoding}"
 
-        serializer = self.get_serializer({"co2_data": dict(result)})
-        return Response(serializer.data)
+        # ETag が一致すれば 304、そうでなければ公開中バージョンごとに
+        # エンコード・圧縮済みの本文をキャッシュから返す（絞り込み時は都度作成）
+        return conditional_get(
+            request,
+            name,
+            CO2_GROUP_NAME,
+            lambda stamp: encoded_response(
+                response_cache.get(stamp, filters, encoding),
+                renderer_class.media_type,
+            ),
+        )
@@ -0,0 +1,327 @@
+from functools import partial
+from itertools import groupby
+from typing import Callable, Iterable
+
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.api.climate.cache import (
+    conditional_get,
+    filters_key,
+    get_dataset_stamp,
+    series_cache,
+)
+from apps.api.climate.downsampling import Downsampling
+from apps.api.climate.serializers.series import (
+    BatchRequestSerializer,
+    BatchResponseSerializer,
+    BatchSpecSerializer,
+    SeriesQuerySerializer,
+    SeriesSerializer,
+)
+from apps.climate_data.lookups import get_indicators
+from apps.climate_data.models import ClimateData
+from apps.climate_data.store import climate_store
+from utils.schema import schema
+
+
+def _series_item(
+    indicator_id: int, code: str, name: str, years: list, values: list
+) -> dict:
+    return {
+        "indicator": indicator_id,
+        "region": code,
+        "region_name": name,
+        "years": years,
+        "values": values,
+    }
+
+
+def _load_stored(indicator: dict, version_id: int, filters: dict) -> list[dict]:
+    """
+    公開中バージョンの 1 指標分のデータを、プロセス内のストアから地域ごとに返す
+    """
+    group_data = climate_store.get(indicator["group"], version_id)
+    return [
+        _series_item(indicator["id"], code, name, years.tolist(), values.tolist())
+        for code, name, years, values in group_data.region_series(
+            indicator["id"], filters
+        )
+    ]
+
+
+def _load_unversioned(indicator_ids: list[int], filters: dict) -> dict[int, list]:
+    """
+    バージョンなしのデータを、複数の指標まとめて 1 クエリで DB から読む
+    """
+    # (indicator, version, year, region) の索引（PostgreSQL では value も含む）で絞り込む
+    rows = (
+        ClimateData.objects.filter(
+            indicator_id__in=indicator_ids, version_id=None, **filters
+        )
+        .order_by("indicator_id", "region__code", "year")
+        .values_list("indicator_id", "region__code", "region__name", "year", "value")
+    )
+
+    result: dict[int, list] = {indicator_id: [] for indicator_id in indicator_ids}
+    for (indicator_id, code, name), region_rows in groupby(
+        rows, key=lambda row: row[:3]
+    ):
+        region_rows = list(region_rows)
+        result[indicator_id].append(
+            _series_item(
+                indicator_id,
+                code,
+                name,
+                [row[3] for row in region_rows],
+                [row[4] for row in region_rows],
+            )
+        )
+    return result
+
+
+def _downsample_items(items: list[dict], sampling: Downsampling) -> list[dict]:
+    """
+    地域ごとの時系列をそれぞれ sampling.max_points 点以下に間引く
+    """
+    result = []
+    for item in items:
+        indices = sampling.indices(item["years"], item["values"]).tolist()
+        result.append(
+            {
+                **item,
+                "years": [item["years"][i] for i in indices],
+                "values": [item["values"][i] for i in indices],
+            }
+        )
+    return result
+
+
+def _load_sampled(
+    cache_key: str, load: Callable[[], list[dict]], sampling: Downsampling
+) -> list[dict]:
+    """
+    間引く前の時系列（これもキャッシュする）を間引いて返す
+    """
+    return _downsample_items(series_cache.get_or_set(cache_key, load), sampling)
+
+
+# load_series() の戻り値のキー
+# (Indicator.id, filters_key(絞り込み条件), 間引き方)
+SeriesKey = tuple[int, str, Downsampling | None]
+
+
+def series_key(
+    indicator: dict, filters: dict, sampling: Downsampling | None = None
+) -> SeriesKey:
+    return indicator["id"], filters_key(filters), sampling
+
+
+def load_series(
+    requests: Iterable[tuple[dict, dict, Downsampling | None]],
+    version_ids: dict[str, int | None],
+) -> dict[SeriesKey, list[dict]]:
+    """
+    (指標の情報, 絞り込み条件, 間引き方) の組ごとに、地域ごとの時系列を地域コード順で返す。
+
+    - version_ids は IndicatorGroup.name → 公開中バージョンの ID（None はバージョンなしのデータ）
+    - 公開中バージョンはストアから読み、(指標, バージョン, 絞り込み条件, 間引き方) ごとに
+      キャッシュする（バージョンの内容は変わらないため無効化は不要）
+    - バージョンなしのデータは絞り込み条件ごとに 1 クエリでまとめて DB から読む
+    """
+    result: dict[SeriesKey, list[dict]] = {}
+    # filters_key → (絞り込み条件, その条件で読む SeriesKey)
+    unversioned: dict[str, tuple[dict, list[SeriesKey]]] = {}
+
+    for indicator, filters, sampling in requests:
+        key = series_key(indicator, filters, sampling)
+        if key in result:
+            continue
+
+        version_id = version_ids[indicator["group"]]
+        if version_id is None:
+            unversioned.setdefault(key[1], (filters, []))[1].append(key)
+            result[key] = []
+            continue
+
+        # 期限切れ後は裏で再計算されるため、ループ変数ではなく値を束縛する
+        cache_key = f"{indicator['id']}:v{version_id}:{key[1]}"
+        load = partial(_load_stored, indicator, version_id, filters)
+        if sampling is None:
+            result[key] = series_cache.get_or_set(cache_key, load)
+        else:
+            result[key] = series_cache.get_or_set(
+                f"{cache_key}:{sampling.key}",
+                partial(_load_sampled, cache_key, load, sampling),
+            )
+
+    for filters, keys in unversioned.values():
+        loaded = _load_unversioned(list({key[0] for key in keys}), filters)
+        for key in keys:
+            sampling = key[2]
+            items = loaded[key[0]]
+            result[key] = (
+                items if sampling is None else _downsample_items(items, sampling)
+            )
+
+    return result
+
+
+def _series_data(
+    indicators: list[dict],
+    filters: dict,
+    sampling: Downsampling | None,
+    loaded: dict[SeriesKey, list[dict]],
+) -> dict:
+    """
+    SeriesSerializer の形（indicators / series）にまとめる
+    """
+    return {
+        "indicators": [
+            {field: indicator[field] for field in ("id", "key", "name", "unit")}
+            for indicator in indicators
+        ],
+        "series": [
+            item
+            for indicator in indicators
+            for item in loaded[series_key(indicator, filters, sampling)]
+        ],
+    }
+
+
+def _select(refs: list[str], indicators: dict[str, dict]) -> list[dict]:
+    """
+    指定順の指標の情報（id と key の両方で指定された指標は 1 つにまとめる）
+    """
+    return list({indicators[ref]["id"]: indicators[ref] for ref in refs}.values())
+
+
+class SeriesAPIView(APIView):
+    """
+    汎用の時系列 API
+    /climate/series/?indicator=<id|key>&regions=...&from=...&to=...
+
+    任意の Indicator（複数可）・地域・年の範囲の時系列を、
+    指標・地域ごとの years / values の配列で返す。
+    """
+
+    @schema(
+        summary="時系列データ取得",
+        description=(
+            "Indicator.id または key（カンマ区切りで複数可、同じ指標グループのもの）を指定し、"
+            "指標・地域ごとの時系列を years / values の配列で返します。"
+            "regions（地域コード）/ from / to / year で絞り込めます。"
+        ),
+        responses=SeriesSerializer,
+        parameters=[SeriesQuerySerializer],
+    )
+    def get(self, request):
+        query = SeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        refs: list[str] = query.validated_data["indicator"]
+        filters = query.filter_kwargs()
+        sampling = query.downsampling()
+
+        indicators = get_indicators(refs)
+        missing = [ref for ref in refs if ref not in indicators]
+        if missing:
+            raise NotFound(f"Unknown indicator: {', '.join(missing)}")
+        selected = _select(refs, indicators)
+
+        # ETag / Last-Modified は指標グループの公開中バージョンで決まるため、
+        # 1 リクエストで指定できるのは 1 グループの指標だけ
+        group_names = {indicator["group"] for indicator in selected}
+        if len(group_names) > 1:
+            raise ValidationError(
+                {"indicator": ["All indicators must belong to the same group."]}
+            )
+        group_name = group_names.pop()
+
+        def respond(stamp) -> Response:
+            version_ids = {group_name: stamp.version_id if stamp else None}
+            loaded = load_series(
+                [(indicator, filters, sampling) for indicator in selected],
+                version_ids,
+            )
+            return Response(
+                _series_data(selected, filters, sampling, loaded),
+                status=status.HTTP_200_OK,
+            )
+
+        return conditional_get(
+            request, f"series-{query.fingerprint()}", group_name, respond
+        )
+
+
+class BatchAPIView(APIView):
+    """
+    時系列のバッチ取得 API
+    POST /climate/batch/
+
+    series API の条件（indicator / regions / from / to）を複数まとめて受け取り、
+    リクエストの id ごとの結果を 1 回の往復で返す。
+    """
+
+    @schema(
+        summary="時系列データの一括取得",
+        description=(
+            "series API と同じ条件（indicator / regions / from / to / year）を "
+            "requests に最大 50 件まで指定し、id ごとの結果を返します。"
+            "指標グループが異なる指標も 1 回で取得できます。"
+            "存在しない指標を指定した条件は errors に id ごとに返します。"
+        ),
+        request=BatchRequestSerializer,
+        responses=BatchResponseSerializer,
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        specs: list[dict] = serializer.validated_data["requests"]
+
+        # 指標の解決は全条件まとめて 1 回（キャッシュ）
+        indicators = get_indicators(ref for spec in specs for ref in spec["indicator"])
+
+        results: dict[str, dict] = {}
+        errors: dict[str, str] = {}
+        # (id, 指標の情報, 絞り込み条件, 間引き方)
+        requests: list[tuple[str, list[dict], dict, Downsampling | None]] = []
+        for spec in specs:
+            missing = [ref for ref in spec["indicator"] if ref not in indicators]
+            if missing:
+                errors[spec["id"]] = f"Unknown indicator: {', '.join(missing)}"
+                continue
+            requests.append(
+                (
+                    spec["id"],
+                    _select(spec["indicator"], indicators),
+                    BatchSpecSerializer.kwargs_from(spec),
+                    BatchSpecSerializer.downsampling_from(spec),
+                )
+            )
+
+        # 公開中バージョンは指標グループごとに 1 回だけ調べる
+        version_ids: dict[str, int | None] = {}
+        for group_name in {
+            indicator["group"]
+            for _, selected, _, _ in requests
+            for indicator in selected
+        }:
+            stamp = get_dataset_stamp(group_name)
+            version_ids[group_name] = stamp.version_id if stamp else None
+
+        loaded = load_series(
+            (
+                (indicator, filters, sampling)
+                for _, selected, filters, sampling in requests
+                for indicator in selected
+            ),
+            version_ids,
+        )
+        for spec_id, selected, filters, sampling in requests:
+            results[spec_id] = _series_data(selected, filters, sampling, loaded)
+
+        return Response(
+            {"results": results, "errors": errors}, status=status.HTTP_200_OK
+        )
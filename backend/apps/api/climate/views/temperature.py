@@ -1,11 +1,36 @@
-from typing import Dict, List, Optional, TypedDict
+from functools import partial
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, TypedDict
 
+import numpy as np
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from apps.api.climate.cache import (
+    DatasetStamp,
+    conditional_get,
+    filters_key,
+    series_cache,
+)
+from apps.api.climate.downsampling import Downsampling
+from apps.api.climate.renderers import BINARY_RENDERER_CLASSES, ArrowIPCRenderer
+from apps.api.climate.serializers.filters import (
+    ClimateDataFilterSerializer,
+    DownsampleSerializer,
+    StreamSerializer,
+)
+from apps.api.climate.streaming import (
+    STREAM_CHUNK_SIZE,
+    iter_json_chunks,
+    temperature_parts,
+)
 from apps.climate_data.constants import CLIMATE_GROUPS
-from apps.climate_data.models import ClimateData, Indicator
+from apps.climate_data.lookups import get_indicator_ids
+from apps.climate_data.models import ClimateData
+from apps.climate_data.store import climate_store
 from utils.constants import APITag
 from utils.schema import schema
 
@@ -45,8 +70,8 @@ class TemperatureAPIView(APIView):
     # NOTE:
     # 現在は Indicator.name をロジックキーとして使用している。
     # 表示名変更の予定がないため暫定的にこの形を採用。
-    # 将来的には Indicator.key（不変識別子）をモデルに追加し、
-    # constants / DB / API を key ベースで統一する想定。
+    # Indicator.key（不変識別子）は追加済みで、汎用の series API は key で指定できる。
+    # 将来的にはこの View も constants / DB / API を key ベースで統一する想定。
 
     # Indicator名とフィールド名の対応マップ
     temperature_indicator_defs = CLIMATE_GROUPS["TEMPERATURE"]["indicators"]
@@ -67,92 +92,217 @@ class TemperatureAPIView(APIView):
         GLOBAL_AVG_NAME: "global_average",
     }
 
+    # フィールド名 → フィールド名（ストアから組み立てた行をストリーミングするとき用）
+    FIELD_IDENTITY_MAP = {
+        field: field for field in INDICATOR_NAME_TO_FIELD_MAP.values()
+    }
+
+    # Accept（または ?format=msgpack / ?format=arrow）で MessagePack / Arrow IPC でも返す
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        *BINARY_RENDERER_CLASSES,
+    ]
+
     @schema(
         summary="気温データ取得",
         description=(
             "地域・年ごとの気温データを返します。"
             "upper, lower, global_average を含みます。"
+            "year / year_from / year_to / regions（地域コード）で絞り込めます。"
+            "stream=true の場合は JSON をストリーミングで返します。"
+            "max_points を指定すると、地域ごとに max_points 点以下に間引いて返します"
+            "（upper / lower は global_average で選んだ年の値。ストリーミングはしない）。"
+            "Accept: application/msgpack / application/vnd.apache.arrow.stream で"
+            "MessagePack / Arrow IPC（列指向）形式でも返します。"
         ),
         tags=[APITag.TEMPERATURE.value],
         responses=TemperatureDataByRegion,
+        parameters=[
+            ClimateDataFilterSerializer,
+            StreamSerializer,
+            DownsampleSerializer,
+        ],
     )
     def get(self, request):
         """
         地域・年ごとの気温データを取得し、JSONとして返す。
-        """
 
-        # ===============================
-        # 🔹 Temperature グループ名を取得
-        # ===============================
-        # constants で定義されている Temperature グループの表示名を使用
+        データが変わっていなければ（If-None-Match / If-Modified-Since が一致すれば）
+        本体のクエリを実行せずに 304 を返す。
+        """
         group_name: str = CLIMATE_GROUPS["TEMPERATURE"]["group"]["name"]
 
+        filter_serializer = ClimateDataFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        filters = filter_serializer.filter_kwargs()
+
+        stream_serializer = StreamSerializer(data=request.query_params)
+        stream_serializer.is_valid(raise_exception=True)
+
+        sampling_serializer = DownsampleSerializer(data=request.query_params)
+        sampling_serializer.is_valid(raise_exception=True)
+        sampling = sampling_serializer.downsampling()
+
+        # バイナリ形式（MessagePack / Arrow）と間引く場合はストリーミングしない
+        renderer_format: str = request.accepted_renderer.format
+        binary = renderer_format in {
+            renderer_class.format for renderer_class in BINARY_RENDERER_CLASSES
+        }
+        stream: bool = (
+            stream_serializer.validated_data["stream"]
+            and not binary
+            and sampling is None
+        )
+
+        # ETag は絞り込み条件・間引き方・形式ごとに分ける
+        name = "temperature"
+        if filters:
+            name = f"{name}-{filter_serializer.fingerprint()}"
+        if sampling is not None:
+            name = f"{name}-{sampling.key}"
+        if binary:
+            name = f"{name}-{renderer_format}"
+        if stream:
+            name = f"{name}-stream"
+
+        return conditional_get(
+            request,
+            name,
+            group_name,
+            lambda stamp: self._build_response(
+                group_name, filters, stream, renderer_format, stamp, sampling
+            ),
+        )
+
+    def _build_response(
+        self,
+        group_name: str,
+        filters: dict,
+        stream: bool,
+        renderer_format: str,
+        stamp: Optional[DatasetStamp] = None,
+        sampling: Optional[Downsampling] = None,
+    ) -> Response | StreamingHttpResponse:
+        """
+        ClimateData を集計してレスポンスを作成する。
+
+        - 公開中バージョンがあるグループ（通常はこちら）: プロセス内のストアの配列をピボットする
+          （DB を読むのはストアへの初回の読み込み時だけ）
+        - バージョンなしのデータしかないグループ（最初の公開前）: DB から地域名・年の順に読み、
+          _pivot_db_rows() で 1 行にまとめる
+        """
+
         # ===============================
         # 🔹 Temperature グループに属する3つの Indicator を取得
         # ===============================
         # 現在は Indicator.name をキーとして使用しているため、
         # name が INDICATOR_NAME_TO_FIELD_MAP に含まれるものだけを取得する
-        indicators_qs = Indicator.objects.filter(
-            group__name=group_name,
-            name__in=self.INDICATOR_NAME_TO_FIELD_MAP.keys(),
+        # （Indicator.name → id。件数の確認もこの結果で行う。結果はキャッシュする）
+        indicator_ids: Dict[str, int] = get_indicator_ids(
+            group_name, self.INDICATOR_NAME_TO_FIELD_MAP.keys()
         )
 
         # 想定している 3 指標（upper / lower / global_average）が
         # すべて揃っていない場合はエラーとする
-        if indicators_qs.count() != 3:
+        if len(indicator_ids) != 3:
             return Response(
                 {"detail": "Not all temperature indicators found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        fields = list(self.INDICATOR_NAME_TO_FIELD_MAP.values())
+
         # ===============================
-        # 🔹 ClimateData をまとめて取得
+        # 🔹 公開中バージョンはメモリ上のストアから取得
         # ===============================
-        # Indicator ごとにクエリを発行せず、
-        # 必要なデータを一括で取得する
-        climate_qs = (
-            ClimateData.objects.filter(indicator__in=indicators_qs)
-            .select_related("region", "indicator")
-            .order_by("year")
-        )
+        # バージョンの内容は変わらないため、プロセス内に読み込んだ配列を使い回す
+        # （DB へのクエリは初回の読み込み時だけ）
+        if stamp is not None and stamp.version_id is not None:
+            if sampling is not None:
+                # 間引いた結果は (バージョン, 絞り込み条件, 間引き方) ごとにキャッシュする
+                # （期限切れ後は裏で再計算されるため、値を束縛した partial を渡す）
+                rows = series_cache.get_or_set(
+                    f"temperature:v{stamp.version_id}:{filters_key(filters)}"
+                    f":{sampling.key}",
+                    partial(
+                        self._sampled_store_rows,
+                        group_name,
+                        stamp.version_id,
+                        indicator_ids,
+                        filters,
+                        sampling,
+                    ),
+                )
+                return self._pivot_response(rows, fields, renderer_format)
+
+            if stream:
+                # ピボットした配列を STREAM_CHUNK_SIZE 行ずつ Python の値に変換しながら
+                # 書き出す（全行のリストは作らない）
+                rows = self._iter_store_rows(
+                    group_name, stamp.version_id, indicator_ids, filters
+                )
+                return StreamingHttpResponse(
+                    iter_json_chunks(
+                        temperature_parts(
+                            self._unpivot(rows, fields), self.FIELD_IDENTITY_MAP
+                        )
+                    ),
+                    content_type="application/json",
+                )
+
+            rows = self._store_rows(
+                group_name, stamp.version_id, indicator_ids, filters
+            )
+            return self._pivot_response(rows, fields, renderer_format)
 
         # ===============================
-        # 🔹 データ格納用辞書
+        # 🔹 ClimateData をまとめて取得（最初の公開前のバージョンなしのデータ）
         # ===============================
-        # 構造:
-        # {
-        #   "World": {
-        #       1900: {"year": 1900, "upper": ..., "lower": ..., "global_average": ...},
-        #       1901: {...},
-        #   },
-        #   "Northern Hemisphere": {...}
-        # }
-        result: Dict[str, Dict[int, YearlyTemperature]] = {}
+        # 公開中バージョンは上でストアから返すため、ここに来るのは
+        # バージョンなしのデータしかないグループだけ
+        # Indicator ごとにクエリを発行せず、必要なデータを地域名・年の順に一括で取得する
+        # 年・地域の絞り込みも DB 側で行う
+        rows = (
+            ClimateData.objects.published()
+            .filter(indicator_id__in=indicator_ids.values(), **filters)
+            .order_by("region__name", "year")
+            .values_list("region__name", "year", "indicator__name", "value")
+        )
 
         # ===============================
-        # 🔹 ClimateData を処理
+        # 🔹 ストリーミング
         # ===============================
-        for item in climate_qs:
-            region_name: str = item.region.name
-            year: int = item.year
-
-            # Indicator.name から API レスポンス用フィールド名に変換
-            # 例: "Temperature anomaly (upper bound)" -> "upper"
-            field_name: str = self.INDICATOR_NAME_TO_FIELD_MAP[item.indicator.name]
+        # サーバーサイドカーソルで読み出しながら JSON を書き出す
+        # （全件を辞書に組み立てないため、メモリ使用量は件数に依存しない）
+        if stream:
+            return StreamingHttpResponse(
+                iter_json_chunks(
+                    temperature_parts(
+                        rows.iterator(chunk_size=STREAM_CHUNK_SIZE),
+                        self.INDICATOR_NAME_TO_FIELD_MAP,
+                    )
+                ),
+                content_type="application/json",
+            )
 
-            # ===============================
-            # 🔹 region / year の初期化
-            # ===============================
-            region_data = result.setdefault(region_name, {})
-            year_data = region_data.setdefault(year, {"year": year})
+        # 地域・年ごとに 1 行にまとめる（ストアの pivot() と同じ形の行にする）
+        rows = self._pivot_db_rows(rows, fields)
+        if sampling is not None:
+            rows = self._downsample(rows, fields, sampling)
+        return self._pivot_response(rows, fields, renderer_format)
 
-            # ===============================
-            # 🔹 該当フィールドに値を格納
-            # ===============================
-            year_data[field_name] = item.value
+    def _pivot_response(
+        self, rows: Iterable[tuple], fields: List[str], renderer_format: str
+    ) -> Response:
+        """
+        ピボット済みの行（地域名, year, 各指標の値...）からレスポンスを作成する
+        """
+        # Arrow は year / region / upper / lower / global_average の列で返す
+        if renderer_format == ArrowIPCRenderer.format:
+            return Response(self._to_columns(rows, fields), status=status.HTTP_200_OK)
 
         # ===============================
-        # 🔹 year ごとの dict を list に変換してソート
+        # 🔹 地域ごとの list に変換
         # ===============================
         # API の返却形式:
         # {
@@ -162,9 +312,143 @@ class TemperatureAPIView(APIView):
         #   ],
         #   ...
         # }
-        formatted_result: TemperatureDataByRegion = {
-            region: [data for _, data in sorted(year_dict.items())]
-            for region, year_dict in result.items()
-        }
+        # データのない指標（集計結果が None）のフィールドは含めない
+        formatted_result: TemperatureDataByRegion = {}
+        for region_name, year, *values in rows:
+            year_data: YearlyTemperature = {"year": year}
+            year_data.update(
+                {
+                    field: value
+                    for field, value in zip(fields, values)
+                    if value is not None
+                }
+            )
+            formatted_result.setdefault(region_name, []).append(year_data)
 
         return Response(formatted_result, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _iter_store_rows(
+        group_name: str,
+        version_id: int,
+        indicator_ids: Dict[str, int],
+        filters: dict,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[tuple]:
+        """
+        ストア上でピボットし、(地域名, year, 各指標の値...) の行を返す（値がなければ None）。
+
+        ピボットした配列は chunk_size 行ずつ Python の値に変換する（Rows.tuples() と同じ）。
+        """
+        names, years, columns = climate_store.get(group_name, version_id).pivot(
+            {
+                field: indicator_ids[name]
+                for name, field in TemperatureAPIView.INDICATOR_NAME_TO_FIELD_MAP.items()
+            },
+            filters,
+        )
+        for start in range(0, len(names), chunk_size):
+            stop = start + chunk_size
+            values = [
+                np.where(
+                    np.isnan(column[start:stop]), None, column[start:stop]
+                ).tolist()
+                for column in columns.values()
+            ]
+            yield from zip(
+                names[start:stop].tolist(), years[start:stop].tolist(), *values
+            )
+
+    @staticmethod
+    def _store_rows(
+        group_name: str, version_id: int, indicator_ids: Dict[str, int], filters: dict
+    ) -> List[tuple]:
+        """
+        ストア上でピボットした (地域名, year, 各指標の値...) の行をリストで返す
+        """
+        return list(
+            TemperatureAPIView._iter_store_rows(
+                group_name, version_id, indicator_ids, filters
+            )
+        )
+
+    @staticmethod
+    def _pivot_db_rows(
+        rows: Iterable[tuple[str, int, str, float]], fields: List[str]
+    ) -> Iterator[tuple]:
+        """
+        (地域名, year, 指標名, value) の行（地域名・年の順）を
+        (地域名, year, 各指標の値...) の行にまとめる（値がなければ None）
+        """
+        field_map = TemperatureAPIView.INDICATOR_NAME_TO_FIELD_MAP
+        for (region_name, year), group in groupby(rows, key=lambda row: row[:2]):
+            values = {field_map[name]: value for _, _, name, value in group}
+            yield (region_name, year, *(values.get(field) for field in fields))
+
+    @staticmethod
+    def _sampled_store_rows(
+        group_name: str,
+        version_id: int,
+        indicator_ids: Dict[str, int],
+        filters: dict,
+        sampling: Downsampling,
+    ) -> List[tuple]:
+        """
+        ストア上でピボットした行を地域ごとに間引いて返す
+        """
+        return TemperatureAPIView._downsample(
+            TemperatureAPIView._store_rows(
+                group_name, version_id, indicator_ids, filters
+            ),
+            list(TemperatureAPIView.INDICATOR_NAME_TO_FIELD_MAP.values()),
+            sampling,
+        )
+
+    @staticmethod
+    def _downsample(
+        rows: Iterable[tuple], fields: List[str], sampling: Downsampling
+    ) -> List[tuple]:
+        """
+        ピボット済みの行（地域名・年の順）を地域ごとに sampling.max_points 行以下に間引く。
+
+        残す年は global_average の値で選び、その年の行をそのまま残す
+        （upper / lower の信頼区間も同じ年の値になり、ずれない）
+        """
+        value_index = 2 + fields.index("global_average")
+        result: List[tuple] = []
+        for _, region_rows in groupby(rows, key=lambda row: row[0]):
+            region_rows = list(region_rows)
+            indices = sampling.indices(
+                [row[1] for row in region_rows],
+                [row[value_index] for row in region_rows],
+            )
+            result.extend(region_rows[i] for i in indices.tolist())
+        return result
+
+    @staticmethod
+    def _unpivot(
+        rows: Iterable[tuple], fields: List[str]
+    ) -> Iterator[tuple[str, int, str, float]]:
+        """
+        ピボット済みの行を temperature_parts() が受け取る (地域名, year, フィールド名, value) に戻す
+        """
+        for region_name, year, *values in rows:
+            for field, value in zip(fields, values):
+                if value is not None:
+                    yield region_name, year, field, value
+
+    @staticmethod
+    def _to_columns(rows, fields: List[str]) -> Dict[str, list]:
+        """
+        ピボット済みの行（地域名, year, 各指標の値...）を列ごとのリスト（Arrow 用）に変換する
+        """
+        columns: Dict[str, list] = {"year": [], "region": []}
+        columns.update({field: [] for field in fields})
+
+        for region_name, year, *values in rows:
+            columns["year"].append(year)
+            columns["region"].append(region_name)
+            for field, value in zip(fields, values):
+                columns[field].append(value)
+
+        return columns
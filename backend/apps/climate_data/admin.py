@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
 
 
 class RegionAdmin(admin.ModelAdmin):
@@ -9,28 +15,43 @@ class RegionAdmin(admin.ModelAdmin):
 
 
 class IndicatorGroupAdmin(admin.ModelAdmin):
-    list_display = ("name",)
+    list_display = ("name", "active_version")
     search_fields = ("name",)
 
 
+class DatasetVersionAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "group",
+        "status",
+        "source_sha256",
+        "created_at",
+        "published_at",
+        "retired_at",
+    )
+    list_filter = ("group", "status")
+    readonly_fields = ("created_at", "published_at", "retired_at")
+
+
 class IndicatorAdmin(admin.ModelAdmin):
-    list_display = ("name", "group", "unit", "data_source_name")
+    list_display = ("name", "key", "group", "unit", "data_source_name")
     list_filter = ("group",)
-    search_fields = ("name",)
+    search_fields = ("name", "key")
 
 
 class ClimateDataAdmin(admin.ModelAdmin):
-    list_display = ("region", "indicator", "year", "value", "updated_at")
-    list_filter = ("indicator", "region")
+    list_display = ("region", "indicator", "year", "value", "version", "updated_at")
+    list_filter = ("indicator", "version", "region")
     search_fields = ("region__name", "indicator__name")
     ordering = ("indicator", "region", "year")
     readonly_fields = ("updated_at",)
 
     # ここで関連テーブルをまとめて取得
-    list_select_related = ("region", "indicator")
+    list_select_related = ("region", "indicator", "version")
 
 
 admin.site.register(Region, RegionAdmin)
 admin.site.register(IndicatorGroup, IndicatorGroupAdmin)
+admin.site.register(DatasetVersion, DatasetVersionAdmin)
 admin.site.register(Indicator, IndicatorAdmin)
 admin.site.register(ClimateData, ClimateDataAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ClimateDataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.climate_data'
+
+    def ready(self):
+        from apps.climate_data import receivers  # noqa: F401
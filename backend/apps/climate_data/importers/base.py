@@ -0,0 +1,539 @@
+import queue
+import threading
+from dataclasses import dataclass, field
+from itertools import repeat
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.importers.incremental import plan_incremental
+from apps.climate_data.models import (
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+from apps.climate_data.utils.loaders import load_climate_data
+from apps.climate_data.utils.parse_helpers import (
+    parse_float_array,
+    parse_str_array,
+    parse_year_array,
+)
+from apps.climate_data.utils.source_cache import CachedSource, fetch_source
+from apps.climate_data.utils.upsert_helpers import (
+    ClimateRecord,
+    UpsertResult,
+    iter_batches,
+)
+
+
+class ParsedChunk(NamedTuple):
+    """
+    パース済みの CSV の 1 チャンク（カラム単位の配列）。
+
+    Year が有効で、いずれかの指標の値がある行だけを含む。
+    DB に依存しない（Region / Indicator の ID を持たない）ため、
+    ワーカースレッドで生成できる。
+    """
+
+    # 地域コード / 地域名（object 配列。Code が空の行は Region.generate_code() のコード）
+    region_codes: np.ndarray
+    region_names: np.ndarray
+    # int64
+    years: np.ndarray
+    # CSV カラム名 → float64 の配列（値がない位置は NaN）
+    values: dict[str, np.ndarray]
+
+
+def owid_region_keys(
+    codes: np.ndarray, entities: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Region.owid_key() のバッチ版。Code / Entity の配列から (地域コード, 地域名) の配列を返す。
+
+    Code が空の行のコードは、Entity の種類ごとに 1 回だけ生成する。
+    """
+    missing = codes == ""
+    if missing.any():
+        unique, inverse = np.unique(entities[missing], return_inverse=True)
+        generated = [Region.generate_code(entity=entity) for entity in unique.tolist()]
+        codes = codes.copy()
+        codes[missing] = np.array(generated, dtype=object)[inverse]
+
+    return codes, entities
+
+
+class ChunkQueue:
+    """
+    パース済みのチャンクをワーカースレッドから書き込みスレッドへ渡す有界キュー。
+
+    maxsize 個より多くのチャンクは保持しない（書き込みが追いつくまでパースが待つ）ため、
+    メモリ使用量は CSV サイズに依存しない。
+    パースの終了は None、パースの失敗は例外そのものを流して書き込み側に伝える。
+    """
+
+    # 書き込み側が close() したかを確認する間隔（秒）
+    POLL_SECONDS = 0.1
+
+    def __init__(self, maxsize: int):
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+
+    def put(self, item: ParsedChunk | BaseException | None) -> bool:
+        """
+        item を渡す。書き込み側が close() した場合は False を返す（パースを中断する）
+        """
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=self.POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close(self) -> None:
+        """
+        書き込み側が読み取りをやめたことをパース側に伝える
+        """
+        self._closed.set()
+
+    def __iter__(self) -> Iterator[ParsedChunk]:
+        while (item := self._queue.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+# Stopwatch.iterate() の終端
+_END = object()
+
+
+class Stopwatch:
+    """
+    イテレータから次の要素を取り出すのにかかった時間だけを積算する
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def iterate(self, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            start = perf_counter()
+            item = next(iterator, _END)
+            self.seconds += perf_counter() - start
+            if item is _END:
+                return
+            yield item
+
+
+@dataclass
+class ImportReport:
+    """
+    1 ソース分のインポート結果と所要時間
+    """
+
+    name: str
+    result: UpsertResult = field(default_factory=UpsertResult)
+    skipped: bool = False
+    sha256: str = ""
+    download_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    write_seconds: float = 0.0
+    # 差分インポートの結果（例: "incremental from 2021"）
+    mode: str = ""
+
+    def summary(self) -> str:
+        if self.skipped:
+            sha = self.sha256[:12]
+            return f"Nothing changed since the last import (sha256={sha})."
+
+        summary = (
+            f"Import completed: {self.result.created} created, "
+            f"{self.result.updated} updated, {self.result.unchanged} unchanged."
+        )
+        if self.mode:
+            summary += f" ({self.mode})"
+
+        return summary
+
+
+class OWIDImporter:
+    """
+    OWID の CSV を取り込むインポーターの基底クラス。
+
+    処理は 3 段階に分かれている。
+    - fetch: ダウンロード（条件付きリクエスト / ディスクキャッシュ）
+    - parse: CSV 行 → ParsedChunk（カラム単位の配列。DB アクセスなし）
+    - write: Region / Indicator の解決と ClimateData の一括 upsert
+
+    並列インポート（import_all）では fetch / parse をワーカースレッドで行い、
+    パース済みのチャンクを ChunkQueue で単一の書き込みスレッドに渡す。
+
+    write は新しい DatasetVersion に書き込み、完了後に公開する（blue/green）。
+    読み取り側は書き込み中も公開中のバージョンを参照し続ける。
+
+    サブクラスは group_key を定義する（定義すると IMPORTERS に登録される）。
+    指標の定義は CLIMATE_GROUPS の設定から作るため、専用のサブクラスがないグループは
+    registry.py が汎用のサブクラスを作る。
+    loader は apps.climate_data.utils.loaders.LOADER_CHOICES のいずれか。
+    incremental=True の場合は直近の変更ウィンドウだけを書き込む（incremental.py）。
+    """
+
+    # CLIMATE_GROUPS のキー
+    group_key: str = ""
+
+    # group_key → 専用のサブクラス
+    IMPORTERS: dict[str, type["OWIDImporter"]] = {}
+
+    # カラム単位でまとめてパースする行数
+    PARSE_BATCH_SIZE = 5000
+
+    # 並列インポートで、書き込み待ちとして保持するチャンク数の上限（ChunkQueue）
+    PARSE_QUEUE_SIZE = 4
+
+    def __init__(
+        self,
+        *,
+        force: bool = False,
+        loader: str = "auto",
+        incremental: bool = False,
+        source_url: str | None = None,
+    ):
+        self.force = force
+        self.loader = loader
+        self.incremental = incremental
+        self._group: IndicatorGroup | None = None
+        self._indicator_ids: dict[str, int] | None = None
+        # 地域コード → Region.pk（resolve() がチャンクごとに未解決の地域だけを解決する）
+        self._region_ids: dict[str, int] = {}
+        self.config = CLIMATE_GROUPS[self.group_key]
+        # ローカルの CSV（generate_synthetic_climate --csv-dir の出力など）で
+        # 置き換える場合に指定する
+        self.source_url = source_url
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.group_key:
+            OWIDImporter.IMPORTERS[cls.group_key] = cls
+
+    @property
+    def csv_url(self) -> str:
+        return self.source_url or self.config["source"]["csv_url"]
+
+    def indicator_defs(self) -> dict[str, dict]:
+        """
+        CSV カラム名 → Indicator の get_or_create 引数（name / defaults）。
+
+        CLIMATE_GROUPS の indicators（カラム名 → 指標の設定）または
+        indicator（column_key を持つ 1 指標の設定）から作る。
+        データソースの名前 / URL は、指標の設定になければ source の設定を使う。
+        """
+        source = self.config["source"]
+        if "indicators" in self.config:
+            indicators = self.config["indicators"]
+        else:
+            indicator = self.config["indicator"]
+            indicators = {indicator["column_key"]: indicator}
+
+        return {
+            column_key: {
+                "name": indicator_def["name"],
+                "defaults": {
+                    "unit": indicator_def["unit"],
+                    "description": indicator_def["description"],
+                    "data_source_name": indicator_def.get(
+                        "data_source_name", source.get("data_source_name", "")
+                    ),
+                    "data_source_url": indicator_def.get(
+                        "data_source_url", source.get("data_source_url", "")
+                    ),
+                    "metadata_url": source.get("meta_url", ""),
+                },
+            }
+            for column_key, indicator_def in indicators.items()
+        }
+
+    # =============================
+    # fetch
+    # =============================
+    def fetch(self, report: ImportReport) -> CachedSource | None:
+        """
+        ソースを取得する。前回インポート時から変化がなければ None を返す。
+        """
+        start = perf_counter()
+        source = fetch_source(self.csv_url)
+        report.download_seconds = perf_counter() - start
+        report.sha256 = source.sha256
+
+        if source.is_imported and not self.force:
+            report.skipped = True
+            return None
+
+        return source
+
+    # =============================
+    # parse
+    # =============================
+    def parse(self, source: CachedSource) -> Iterator[ParsedChunk]:
+        """
+        CSV を PARSE_BATCH_SIZE 行ずつのチャンクに分け、カラム単位でまとめてパースする。
+
+        地域コードの生成まで配列のまま行い、1 値ごとのオブジェクトは作らない。
+        """
+        column_keys = list(self.indicator_defs())
+
+        for chunk in iter_batches(source.rows(), self.PARSE_BATCH_SIZE):
+            years, keep = parse_year_array([row.get("Year") for row in chunk])
+            if not keep.any():
+                continue
+
+            values = {
+                column_key: parse_float_array([row.get(column_key) for row in chunk])[0]
+                for column_key in column_keys
+            }
+            # 値が 1 つもない行の地域は作成しない
+            keep &= np.any([~np.isnan(column) for column in values.values()], axis=0)
+            if not keep.any():
+                continue
+
+            codes, names = owid_region_keys(
+                parse_str_array([row.get("Code") for row in chunk])[keep],
+                parse_str_array([row.get("Entity") for row in chunk])[keep],
+            )
+            yield ParsedChunk(
+                codes,
+                names,
+                years[keep],
+                {column_key: column[keep] for column_key, column in values.items()},
+            )
+
+    # =============================
+    # write
+    # =============================
+    def get_group(self) -> IndicatorGroup:
+        """
+        IndicatorGroup を取得 or 作成する
+        """
+        if self._group is None:
+            group_conf = self.config["group"]
+            self._group, _ = IndicatorGroup.objects.get_or_create(
+                name=group_conf["name"],
+                defaults={"description": group_conf["description"]},
+            )
+
+        return self._group
+
+    def get_indicator_ids(self) -> dict[str, int]:
+        """
+        Indicator を取得 or 作成し、CSV カラム名 → Indicator.pk を返す
+        """
+        if self._indicator_ids is not None:
+            return self._indicator_ids
+
+        group = self.get_group()
+
+        indicator_ids: dict[str, int] = {}
+        for column_key, indicator_def in self.indicator_defs().items():
+            indicator, _ = Indicator.objects.get_or_create(
+                group=group,
+                name=indicator_def["name"],
+                defaults={**indicator_def["defaults"], "key": column_key},
+            )
+            # key の導入前に作成された Indicator には key を設定する
+            if indicator.key is None:
+                indicator.key = column_key
+                indicator.save(update_fields=["key"])
+            indicator_ids[column_key] = indicator.pk
+
+        self._indicator_ids = indicator_ids
+        return indicator_ids
+
+    def resolve(self, chunks: Iterable[ParsedChunk]) -> Iterator[ClimateRecord]:
+        """
+        ParsedChunk の地域コード・カラム名を Region / Indicator の ID に置き換える。
+
+        - 未解決の地域はチャンクごとに Region.bulk_resolve() でまとめて解決する
+          （クエリ数は行数ではなくチャンク数に比例する）
+        - 地域コード → Region.pk の置き換えはチャンク内の地域の種類ごとに 1 回だけ行う
+        """
+        indicator_ids = self.get_indicator_ids()
+        region_ids = self._region_ids
+
+        for chunk in chunks:
+            codes, index, inverse = np.unique(
+                chunk.region_codes, return_index=True, return_inverse=True
+            )
+            codes = codes.tolist()
+            missing = {
+                code: name
+                for code, name in zip(codes, chunk.region_names[index].tolist())
+                if code not in region_ids
+            }
+            if missing:
+                region_ids.update(Region.bulk_resolve(missing))
+
+            region_pks = np.array([region_ids[code] for code in codes], dtype=np.int64)[
+                inverse
+            ]
+
+            for column_key, values in chunk.values.items():
+                valid = ~np.isnan(values)
+                yield from map(
+                    ClimateRecord,
+                    region_pks[valid].tolist(),
+                    repeat(indicator_ids[column_key]),
+                    chunk.years[valid].tolist(),
+                    values[valid].tolist(),
+                )
+
+    def write(
+        self,
+        chunks: Callable[[], Iterable[ParsedChunk]],
+        report: ImportReport,
+    ) -> UpsertResult:
+        """
+        新しい DatasetVersion を作成して書き込み、完了後に公開する。
+
+        1. 新バージョンに変更のあった行だけを書き込む（読み取り側には見えない）。
+           変わらない行は以前のバージョンの行がそのまま新バージョンからも見える
+        2. publish() でポインタを切り替える
+
+        何も変わらなかった場合は新バージョンを破棄し、公開中のバージョンを使い続ける。
+        書き込みに失敗した場合も新バージョンを破棄する。
+        """
+        group = self.get_group()
+        previous_version_id = (
+            IndicatorGroup.objects.filter(pk=group.pk)
+            .values_list("active_version_id", flat=True)
+            .get()
+        )
+        version = DatasetVersion.begin(group, source_sha256=report.sha256)
+
+        try:
+            # バージョン導入前のデータは初回だけ新バージョンに取り込む
+            if previous_version_id is None:
+                version.copy_unversioned_rows()
+            result = self.load(chunks, report, version, previous_version_id)
+        except Exception:
+            version.delete()
+            raise
+
+        # バージョンなしのデータしかない場合は、変更がなくても初回公開する
+        if result.written or previous_version_id is None:
+            version.publish()
+        else:
+            version.delete()
+
+        DatasetVersion.collect_garbage()
+        return result
+
+    def load(
+        self,
+        chunks: Callable[[], Iterable[ParsedChunk]],
+        report: ImportReport,
+        version: DatasetVersion,
+        previous_version_id: int | None,
+    ) -> UpsertResult:
+        """
+        version に ClimateData を一括 upsert する。
+
+        chunks は ParsedChunk を返す関数（差分判定で全件インポートに
+        切り替える場合に読み直すため）。
+        """
+        if self.incremental:
+            plan = plan_incremental(
+                self.resolve(chunks()),
+                self.get_indicator_ids().values(),
+                version_id=previous_version_id,
+            )
+            if plan.is_incremental:
+                report.mode = f"incremental from {plan.window_start}"
+                return load_climate_data(
+                    plan.records, version_id=version.pk, loader=self.loader
+                )
+
+            report.mode = f"full import: {plan.fallback_reason}"
+
+        return load_climate_data(
+            self.resolve(chunks()),
+            version_id=version.pk,
+            loader=self.loader,
+        )
+
+    # =============================
+    # 実行
+    # =============================
+    def prepare(self) -> tuple[ImportReport, CachedSource | None]:
+        """
+        ダウンロードを行う（DB アクセスなし）。取り込み不要なら source は None
+        """
+        report = ImportReport(name=self.group_key)
+        return report, self.fetch(report)
+
+    def parse_into(
+        self, source: CachedSource, chunks: ChunkQueue, report: ImportReport
+    ) -> None:
+        """
+        CSV をパースし、チャンクを chunks に渡す（並列インポートのワーカースレッド用）。
+
+        書き込みは write_parsed() が別スレッドで行う。
+        """
+        stopwatch = Stopwatch()
+        try:
+            for chunk in stopwatch.iterate(self.parse(source)):
+                if not chunks.put(chunk):
+                    return
+        except Exception as exc:
+            chunks.put(exc)
+            return
+
+        report.parse_seconds += stopwatch.seconds
+        chunks.put(None)
+
+    def write_parsed(
+        self, report: ImportReport, source: CachedSource, chunks: Iterable[ParsedChunk]
+    ) -> ImportReport:
+        """
+        パース済みのチャンクを書き込み、インポート成功を記録する。
+
+        chunks は 1 回しか読めない（ChunkQueue など）。差分インポートから
+        全件インポートに切り替える場合は、キャッシュ済みの CSV をこのスレッドで
+        もう一度パースする（その時間は parse_seconds に含める）。
+        chunks の取り出しを待った時間は write_seconds に含めない。
+        """
+        reading = Stopwatch()
+        reparsing = Stopwatch()
+        passes = iter([chunks])
+
+        def read() -> Iterable[ParsedChunk]:
+            pending = next(passes, None)
+            if pending is None:
+                pending = reparsing.iterate(self.parse(source))
+            return reading.iterate(pending)
+
+        start = perf_counter()
+        report.result = self.write(read, report)
+        report.write_seconds = perf_counter() - start - reading.seconds
+        report.parse_seconds += reparsing.seconds
+
+        source.mark_imported()
+        return report
+
+    def run(self) -> ImportReport:
+        """
+        fetch → parse → write を逐次実行する。
+
+        パースはストリーミングで書き込みと交互に行われるため、
+        メモリ使用量は CSV サイズに依存しない。
+        """
+        report, source = self.prepare()
+        if source is None:
+            return report
+
+        parsing = Stopwatch()
+        self.write_parsed(report, source, parsing.iterate(self.parse(source)))
+        report.parse_seconds += parsing.seconds
+        return report
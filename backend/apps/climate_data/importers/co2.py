@@ -0,0 +1,9 @@
+from apps.climate_data.importers.base import OWIDImporter
+
+
+class CO2Importer(OWIDImporter):
+    """
+    地域別の年間 CO2 排出量（OWID）
+    """
+
+    group_key = "CO2"
@@ -0,0 +1,101 @@
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from django.db.models import Max
+
+from apps.climate_data.models import ClimateData
+from apps.climate_data.utils.upsert_helpers import ClimateRecord
+
+# DB の最新年から何年分さかのぼって再取り込みするか
+# （OWID の更新は最新年の追加と直近数年の改訂がほとんど）
+DEFAULT_REVISION_WINDOW_YEARS = 3
+
+
+@dataclass
+class IncrementalPlan:
+    """
+    差分インポートの判定結果
+    """
+
+    # この年以降の行だけを書き込む
+    window_start: int | None = None
+    # 書き込み対象（window_start 以降）の行
+    records: list[ClimateRecord] = field(default_factory=list)
+    # window_start より前の改訂を検知した、または既存データがない場合の理由
+    fallback_reason: str = ""
+
+    @property
+    def is_incremental(self) -> bool:
+        return not self.fallback_reason
+
+
+def _rows_before(
+    indicator_ids: Iterable[int], window_start: int, version_id: int | None
+) -> dict[tuple[int, int, int], float]:
+    """
+    window_start より前の既存データを (indicator, region, year) → value で返す
+    """
+    return {
+        (indicator_id, region_id, year): value
+        for indicator_id, region_id, year, value in ClimateData.objects.in_version(
+            version_id
+        )
+        .filter(indicator_id__in=indicator_ids, year__lt=window_start)
+        .values_list("indicator_id", "region_id", "year", "value")
+        .iterator()
+    }
+
+
+def plan_incremental(
+    records: Iterable[ClimateRecord],
+    indicator_ids: Iterable[int],
+    *,
+    version_id: int | None = None,
+    window_years: int = DEFAULT_REVISION_WINDOW_YEARS,
+) -> IncrementalPlan:
+    """
+    DB の最新年と、ウィンドウより前の既存データとの比較から、差分インポートの対象を決める。
+
+    比較対象は version_id のバージョン（None ならバージョンなしのデータ）。
+
+    - 各指標の最新年のうち最も古いものから window_years 年分を「変更ウィンドウ」とする
+    - ウィンドウ内の行だけを書き込み対象として保持する
+    - ウィンドウより前の行は書き込まず、DB の値と 1 行ずつ == で比較する。
+      1 行でも異なる・過不足があれば過去年の改訂とみなし、全件インポートにする
+      （合計などの集計値の比較では、大きな値の小さな改訂を見逃すため）
+    """
+    indicator_ids = list(indicator_ids)
+
+    latest_years = dict(
+        ClimateData.objects.in_version(version_id)
+        .filter(indicator_id__in=indicator_ids)
+        .values("indicator_id")
+        .annotate(max_year=Max("year"))
+        .values_list("indicator_id", "max_year")
+    )
+    if len(latest_years) < len(indicator_ids):
+        return IncrementalPlan(fallback_reason="no existing data")
+
+    window_start = min(latest_years.values()) - window_years + 1
+    plan = IncrementalPlan(window_start=window_start)
+
+    existing = _rows_before(indicator_ids, window_start, version_id)
+
+    for record in records:
+        if record.year >= window_start:
+            plan.records.append(record)
+            continue
+
+        value = existing.pop((record.indicator_id, record.region_id, record.year), None)
+        if value is None:
+            plan.fallback_reason = f"series changed before {window_start}"
+            return plan
+        if value != record.value:
+            plan.fallback_reason = f"revisions detected before {window_start}"
+            return plan
+
+    # CSV からなくなった行がある
+    if existing:
+        plan.fallback_reason = f"series changed before {window_start}"
+
+    return plan
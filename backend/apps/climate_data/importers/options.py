@@ -0,0 +1,37 @@
+from apps.climate_data.utils.loaders import LOADER_CHOICES
+
+
+def add_importer_arguments(parser) -> None:
+    """
+    インポートコマンド共通のオプション（--force / --loader / --incremental）を追加する
+    """
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Import even if the source has not changed since the last import",
+    )
+    parser.add_argument(
+        "--loader",
+        choices=LOADER_CHOICES,
+        default="auto",
+        help="Bulk loader backend (copy is PostgreSQL only and falls back to orm)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only write the most recent years; falls back to a full import "
+            "when older years were revised"
+        ),
+    )
+
+
+def importer_kwargs(options: dict) -> dict:
+    """
+    add_importer_arguments() のオプションから OWIDImporter の引数を作る
+    """
+    return {
+        "force": options["force"],
+        "loader": options["loader"],
+        "incremental": options["incremental"],
+    }
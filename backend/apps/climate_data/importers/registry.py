@@ -0,0 +1,22 @@
+from apps.climate_data.constants import CLIMATE_GROUPS
+
+# 専用のサブクラスは定義時に OWIDImporter.IMPORTERS に登録される
+from apps.climate_data.importers import co2, temperature  # noqa: F401
+from apps.climate_data.importers.base import OWIDImporter
+
+
+def _importer_class(group_key: str) -> type[OWIDImporter]:
+    """
+    グループのインポーター（専用のサブクラスがなければ、CLIMATE_GROUPS の設定だけで動く汎用のもの）
+    """
+    return OWIDImporter.IMPORTERS.get(group_key) or type(
+        f"{group_key.title().replace('_', '')}Importer",
+        (OWIDImporter,),
+        {"group_key": group_key, "__module__": __name__},
+    )
+
+
+# CLIMATE_GROUPS のキー → インポーター（CLIMATE_GROUPS にグループを追加するだけで取り込める）
+IMPORTER_CLASSES: dict[str, type[OWIDImporter]] = {
+    group_key: _importer_class(group_key) for group_key in CLIMATE_GROUPS
+}
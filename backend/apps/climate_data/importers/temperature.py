@@ -0,0 +1,9 @@
+from apps.climate_data.importers.base import OWIDImporter
+
+
+class TemperatureImporter(OWIDImporter):
+    """
+    気温偏差（平均 / 95% 信頼区間の上限・下限）（OWID）
+    """
+
+    group_key = "TEMPERATURE"
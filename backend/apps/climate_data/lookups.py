@@ -0,0 +1,49 @@
+from typing import Iterable
+
+from apps.climate_data.models import Indicator
+from utils.cache import TieredCache
+
+# (グループ名, Indicator.name の組) → {Indicator.name: id}
+# refs → {id（文字列）/ key: 指標の情報}（全指標分。件数が少ないためまとめて保持する）
+# Indicator / IndicatorGroup の変更時に receivers.py で無効化する
+indicator_cache = TieredCache("climate-indicator", timeout=60 * 60)
+
+
+def get_indicator_ids(group_name: str, names: Iterable[str]) -> dict[str, int]:
+    """
+    グループ内の Indicator.name → id を返す（存在するものだけ）
+    """
+    names = sorted(set(names))
+
+    return indicator_cache.get_or_set(
+        f"{group_name}:{','.join(names)}",
+        lambda: dict(
+            Indicator.objects.filter(
+                group__name=group_name, name__in=names
+            ).values_list("name", "id")
+        ),
+    )
+
+
+def get_indicators(refs: Iterable[str]) -> dict[str, dict]:
+    """
+    Indicator の id（数字の文字列）または key → 指標の情報 を返す（存在するものだけ）。
+
+    指標の情報は id / key / name / unit / group（IndicatorGroup.name）。
+    キャッシュのキーはクライアントの指定に依存させず、全指標の対応表を 1 つだけ保持する
+    （key は数字だけにできないため、id と key は重ならない）。
+    """
+    indicators = indicator_cache.get_or_set("refs", _load_indicator_refs)
+    return {ref: indicators[ref] for ref in refs if ref in indicators}
+
+
+def _load_indicator_refs() -> dict[str, dict]:
+    rows = Indicator.objects.values_list("id", "key", "name", "unit", "group__name")
+
+    result = {}
+    for row in rows:
+        indicator = dict(zip(("id", "key", "name", "unit", "group"), row))
+        result[str(indicator["id"])] = indicator
+        if indicator["key"]:
+            result[indicator["key"]] = indicator
+    return result
@@ -0,0 +1,89 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.importers.registry import IMPORTER_CLASSES
+from apps.climate_data.models import DatasetVersion
+from apps.climate_data.utils.loaders import load_climate_data, supports_copy
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the ORM and COPY bulk loaders on the same parsed input. "
+        "Every run is rolled back, so the database is left unchanged."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group",
+            choices=list(CLIMATE_GROUPS),
+            default="CO2",
+            help="CLIMATE_GROUPS key whose source is used as input",
+        )
+        parser.add_argument(
+            "--csv",
+            help=(
+                "Read the source from a local CSV file instead of downloading it "
+                "(e.g. the output of generate_synthetic_climate --csv-dir)"
+            ),
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Number of runs per loader",
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be 1 or greater.")
+
+        importer = IMPORTER_CLASSES[options["group"]](
+            force=True, source_url=options["csv"]
+        )
+
+        self.stdout.write(self.style.NOTICE("Preparing input..."))
+        _, source = importer.prepare()
+
+        loaders = ["orm"]
+        if supports_copy():
+            loaders.append("copy")
+        else:
+            self.stdout.write(
+                self.style.WARNING("copy loader is not supported; skipped.")
+            )
+
+        # Region / Indicator の作成も含めて最後にすべてロールバックする
+        with transaction.atomic():
+            records = list(importer.resolve(importer.parse(source)))
+            self.stdout.write(f"{len(records)} records")
+
+            # 既存の行と比較せず全件を書き込むよう、既存の行はすべて置き換え済みにする
+            version = DatasetVersion.objects.create(group=importer.get_group())
+            version.supersede_all()
+
+            for loader in loaders:
+                for run in range(1, options["repeat"] + 1):
+                    self._benchmark(loader, run, records, version)
+
+            transaction.set_rollback(True)
+
+    def _benchmark(self, loader, run, records, version):
+        """
+        空のバージョンに全件ロードする時間を計測する
+        """
+        with transaction.atomic():
+            start = perf_counter()
+            result = load_climate_data(records, version_id=version.pk, loader=loader)
+            elapsed = perf_counter() - start
+
+            # 次の計測に影響しないよう元に戻す
+            transaction.set_rollback(True)
+
+        rate = len(records) / elapsed if elapsed else 0
+        self.stdout.write(
+            f"[{loader}] run {run}: {elapsed:.3f}s "
+            f"({rate:,.0f} rows/s, {result.created} created)"
+        )
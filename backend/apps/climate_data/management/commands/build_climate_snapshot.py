@@ -0,0 +1,57 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.models import DatasetVersion, IndicatorGroup
+from apps.climate_data.store import build_snapshot, prune_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write memory-mapped snapshots of the published version of each indicator "
+        "group, so that every web worker can map the same file instead of loading "
+        "its own copy. Snapshots of deleted versions are removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group",
+            choices=list(CLIMATE_GROUPS),
+            action="append",
+            help="CLIMATE_GROUPS key to build (repeatable; default: all groups)",
+        )
+
+    def handle(self, *args, **options):
+        for key in options["group"] or list(CLIMATE_GROUPS):
+            group_name = CLIMATE_GROUPS[key]["group"]["name"]
+            group = IndicatorGroup.objects.filter(name=group_name).first()
+
+            if group is None or group.active_version_id is None:
+                self.stdout.write(
+                    self.style.WARNING(f"[{group_name}] no published version; skipped.")
+                )
+                continue
+
+            start = perf_counter()
+            path = build_snapshot(group_name, group.active_version_id)
+            size = sum(file.stat().st_size for file in path.iterdir())
+            self.stdout.write(
+                f"[{group_name}] v{group.active_version_id}: "
+                f"{size / 1024:.1f} KiB in {perf_counter() - start:.2f}s"
+            )
+
+            # 公開終了後の猶予期間中のバージョンは、まだ読まれる可能性があるため残す
+            removed = prune_snapshots(
+                group_name,
+                DatasetVersion.objects.filter(group=group)
+                .exclude(status=DatasetVersion.Status.BUILDING)
+                .values_list("id", flat=True),
+            )
+            if removed:
+                self.stdout.write(
+                    f"[{group_name}] removed snapshots: "
+                    + ", ".join(f"v{version_id}" for version_id in removed)
+                )
+
+        self.stdout.write(self.style.SUCCESS("Snapshots are up to date."))
@@ -0,0 +1,163 @@
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.importers.registry import IMPORTER_CLASSES
+from apps.climate_data.models import DatasetVersion, Indicator, IndicatorGroup, Region
+from apps.climate_data.utils.loaders import LOADER_CHOICES, load_climate_data
+from apps.climate_data.utils.synthetic import (
+    DEFAULT_START_YEAR,
+    SyntheticSpec,
+    iter_synthetic_values,
+    synthetic_regions,
+    write_owid_csv,
+)
+from apps.climate_data.utils.upsert_helpers import ClimateRecord
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic climate dataset for scale and load "
+        "testing. Writes to the database, or to OWID-format CSV files with "
+        "--csv-dir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--regions", type=int, default=250)
+        parser.add_argument("--years", type=int, default=270)
+        parser.add_argument("--start-year", type=int, default=DEFAULT_START_YEAR)
+        parser.add_argument(
+            "--indicators",
+            type=int,
+            default=3,
+            help="Number of indicators (database output only)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--missing-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of values left empty, like gaps in OWID files",
+        )
+        parser.add_argument(
+            "--group-name",
+            default="Synthetic",
+            help="IndicatorGroup name the synthetic indicators are created in",
+        )
+        parser.add_argument(
+            "--loader",
+            choices=LOADER_CHOICES,
+            default="auto",
+            help="Bulk loader backend (copy is PostgreSQL only and falls back to orm)",
+        )
+        parser.add_argument(
+            "--csv-dir",
+            type=Path,
+            help=(
+                "Write one OWID-format CSV per importer into this directory "
+                "instead of the database"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        for name in ("regions", "years", "indicators"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be 1 or greater.")
+        if not 0 <= options["missing_rate"] < 1:
+            raise CommandError("--missing-rate must be between 0 and 1.")
+
+        spec = SyntheticSpec(
+            regions=options["regions"],
+            years=options["years"],
+            start_year=options["start_year"],
+            seed=options["seed"],
+            missing_rate=options["missing_rate"],
+        )
+
+        start = perf_counter()
+        if options["csv_dir"]:
+            self._write_csv(spec, options["csv_dir"])
+        else:
+            self._write_database(spec, options)
+
+        self.stdout.write(self.style.SUCCESS(f"Done in {perf_counter() - start:.1f}s."))
+
+    # =============================
+    # CSV
+    # =============================
+    def _write_csv(self, spec: SyntheticSpec, csv_dir: Path):
+        """
+        インポーターごとに、そのインポーターが読むカラムを持つ CSV を書き出す
+        """
+        csv_dir.mkdir(parents=True, exist_ok=True)
+
+        for key, importer_class in IMPORTER_CLASSES.items():
+            path = csv_dir / f"{key.lower()}.csv"
+            column_keys = list(importer_class().indicator_defs())
+            rows = write_owid_csv(path, spec, column_keys)
+            self.stdout.write(f"[{key}] {rows} rows -> {path}")
+
+    # =============================
+    # データベース
+    # =============================
+    def _write_database(self, spec: SyntheticSpec, options):
+        group_name = options["group_name"]
+        if group_name in {conf["group"]["name"] for conf in CLIMATE_GROUPS.values()}:
+            raise CommandError(
+                f"'{group_name}' is used by an importer; choose another --group-name."
+            )
+
+        group, _ = IndicatorGroup.objects.get_or_create(
+            name=group_name,
+            defaults={"description": "Synthetic data for load testing"},
+        )
+        indicator_ids = [
+            Indicator.objects.get_or_create(
+                group=group,
+                name=f"Synthetic indicator {k}",
+                defaults={
+                    "unit": "unit",
+                    "data_source_name": "generate_synthetic_climate",
+                    "data_source_url": "https://example.com/synthetic",
+                },
+            )[0].pk
+            for k in range(1, options["indicators"] + 1)
+        ]
+
+        names_by_code = synthetic_regions(spec.regions)
+        region_ids = Region.bulk_resolve(names_by_code)
+        region_pks = [region_ids[code] for code in names_by_code]
+
+        # 既存の合成データは新しいバージョンで置き換える
+        version = DatasetVersion.begin(group)
+        try:
+            version.supersede_all()
+            result = load_climate_data(
+                self._records(spec, indicator_ids, region_pks),
+                version_id=version.pk,
+                loader=options["loader"],
+            )
+        except Exception:
+            version.delete()
+            raise
+
+        version.publish()
+        DatasetVersion.collect_garbage()
+
+        self.stdout.write(f"[{group_name}] {result.written} rows written")
+
+    def _records(self, spec: SyntheticSpec, indicator_ids, region_pks):
+        years = list(spec.year_range)
+
+        for series, indicator_id in enumerate(indicator_ids):
+            for start, values, valid in iter_synthetic_values(spec, series):
+                rows, cols = np.nonzero(valid)
+                for i, j, value in zip(
+                    rows.tolist(), cols.tolist(), values[rows, cols].tolist()
+                ):
+                    yield ClimateRecord(
+                        region_pks[start + i], indicator_id, years[j], value
+                    )
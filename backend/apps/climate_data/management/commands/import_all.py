@@ -0,0 +1,105 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.importers.base import ChunkQueue, ImportReport, OWIDImporter
+from apps.climate_data.importers.options import (
+    add_importer_arguments,
+    importer_kwargs,
+)
+from apps.climate_data.importers.registry import IMPORTER_CLASSES
+
+
+class Command(BaseCommand):
+    help = (
+        "Import every source in CLIMATE_GROUPS. Downloads and parsing run "
+        "concurrently; database writes are done by a single writer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=len(CLIMATE_GROUPS),
+            help="Number of threads used for downloading and parsing",
+        )
+        add_importer_arguments(parser)
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be 1 or greater.")
+
+        importers = [
+            importer_class(**importer_kwargs(options))
+            for importer_class in IMPORTER_CLASSES.values()
+        ]
+
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Downloading {len(importers)} sources with {workers} workers..."
+            )
+        )
+
+        start = perf_counter()
+
+        # =============================
+        # ダウンロード・パースはスレッドプールで並列実行し、
+        # パース済みのチャンクを有界キュー（ChunkQueue）でメインスレッドに渡す。
+        # DB への書き込みはダウンロードが完了した順にメインスレッド（単一ライター）で行う
+        # =============================
+        chunk_queues = {
+            importer: ChunkQueue(importer.PARSE_QUEUE_SIZE) for importer in importers
+        }
+        ready: queue.Queue = queue.Queue()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for importer, chunks in chunk_queues.items():
+                pool.submit(self._prepare, importer, chunks, ready)
+
+            try:
+                for _ in importers:
+                    item = ready.get()
+                    if isinstance(item, BaseException):
+                        raise item
+
+                    importer, report, source = item
+                    if source is not None:
+                        importer.write_parsed(report, source, chunk_queues[importer])
+                    self._write_report(report)
+            finally:
+                # 書き込みが失敗した場合に、待機中のパースを終わらせる
+                for chunks in chunk_queues.values():
+                    chunks.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"All imports completed in {perf_counter() - start:.2f}s."
+            )
+        )
+
+    @staticmethod
+    def _prepare(importer: OWIDImporter, chunks: ChunkQueue, ready: queue.Queue):
+        """
+        ワーカースレッド: ダウンロードが終わったら ready に渡し、続けてパースする
+        """
+        try:
+            report, source = importer.prepare()
+        except Exception as exc:
+            ready.put(exc)
+            return
+
+        ready.put((importer, report, source))
+        if source is not None:
+            importer.parse_into(source, chunks, report)
+
+    def _write_report(self, report: ImportReport):
+        self.stdout.write(
+            f"[{report.name}] "
+            f"download {report.download_seconds:.2f}s, "
+            f"parse {report.parse_seconds:.2f}s, "
+            f"write {report.write_seconds:.2f}s - {report.summary()}"
+        )
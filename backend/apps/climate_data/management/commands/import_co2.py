@@ -1,133 +1,22 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
 
-from apps.climate_data.constants import CLIMATE_GROUPS
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
-from apps.climate_data.utils.fetch_helpers import fetch_csv
-from apps.climate_data.utils.parse_helpers import parse_float, parse_year
+from apps.climate_data.importers.co2 import CO2Importer
+from apps.climate_data.importers.options import (
+    add_importer_arguments,
+    importer_kwargs,
+)
 
 
 class Command(BaseCommand):
     help = "Fetch annual CO2 emissions by world region from Our World in Data (bulk insert/update)"
 
-    def handle(self, *args, **options):
-        # =============================
-        # 設定読み込み
-        # =============================
-        group_info = CLIMATE_GROUPS["CO2"]
-
-        group_conf = group_info["group"]
-        indicator_conf = group_info["indicator"]
-        source_conf = group_info["source"]
-
-        csv_url = source_conf["csv_url"]
-        column_key = indicator_conf["column_key"]
-
-        # =============================
-        # IndicatorGroup 取得 or 作成
-        # =============================
-        group, _ = IndicatorGroup.objects.get_or_create(
-            name=group_conf["name"],
-            defaults={"description": group_conf["description"]},
-        )
+    def add_arguments(self, parser):
+        add_importer_arguments(parser)
 
-        # =============================
-        # Indicator 取得 or 作成
-        # =============================
-        indicator, _ = Indicator.objects.get_or_create(
-            group=group,
-            name=indicator_conf["name"],
-            defaults={
-                "unit": indicator_conf["unit"],
-                "description": indicator_conf["description"],
-                "data_source_name": indicator_conf["data_source_name"],
-                "data_source_url": indicator_conf["data_source_url"],
-                "metadata_url": source_conf.get("meta_url", ""),
-            },
-        )
-
-        # =============================
-        # CSV データ取得
-        # =============================
+    def handle(self, *args, **options):
         self.stdout.write(self.style.NOTICE("Downloading CSV data..."))
-        # CSV をダウンロードして辞書のリストに変換
-        # 各要素は {'Entity': 'Japan', 'Code': 'JPN', 'Year': '2020', 'emissions_total': '36000'} のような辞書
-        reader = list(fetch_csv(csv_url))
-
-        # =============================
-        # Region キャッシュ（高速化）
-        # =============================
-        region_cache = {r.code: r for r in Region.objects.all()}
-
-        # =============================
-        # 既存データの一括取得 & 高速参照用マップ作成
-        # =============================
-        # 今回取り込む indicator・年・地域に該当する既存 ClimateData を
-        # 事前に一括取得し、(region_id, year) をキーとした辞書に変換する。
-        # これにより、CSV 1行ごとの DB クエリを避け、高速に
-        # 「新規作成 or 既存更新」を判定できる。
-        years = {
-            year for row in reader if (year := parse_year(row.get("Year"))) is not None
-        }
-
-        existing_data = ClimateData.objects.filter(
-            indicator=indicator,
-            year__in=years,
-            region__in=region_cache.values(),
-        )
-
-        existing_map = {(cd.region.pk, cd.year): cd for cd in existing_data}
-
-        to_create: list[ClimateData] = []
-        to_update: list[ClimateData] = []
-
-        # =============================
-        # CSV 行処理
-        # =============================
-        for row in reader:
-            year = parse_year(row.get("Year"))
-            if year is None:
-                continue
-
-            # Region 取得（OWID row から）
-            region = Region.from_owid_row(row, cache=region_cache)
-
-            value = parse_float(row.get(column_key))
-            if value is None:
-                continue
-
-            key = (region.pk, year)
-            if key in existing_map:
-                # 値が変わった場合のみ更新対象にする
-                cd = existing_map[key]
-                if cd.value != value:
-                    cd.value = value
-                    to_update.append(cd)
-            else:
-                # 新規は作成
-                to_create.append(
-                    ClimateData(
-                        region=region,
-                        indicator=indicator,
-                        year=year,
-                        value=value,
-                    )
-                )
-
-        # =============================
-        # バルク挿入 & 更新
-        # =============================
-        self.stdout.write(
-            self.style.NOTICE(f"Inserting {len(to_create)} new records...")
-        )
-        self.stdout.write(
-            self.style.NOTICE(f"Updating {len(to_update)} existing records...")
-        )
 
-        with transaction.atomic():
-            if to_create:
-                ClimateData.objects.bulk_create(to_create)
-            if to_update:
-                ClimateData.objects.bulk_update(to_update, ["value"])
+        # ダウンロード → パース → バルク upsert をストリーミングで実行
+        report = CO2Importer(**importer_kwargs(options)).run()
 
-        self.stdout.write(self.style.SUCCESS("Import completed!"))
+        self.stdout.write(self.style.SUCCESS(report.summary()))
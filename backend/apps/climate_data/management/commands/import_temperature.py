@@ -1,91 +1,22 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
 
-from apps.climate_data.constants import CLIMATE_GROUPS
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
-from apps.climate_data.utils.fetch_helpers import fetch_csv
-from apps.climate_data.utils.parse_helpers import parse_float, parse_year
+from apps.climate_data.importers.options import (
+    add_importer_arguments,
+    importer_kwargs,
+)
+from apps.climate_data.importers.temperature import TemperatureImporter
 
 
 class Command(BaseCommand):
     help = "Import temperature anomaly data from Our World in Data"
 
-    def handle(self, *args, **options):
-        # -----------------------------
-        # Constants 取得
-        # -----------------------------
-        config = CLIMATE_GROUPS["TEMPERATURE"]
-        group_info = config["group"]
-        source = config["source"]
-        indicators_config = config["indicators"]
-
-        # -----------------------------
-        # IndicatorGroup 取得 or 作成
-        # -----------------------------
-        group, _ = IndicatorGroup.objects.get_or_create(
-            name=group_info["name"],
-            defaults={"description": group_info["description"]},
-        )
+    def add_arguments(self, parser):
+        add_importer_arguments(parser)
 
-        # -----------------------------
-        # CSVデータ取得
-        # -----------------------------
+    def handle(self, *args, **options):
         self.stdout.write(self.style.NOTICE("Downloading CSV data..."))
-        reader = fetch_csv(source["csv_url"])
-
-        indicator_cache: dict[str, Indicator] = {}
-        created_count = 0
-        updated_count = 0
-
-        # -----------------------------
-        # Import 処理
-        # -----------------------------
-        with transaction.atomic():
-            for row in reader:
-                # Year parse
-                year = parse_year(row.get("Year"))
-                if year is None:
-                    continue
-
-                # Region 取得（OWID row から）
-                region = Region.from_owid_row(row)
-
-                for column_key, indicator_def in indicators_config.items():
-                    value = parse_float(row.get(column_key))
-                    if value is None:
-                        continue
-
-                    # Indicator 作成 or キャッシュ
-                    if column_key not in indicator_cache:
-                        indicator, _ = Indicator.objects.get_or_create(
-                            group=group,
-                            name=indicator_def["name"],
-                            defaults={
-                                "unit": indicator_def["unit"],
-                                "description": indicator_def["description"],
-                                "data_source_name": source["data_source_name"],
-                                "data_source_url": source["data_source_url"],
-                                "metadata_url": source["meta_url"],
-                            },
-                        )
-                        indicator_cache[column_key] = indicator
-
-                    indicator = indicator_cache[column_key]
-
-                    _, created = ClimateData.objects.update_or_create(
-                        region=region,
-                        indicator=indicator,
-                        year=year,
-                        defaults={"value": value},
-                    )
 
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
+        # ダウンロード → パース → バルク upsert をストリーミングで実行
+        report = TemperatureImporter(**importer_kwargs(options)).run()
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Import completed: {created_count} created, {updated_count} updated."
-            )
-        )
+        self.stdout.write(self.style.SUCCESS(report.summary()))
@@ -0,0 +1,142 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def assign_initial_versions(apps, schema_editor):
+    """
+    既存データをグループごとの初期バージョンに割り当てて公開する
+    """
+    IndicatorGroup = apps.get_model("climate_data", "IndicatorGroup")
+    DatasetVersion = apps.get_model("climate_data", "DatasetVersion")
+    ClimateData = apps.get_model("climate_data", "ClimateData")
+
+    for group in IndicatorGroup.objects.all():
+        rows = ClimateData.objects.filter(indicator__group=group, version__isnull=True)
+        if not rows.exists():
+            continue
+
+        version = DatasetVersion.objects.create(
+            group=group, status="active", published_at=timezone.now()
+        )
+        rows.update(version=version)
+
+        group.active_version = version
+        group.save(update_fields=["active_version"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("climate_data", "0004_alter_indicatorgroup_name_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("building", "構築中"),
+                            ("active", "公開中"),
+                            ("retired", "公開終了"),
+                        ],
+                        default="building",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "source_sha256",
+                    models.CharField(
+                        blank=True, help_text="取り込んだ CSV の SHA-256", max_length=64
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+                ("retired_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "データセットバージョン",
+                "verbose_name_plural": "データセットバージョン",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="climatedata",
+            name="climate_dat_indicat_4d6283_idx",
+        ),
+        migrations.AlterUniqueTogether(
+            name="climatedata",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="datasetversion",
+            name="group",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="versions",
+                to="climate_data.indicatorgroup",
+                verbose_name="指標グループ",
+            ),
+        ),
+        migrations.AddField(
+            model_name="climatedata",
+            name="version",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="所属するデータセットのバージョン（NULL はバージョン導入前のデータ）",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="climate_data",
+                to="climate_data.datasetversion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="indicatorgroup",
+            name="active_version",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="読み取り API が参照するデータセットのバージョン（未設定ならバージョンなしのデータ）",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="climate_data.datasetversion",
+                verbose_name="公開中のバージョン",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="climatedata",
+            index=models.Index(
+                fields=["indicator", "version", "year", "region"],
+                name="climate_dat_indicat_7f996a_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="climatedata",
+            constraint=models.UniqueConstraint(
+                fields=("version", "region", "indicator", "year"),
+                name="unique_climate_data_per_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="climatedata",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("version__isnull", True)),
+                fields=("region", "indicator", "year"),
+                name="unique_unversioned_climate_data",
+            ),
+        ),
+        migrations.RunPython(assign_initial_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:32
+
+from django.db import migrations, models
+
+# 既存の Indicator に設定する key（(グループ名, Indicator.name) → CSV のカラム名）
+INDICATOR_KEYS = {
+    ("Temperature", "Global average temperature anomaly"): (
+        "near_surface_temperature_anomaly"
+    ),
+    ("Temperature", "Temperature anomaly (lower bound)"): (
+        "near_surface_temperature_anomaly_lower"
+    ),
+    ("Temperature", "Temperature anomaly (upper bound)"): (
+        "near_surface_temperature_anomaly_upper"
+    ),
+    ("CO₂ Emissions", "Total CO₂ emissions"): "emissions_total",
+}
+
+
+def assign_indicator_keys(apps, schema_editor):
+    """
+    既存の Indicator に key を設定する
+    """
+    Indicator = apps.get_model("climate_data", "Indicator")
+
+    for (group_name, name), key in INDICATOR_KEYS.items():
+        Indicator.objects.filter(group__name=group_name, name=name).update(key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("climate_data", "0005_dataset_version"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="climatedata",
+            name="climate_dat_indicat_7f996a_idx",
+        ),
+        migrations.AddField(
+            model_name="indicator",
+            name="key",
+            field=models.SlugField(
+                blank=True,
+                help_text="API で指標を指定するための不変の識別子。CLIMATE_GROUPS のカラム名（例: emissions_total）",
+                max_length=100,
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="climatedata",
+            index=models.Index(
+                fields=["indicator", "version", "year", "region"],
+                include=("value",),
+                name="climate_data_series_idx",
+            ),
+        ),
+        migrations.RunPython(assign_indicator_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:58
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("climate_data", "0006_indicator_key"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="indicator",
+            name="key",
+            field=models.SlugField(
+                blank=True,
+                help_text="API で指標を指定するための不変の識別子。CLIMATE_GROUPS のカラム名（例: emissions_total）。数字だけは不可",
+                max_length=100,
+                null=True,
+                unique=True,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        "^\\d+$",
+                        inverse_match=True,
+                        message="Indicator key must not consist only of digits.",
+                    )
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def supersede_full_copies(apps, schema_editor):
+    """
+    これまでのバージョンは全行を複製して持っているため、
+    各バージョンの行を同じグループの次のバージョンで置き換え済みにする
+    """
+    DatasetVersion = apps.get_model("climate_data", "DatasetVersion")
+    ClimateData = apps.get_model("climate_data", "ClimateData")
+
+    versions_by_group = {}
+    for version_id, group_id in DatasetVersion.objects.order_by("pk").values_list(
+        "pk", "group_id"
+    ):
+        versions_by_group.setdefault(group_id, []).append(version_id)
+
+    for version_ids in versions_by_group.values():
+        for version_id, next_version_id in zip(version_ids, version_ids[1:]):
+            ClimateData.objects.filter(version_id=version_id).update(
+                superseded_by_id=next_version_id
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("climate_data", "0007_indicator_key_not_numeric"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="climatedata",
+            name="superseded_by",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="この行を新しい値で置き換えたバージョン（NULL は置き換えられていない）",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="climate_data.datasetversion",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="climatedata",
+            name="version",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="この行を書き込んだデータセットのバージョン（NULL はバージョン導入前のデータ）",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="climate_data",
+                to="climate_data.datasetversion",
+            ),
+        ),
+        migrations.RunPython(supersede_full_copies, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="climatedata",
+            index=models.Index(
+                fields=["indicator", "region", "year"], name="climate_data_key_idx"
+            ),
+        ),
+    ]
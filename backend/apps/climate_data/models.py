@@ -1,5 +1,15 @@
-from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.validators import (
+    MaxValueValidator,
+    MinValueValidator,
+    RegexValidator,
+)
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.climate_data.signals import dataset_published
 
 
 # 地域マスター
@@ -17,6 +27,9 @@ class Region(models.Model):
         ),
     )
 
+    # bulk_resolve() で 1 クエリあたりに扱うコード数
+    BULK_CHUNK_SIZE = 1000
+
     @classmethod
     def generate_code(cls, *, entity: str) -> str:
         """
@@ -33,11 +46,20 @@ class Region(models.Model):
         return f"AUTO_{base}"
 
     @classmethod
-    def from_owid_row(cls, row, *, cache: dict[str, "Region"] | None = None):
+    def owid_key(cls, row) -> tuple[str, str]:
+        """
+        OWID の CSV 行から (code, name) を返す。
+
+        Code が空の場合は generate_code() で生成したコードを使う。
+        """
         entity = (row.get("Entity") or "").strip()
         raw_code = (row.get("Code") or "").strip()
 
-        code = raw_code or cls.generate_code(entity=entity)
+        return raw_code or cls.generate_code(entity=entity), entity
+
+    @classmethod
+    def from_owid_row(cls, row, *, cache: dict[str, "Region"] | None = None):
+        code, entity = cls.owid_key(row)
 
         if cache is not None and code in cache:
             return cache[code]
@@ -52,6 +74,38 @@ class Region(models.Model):
 
         return region
 
+    @classmethod
+    def bulk_resolve(cls, names_by_code: dict[str, str]) -> dict[str, int]:
+        """
+        地域コード → 地域名 の辞書を受け取り、地域コード → Region.pk を返す。
+
+        - 未登録の地域は bulk_create(ignore_conflicts=True) でまとめて作成する
+        - クエリ数は地域数ではなくチャンク数に比例する（1 行ごとの get_or_create をしない）
+        """
+        codes = list(names_by_code)
+        region_ids: dict[str, int] = {}
+
+        for start in range(0, len(codes), cls.BULK_CHUNK_SIZE):
+            chunk = codes[start : start + cls.BULK_CHUNK_SIZE]
+            region_ids.update(
+                cls.objects.filter(code__in=chunk).values_list("code", "pk")
+            )
+
+            missing = [code for code in chunk if code not in region_ids]
+            if not missing:
+                continue
+
+            # 並行して作成された場合も一意制約違反にならないよう ignore_conflicts
+            cls.objects.bulk_create(
+                [cls(code=code, name=names_by_code[code]) for code in missing],
+                ignore_conflicts=True,
+            )
+            region_ids.update(
+                cls.objects.filter(code__in=missing).values_list("code", "pk")
+            )
+
+        return region_ids
+
     class Meta:
         verbose_name = "地域"
         verbose_name_plural = "地域マスター"
@@ -64,6 +118,15 @@ class Region(models.Model):
 class IndicatorGroup(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    active_version = models.ForeignKey(
+        "DatasetVersion",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="公開中のバージョン",
+        help_text="読み取り API が参照するデータセットのバージョン（未設定ならバージョンなしのデータ）",
+    )
 
     class Meta:
         verbose_name = "指標グループ"
@@ -73,6 +136,178 @@ class IndicatorGroup(models.Model):
         return self.name
 
 
+# データセットのバージョン（インポート 1 回ごとに作成し、公開時にポインタを切り替える）
+class DatasetVersion(models.Model):
+    class Status(models.TextChoices):
+        BUILDING = "building", "構築中"
+        ACTIVE = "active", "公開中"
+        RETIRED = "retired", "公開終了"
+
+    group = models.ForeignKey(
+        IndicatorGroup,
+        on_delete=models.CASCADE,
+        related_name="versions",
+        verbose_name="指標グループ",
+    )
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.BUILDING
+    )
+    source_sha256 = models.CharField(
+        max_length=64, blank=True, help_text="取り込んだ CSV の SHA-256"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    retired_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "データセットバージョン"
+        verbose_name_plural = "データセットバージョン"
+
+    def __str__(self):
+        return f"{self.group} v{self.pk} ({self.status})"
+
+    @classmethod
+    def begin(cls, group: IndicatorGroup, **fields) -> "DatasetVersion":
+        """
+        グループの新しい構築中バージョンを作成する。
+
+        中断されたまま残っている構築中バージョンは先に削除する
+        （行の見え方をバージョン ID の大小で判定するため、
+        公開中より古い構築中バージョンが残っていると読み取り側に見えてしまう）。
+        同じグループのインポートは同時に実行しない前提。
+        """
+        cls.objects.filter(group=group, status=cls.Status.BUILDING).delete()
+        return cls.objects.create(group=group, **fields)
+
+    def copy_unversioned_rows(self) -> int:
+        """
+        バージョンなしのデータをこのバージョンに INSERT ... SELECT の 1 文で複製し、
+        件数を返す（バージョン導入後の初回インポートでだけ使う）
+        """
+        table = ClimateData._meta.db_table
+        indicator_table = Indicator._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table}
+                    (version_id, region_id, indicator_id, year, value, updated_at)
+                SELECT %s, region_id, indicator_id, year, value, updated_at
+                FROM {table}
+                WHERE indicator_id IN (
+                    SELECT id FROM {indicator_table} WHERE group_id = %s
+                )
+                AND version_id IS NULL
+                """,
+                [self.pk, self.group_id],
+            )
+            return cursor.rowcount
+
+    def supersede_all(self) -> int:
+        """
+        以前のバージョンから見えている行をすべてこのバージョンで置き換え済みにし、件数を返す。
+
+        差分ではなく全件を入れ替えるバージョン（合成データなど）で、
+        新しい行を書き込む前に呼ぶ。
+        """
+        return (
+            ClimateData.objects.in_version(self.pk)
+            .filter(indicator__group_id=self.group_id)
+            .exclude(version=self)
+            .update(superseded_by=self)
+        )
+
+    def publish(self) -> None:
+        """
+        このバージョンを公開する。
+
+        IndicatorGroup.active_version の 1 行更新（ポインタの切り替え）で
+        読み取り側の参照先が一括で切り替わる。以前の公開バージョンは公開終了となり、
+        猶予期間の後に collect_garbage() で不要になった行とともに削除される。
+
+        コミット後に dataset_published シグナルを送る（レスポンスキャッシュの更新用）。
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            group = IndicatorGroup.objects.select_for_update().get(pk=self.group_id)
+            previous_version_id = group.active_version_id
+
+            DatasetVersion.objects.filter(
+                group_id=self.group_id, status=self.Status.ACTIVE
+            ).update(status=self.Status.RETIRED, retired_at=now)
+
+            self.status = self.Status.ACTIVE
+            self.published_at = now
+            self.save(update_fields=["status", "published_at"])
+
+            group.active_version = self
+            group.save(update_fields=["active_version"])
+
+            # バージョン導入前のデータは初回公開時に置き換える
+            if previous_version_id is None:
+                ClimateData.objects.filter(
+                    indicator__group_id=self.group_id, version__isnull=True
+                ).delete()
+
+            transaction.on_commit(
+                lambda: dataset_published.send(sender=DatasetVersion, version=self)
+            )
+
+    @classmethod
+    def collect_garbage(cls, *, grace_period: timedelta | None = None) -> int:
+        """
+        猶予期間を過ぎた公開終了バージョンと、中断された構築中バージョンを削除する。
+
+        公開終了直後のバージョンは、切り替え前に読み始めたリクエストが
+        参照している可能性があるため猶予期間の間は残す。
+
+        各バージョンは変更のあった行だけを持つため、公開終了バージョンの行でも
+        置き換えられていないものは新しいバージョンから見えている。削除するのは
+        参照中のどのバージョンからも見えなくなった行と、行が残っていないバージョンだけ。
+        """
+        if grace_period is None:
+            grace_period = settings.CLIMATE_VERSION_GRACE_PERIOD
+        threshold = timezone.now() - grace_period
+
+        # 構築中のバージョンの行は削除され、置き換えの印は元に戻る（SET_NULL）
+        deleted, _ = cls.objects.filter(
+            status=cls.Status.BUILDING, created_at__lt=threshold
+        ).delete()
+
+        # 参照中の最も古いバージョン以前に置き換えられた行は、どこからも見えない
+        oldest_in_use = (
+            cls.objects.filter(
+                models.Q(status=cls.Status.ACTIVE)
+                | models.Q(status=cls.Status.RETIRED, retired_at__gte=threshold),
+                group_id=models.OuterRef("indicator__group_id"),
+            )
+            .order_by("pk")
+            .values("pk")[:1]
+        )
+        count, _ = ClimateData.objects.filter(
+            superseded_by__lte=models.Subquery(oldest_in_use),
+            superseded_by__status__in=[cls.Status.ACTIVE, cls.Status.RETIRED],
+        ).delete()
+        deleted += count
+
+        count, _ = (
+            cls.objects.filter(status=cls.Status.RETIRED, retired_at__lt=threshold)
+            .exclude(
+                pk__in=ClimateData.objects.filter(version__isnull=False).values(
+                    "version_id"
+                )
+            )
+            .exclude(
+                pk__in=ClimateData.objects.filter(superseded_by__isnull=False).values(
+                    "superseded_by_id"
+                )
+            )
+            .delete()
+        )
+        return deleted + count
+
+
 # 指標マスター（例：Mean temperature, Max temperature, Min temperature など）
 class Indicator(models.Model):
     group = models.ForeignKey(
@@ -82,6 +317,24 @@ class Indicator(models.Model):
         verbose_name="指標グループ",
     )
     name = models.CharField(max_length=255)
+    key = models.SlugField(
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        # API では数字だけの指定を id として扱うため、key は数字だけにできない
+        validators=[
+            RegexValidator(
+                r"^\d+$",
+                inverse_match=True,
+                message="Indicator key must not consist only of digits.",
+            )
+        ],
+        help_text=(
+            "API で指標を指定するための不変の識別子。"
+            "CLIMATE_GROUPS のカラム名（例: emissions_total）。数字だけは不可"
+        ),
+    )
     unit = models.CharField(max_length=50)
     description = models.TextField(blank=True)
     data_source_name = models.CharField(max_length=255)
@@ -102,8 +355,62 @@ class Indicator(models.Model):
         return f"{self.group.name} - {self.name}"
 
 
+class ClimateDataQuerySet(models.QuerySet):
+    def in_version(self, version_id: int | None):
+        """
+        version_id のバージョンから見えるデータだけに絞り込む（None ならバージョンなしのデータ）。
+
+        各バージョンは変更のあった行だけを持つ。そのバージョン以前の行のうち、
+        そのバージョン以前に置き換えられていない（superseded_by）ものが見える。
+        判定はバージョン ID の大小だけで行うため、グループ・指標は呼び出し側で絞り込むこと。
+        """
+        if version_id is None:
+            return self.filter(version__isnull=True)
+
+        return self.filter(
+            models.Q(superseded_by__isnull=True)
+            | models.Q(superseded_by__gt=version_id),
+            version__lte=version_id,
+        )
+
+    def published(self):
+        """
+        各指標グループの公開中バージョンから見えるデータだけに絞り込む（in_version() を参照）。
+
+        公開中のバージョンがないグループは、バージョンなしのデータを返す。
+        """
+        active_version = models.F("indicator__group__active_version")
+        return self.filter(
+            models.Q(version__lte=active_version)
+            & (
+                models.Q(superseded_by__isnull=True)
+                | models.Q(superseded_by__gt=active_version)
+            )
+            | models.Q(
+                version__isnull=True,
+                indicator__group__active_version__isnull=True,
+            )
+        )
+
+
 # 気候データ
 class ClimateData(models.Model):
+    version = models.ForeignKey(
+        DatasetVersion,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="climate_data",
+        help_text="この行を書き込んだデータセットのバージョン（NULL はバージョン導入前のデータ）",
+    )
+    superseded_by = models.ForeignKey(
+        DatasetVersion,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="この行を新しい値で置き換えたバージョン（NULL は置き換えられていない）",
+    )
     region = models.ForeignKey(
         Region, on_delete=models.CASCADE, related_name="climate_data"
     )
@@ -122,10 +429,34 @@ class ClimateData(models.Model):
         help_text="全件再取得バッチによりこのレコードが最後に更新された日時",
     )
 
+    objects = ClimateDataQuerySet.as_manager()
+
     class Meta:
-        unique_together = ("region", "indicator", "year")  # 同一組み合わせの重複防止
+        # 同一組み合わせの重複防止（バージョンごと）
+        constraints = [
+            models.UniqueConstraint(
+                fields=["version", "region", "indicator", "year"],
+                name="unique_climate_data_per_version",
+            ),
+            models.UniqueConstraint(
+                fields=["region", "indicator", "year"],
+                condition=models.Q(version__isnull=True),
+                name="unique_unversioned_climate_data",
+            ),
+        ]
         indexes = [
-            models.Index(fields=["indicator", "year", "region"]),
+            # 指標・バージョン・年の範囲での絞り込みを索引だけで返せるよう value も含める
+            # （INCLUDE は PostgreSQL のみ。SQLite では通常の索引になる）
+            models.Index(
+                fields=["indicator", "version", "year", "region"],
+                include=["value"],
+                name="climate_data_series_idx",
+            ),
+            # 取り込み時に、キーごとに現在見えている行を引くための索引
+            models.Index(
+                fields=["indicator", "region", "year"],
+                name="climate_data_key_idx",
+            ),
         ]
         verbose_name = "気候データ"
         verbose_name_plural = "気候データ"
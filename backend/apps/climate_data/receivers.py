@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.climate_data.lookups import indicator_cache
+from apps.climate_data.models import Indicator, IndicatorGroup
+
+
+@receiver([post_save, post_delete], sender=Indicator)
+@receiver([post_save, post_delete], sender=IndicatorGroup)
+def invalidate_indicator_cache(sender, update_fields=None, **kwargs):
+    """
+    Indicator / IndicatorGroup が変更されたら、指標の検索結果のキャッシュを無効にする
+    """
+    # 公開による active_version の切り替えでは、名前と id の対応は変わらない
+    if update_fields is not None and set(update_fields) == {"active_version"}:
+        return
+
+    # コミット前に別プロセスが古い内容を読み直して保存する場合に備え、コミット後にも無効化する
+    indicator_cache.invalidate()
+    transaction.on_commit(indicator_cache.invalidate)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# DatasetVersion が公開され、トランザクションがコミットされた後に送られる。
+# 引数: version（公開された DatasetVersion）
+dataset_published = Signal()
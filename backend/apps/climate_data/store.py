@@ -0,0 +1,576 @@
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+from django.conf import settings
+from django.utils.text import slugify
+
+from apps.climate_data.models import ClimateData, Region
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # Windows ではプロセス間のロックをしない
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 1 グループあたりに保持するバージョン数（公開の切り替え中は新旧の両方が読まれるため）
+VERSIONS_PER_GROUP = 2
+
+# スナップショットの形式（配列の構成を変えたら上げる）
+SNAPSHOT_FORMAT = 1
+
+# スナップショットのディレクトリ名（v<DatasetVersion.id>）
+SNAPSHOT_NAME_RE = re.compile(r"^v(\d+)$")
+
+
+class Rows(NamedTuple):
+    """
+    year, 地域コード / 地域名, value の列（year → 地域コードの順）
+    """
+
+    years: np.ndarray
+    region_codes: np.ndarray
+    region_names: np.ndarray
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def tuples(self, chunk_size: int = 10000) -> Iterator[tuple[int, str, float]]:
+        """
+        (year, 地域コード, value) を chunk_size 行ずつ Python の値に変換しながら返す
+        """
+        for start in range(0, len(self), chunk_size):
+            stop = start + chunk_size
+            yield from zip(
+                self.years[start:stop].tolist(),
+                self.region_codes[start:stop].tolist(),
+                self.values[start:stop].tolist(),
+            )
+
+
+class IndicatorSeries:
+    """
+    1 指標分のデータ。
+
+    (year, 地域) の順に並べた year / 地域インデックス / value の配列と、
+    (地域, year) の順に並べるためのインデックスを持つ。
+    年・地域での絞り込みは二分探索で行う。
+    """
+
+    # スナップショットに書き出す配列
+    ARRAYS = (
+        "years",
+        "regions",
+        "values",
+        "by_region",
+        "regions_by_region",
+        "years_by_region",
+    )
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        regions: np.ndarray,
+        values: np.ndarray,
+        by_region: np.ndarray,
+        regions_by_region: np.ndarray,
+        years_by_region: np.ndarray,
+    ):
+        self.years = years
+        self.regions = regions
+        self.values = values
+        # 地域ごと（地域内は year 順）に並べたときの位置
+        self.by_region = by_region
+        self.regions_by_region = regions_by_region
+        self.years_by_region = years_by_region
+
+    @classmethod
+    def build(
+        cls, years: np.ndarray, regions: np.ndarray, values: np.ndarray
+    ) -> "IndicatorSeries":
+        """
+        並び順を問わない year / 地域インデックス / value の配列から作る
+        """
+        order = np.lexsort((regions, years))
+        years, regions, values = years[order], regions[order], values[order]
+
+        by_region = np.lexsort((years, regions))
+        return cls(
+            years, regions, values, by_region, regions[by_region], years[by_region]
+        )
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def select(
+        self,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        regions: Iterable[int] | None = None,
+    ) -> np.ndarray:
+        """
+        条件に合う位置（(year, 地域) 順の配列上のインデックス）を昇順で返す
+        """
+        if regions is None:
+            start = 0 if year_from is None else self.years.searchsorted(year_from)
+            stop = (
+                len(self)
+                if year_to is None
+                else self.years.searchsorted(year_to, side="right")
+            )
+            return np.arange(start, stop)
+
+        blocks = []
+        for region in regions:
+            # 地域のブロックを探し、その中で year の範囲を探す
+            first = self.regions_by_region.searchsorted(region)
+            last = self.regions_by_region.searchsorted(region, side="right")
+            years = self.years_by_region[first:last]
+
+            start = first + (0 if year_from is None else years.searchsorted(year_from))
+            stop = first + (
+                len(years)
+                if year_to is None
+                else years.searchsorted(year_to, side="right")
+            )
+            blocks.append(self.by_region[start:stop])
+
+        if not blocks:
+            return np.arange(0)
+        return np.sort(np.concatenate(blocks))
+
+
+class GroupData:
+    """
+    1 つの指標グループ・1 バージョン分のデータ（指標ごとの IndicatorSeries）
+    """
+
+    def __init__(
+        self,
+        series: dict[int, IndicatorSeries],
+        region_codes: np.ndarray,
+        region_names: np.ndarray,
+    ):
+        self.series = series
+        # 地域インデックス → 地域コード / 地域名（インデックスは地域コード順）
+        self.region_codes = region_codes
+        self.region_names = region_names
+        self._region_index = {code: i for i, code in enumerate(region_codes.tolist())}
+        # 地域インデックス → 地域名の順位（地域名順に並べ替えるため）
+        self._name_rank = np.empty(len(region_names), dtype=np.int32)
+        self._name_rank[
+            sorted(range(len(region_names)), key=region_names.__getitem__)
+        ] = np.arange(len(region_names), dtype=np.int32)
+
+    @classmethod
+    def load(cls, group_name: str, version_id: int) -> "GroupData":
+        """
+        DB からグループ・バージョンのデータを 1 クエリで読み込む
+        """
+        rows = list(
+            ClimateData.objects.in_version(version_id)
+            .filter(indicator__group__name=group_name)
+            .values_list("indicator_id", "region_id", "year", "value")
+        )
+        if rows:
+            indicator_ids, region_ids, years = (
+                np.array(column, dtype=np.int64) for column in list(zip(*rows))[:3]
+            )
+            values = np.array([row[3] for row in rows], dtype=np.float64)
+        else:
+            indicator_ids = region_ids = years = np.array([], dtype=np.int64)
+            values = np.array([], dtype=np.float64)
+
+        regions = sorted(
+            Region.objects.filter(id__in=np.unique(region_ids).tolist()).values_list(
+                "code", "name", "id"
+            )
+        )
+        region_codes = np.array([code for code, _, _ in regions], dtype=object)
+        region_names = np.array([name for _, name, _ in regions], dtype=object)
+
+        # Region.id → 地域インデックス（地域コード順）
+        region_lookup = np.full(
+            max((region_id for _, _, region_id in regions), default=0) + 1,
+            -1,
+            dtype=np.int32,
+        )
+        for index, (_, _, region_id) in enumerate(regions):
+            region_lookup[region_id] = index
+
+        # 年は int16 で保持するため、範囲外の年は（桁あふれで別の年にならないよう）読み込まない
+        # （モデルの validator はパース時には適用されない）
+        year_range = np.iinfo(np.int16)
+        in_range = (years >= year_range.min) & (years <= year_range.max)
+        if not in_range.all():
+            logger.warning(
+                "Skipped %d rows of %s v%s with years outside [%d, %d].",
+                np.count_nonzero(~in_range),
+                group_name,
+                version_id,
+                year_range.min,
+                year_range.max,
+            )
+            indicator_ids, region_ids, years, values = (
+                indicator_ids[in_range],
+                region_ids[in_range],
+                years[in_range],
+                values[in_range],
+            )
+
+        series = {}
+        for indicator_id in np.unique(indicator_ids).tolist():
+            mask = indicator_ids == indicator_id
+            series[indicator_id] = IndicatorSeries.build(
+                years[mask].astype(np.int16),
+                region_lookup[region_ids[mask]],
+                values[mask],
+            )
+
+        return cls(series, region_codes, region_names)
+
+    def save(self, directory: Path) -> None:
+        """
+        スナップショットとして directory に書き出す。
+
+        配列は指標ごとに連結して 1 配列 1 ファイル（.npy）にし、
+        指標ごとの範囲と地域の一覧は meta.json に書く。
+        """
+        indicator_ids = sorted(self.series)
+        offsets = {}
+        start = 0
+        for indicator_id in indicator_ids:
+            stop = start + len(self.series[indicator_id])
+            offsets[str(indicator_id)] = [start, stop]
+            start = stop
+
+        for name in IndicatorSeries.ARRAYS:
+            arrays = [getattr(self.series[i], name) for i in indicator_ids]
+            np.save(
+                directory / f"{name}.npy",
+                np.concatenate(arrays) if arrays else np.array([], dtype=np.int64),
+            )
+
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "indicators": offsets,
+            "regions": list(
+                zip(self.region_codes.tolist(), self.region_names.tolist())
+            ),
+        }
+        (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def open(cls, directory: Path) -> "GroupData":
+        """
+        スナップショットを読み取り専用の mmap で開く。
+
+        配列はコピーせずにファイルを参照するため、同じスナップショットを開いた
+        プロセス（gunicorn のワーカー）の間で OS のページキャッシュが共有される。
+        """
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta["format"] != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {meta['format']}")
+
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in IndicatorSeries.ARRAYS
+        }
+        series = {
+            int(indicator_id): IndicatorSeries(
+                *(arrays[name][start:stop] for name in IndicatorSeries.ARRAYS)
+            )
+            for indicator_id, (start, stop) in meta["indicators"].items()
+        }
+
+        regions = meta["regions"]
+        return cls(
+            series,
+            np.array([code for code, _ in regions], dtype=object),
+            np.array([name for _, name in regions], dtype=object),
+        )
+
+    def region_indices(self, codes: Iterable[str]) -> list[int]:
+        return sorted(
+            self._region_index[code] for code in codes if code in self._region_index
+        )
+
+    def _select(self, indicator_id: int, filters: dict | None) -> np.ndarray:
+        series = self.series.get(indicator_id)
+        if series is None:
+            return np.arange(0)
+
+        filters = filters or {}
+        codes = filters.get("region__code__in")
+        return series.select(
+            filters.get("year__gte"),
+            filters.get("year__lte"),
+            None if codes is None else self.region_indices(codes),
+        )
+
+    def rows(self, indicator_id: int, filters: dict | None = None) -> Rows:
+        """
+        指標のデータを year → 地域コードの順に返す。
+
+        filters は ClimateDataFilterSerializer.filter_kwargs() の絞り込み条件
+        （year__gte / year__lte / region__code__in）。
+        """
+        series = self.series.get(indicator_id)
+        if series is None:
+            empty = np.array([], dtype=object)
+            return Rows(np.array([], dtype=np.int16), empty, empty, np.array([]))
+
+        positions = self._select(indicator_id, filters)
+        regions = series.regions[positions]
+        return Rows(
+            series.years[positions],
+            self.region_codes[regions],
+            self.region_names[regions],
+            series.values[positions],
+        )
+
+    def region_series(
+        self, indicator_id: int, filters: dict | None = None
+    ) -> Iterator[tuple[str, str, np.ndarray, np.ndarray]]:
+        """
+        指標のデータを地域ごとに分け、(地域コード, 地域名, years, values) を地域コード順に返す
+        （各地域の years は昇順）
+        """
+        series = self.series.get(indicator_id)
+        if series is None:
+            return
+
+        positions = self._select(indicator_id, filters)
+        # (year, 地域) 順の位置を、year の順を保ったまま地域ごとにまとめる
+        positions = positions[np.argsort(series.regions[positions], kind="stable")]
+        regions = series.regions[positions]
+        bounds = np.flatnonzero(np.diff(regions)) + 1
+
+        for block in np.split(np.arange(len(positions)), bounds):
+            if not len(block):
+                continue
+            region = regions[block[0]]
+            yield (
+                self.region_codes[region],
+                self.region_names[region],
+                series.years[positions[block]],
+                series.values[positions[block]],
+            )
+
+    def pivot(
+        self, indicator_ids: dict[str, int], filters: dict | None = None
+    ) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        """
+        複数の指標を (地域, year) ごとに 1 行にまとめる。
+
+        indicator_ids は 列名 → Indicator.id。
+        (地域名, year, 列名 → 値の配列) を地域名 → year の順で返す（データがない値は NaN）。
+        """
+        selected = {}
+        for field, indicator_id in indicator_ids.items():
+            positions = self._select(indicator_id, filters)
+            series = self.series.get(indicator_id)
+            if series is not None:
+                selected[field] = (series, positions)
+
+        # (地域インデックス, year) を 1 つの整数のキーにする
+        def keys(series: IndicatorSeries, positions: np.ndarray) -> np.ndarray:
+            regions = series.regions[positions].astype(np.int64)
+            years = series.years[positions].astype(np.int64) - np.iinfo(np.int16).min
+            return (regions << 16) | years
+
+        all_keys = np.unique(
+            np.concatenate(
+                [keys(*item) for item in selected.values()] or [np.array([], np.int64)]
+            )
+        )
+        regions = (all_keys >> 16).astype(np.int32)
+        years = (all_keys & 0xFFFF) + np.iinfo(np.int16).min
+
+        columns = {}
+        for field in indicator_ids:
+            column = np.full(len(all_keys), np.nan)
+            if field in selected:
+                series, positions = selected[field]
+                column[all_keys.searchsorted(keys(series, positions))] = series.values[
+                    positions
+                ]
+            columns[field] = column
+
+        # 地域名 → year の順に並べ替える
+        order = np.lexsort((years, self._name_rank[regions]))
+        return (
+            self.region_names[regions][order],
+            years[order],
+            {field: column[order] for field, column in columns.items()},
+        )
+
+
+# ===============================
+# 🔹 スナップショット（mmap で共有するファイル）
+# ===============================
+
+
+def snapshot_path(group_name: str, version_id: int) -> Path:
+    """
+    グループ・バージョンのスナップショットのディレクトリ
+    """
+    return Path(settings.CLIMATE_SNAPSHOT_DIR) / slugify(group_name) / f"v{version_id}"
+
+
+@contextmanager
+def _snapshot_lock(group_dir: Path):
+    """
+    同じグループのスナップショットを書き出すプロセスを 1 つにする
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(group_dir / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def build_snapshot(group_name: str, version_id: int) -> Path:
+    """
+    スナップショットがなければ DB から読み込んで書き出し、そのディレクトリを返す。
+
+    一時ディレクトリに書き出してからリネームするため、
+    読み取り側からは書き出し途中のスナップショットは見えない。
+    バージョンの内容は変わらないため、既にあれば作り直さない。
+    """
+    path = snapshot_path(group_name, version_id)
+    if path.is_dir():
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _snapshot_lock(path.parent):
+        # ロックを待っている間に他のプロセスが書き出した場合はそれを使う
+        if path.is_dir():
+            return path
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+        try:
+            GroupData.load(group_name, version_id).save(tmp_dir)
+            os.rename(tmp_dir, path)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    return path
+
+
+def prune_snapshots(group_name: str, keep: Iterable[int]) -> list[int]:
+    """
+    keep に含まれないバージョンのスナップショットを削除し、削除したバージョンの ID を返す。
+
+    mmap で開いているプロセスがあっても、ファイルの実体は閉じられるまで残る。
+    """
+    group_dir = snapshot_path(group_name, 0).parent
+    if not group_dir.is_dir():
+        return []
+
+    keep = set(keep)
+    removed = []
+    for path in group_dir.iterdir():
+        match = SNAPSHOT_NAME_RE.match(path.name)
+        if match and int(match.group(1)) not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(int(match.group(1)))
+
+    return sorted(removed)
+
+
+def load_group_data(group_name: str, version_id: int) -> GroupData:
+    """
+    スナップショットを mmap で開く（なければ書き出してから開く）。
+
+    スナップショットのディレクトリに書き込めない場合は DB から読み込む
+    （プロセスごとにメモリ上へ保持する）。
+    """
+    try:
+        return GroupData.open(build_snapshot(group_name, version_id))
+    except OSError:
+        logger.warning(
+            "Climate snapshot is unavailable for %s v%s; loading from the database.",
+            group_name,
+            version_id,
+            exc_info=True,
+        )
+        return GroupData.load(group_name, version_id)
+
+
+# ===============================
+# 🔹 プロセス内のストア
+# ===============================
+
+
+class ClimateDataStore:
+    """
+    プロセス内に保持する気候データ（指標グループ・公開バージョンごとの GroupData）。
+
+    - 初めて参照されたときにスナップショットを mmap で開く（load_group_data）。
+      同じグループの読み込みは同時に 1 回だけ
+    - バージョンは内容が変わらないため、公開中バージョンが切り替われば別のキーで読み込む
+    - 1 グループにつき直近 VERSIONS_PER_GROUP バージョン分だけ保持する
+    """
+
+    def __init__(self):
+        self._groups: dict[str, OrderedDict[int, GroupData]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    def get(self, group_name: str, version_id: int) -> GroupData:
+        cached = self._cached(group_name, version_id)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(group_name, threading.Lock())
+
+        with load_lock:
+            # 待っている間に他のスレッドが読み込んだ場合はそれを使う
+            cached = self._cached(group_name, version_id)
+            if cached is not None:
+                return cached
+
+            data = load_group_data(group_name, version_id)
+
+            with self._lock:
+                versions = self._groups.setdefault(group_name, OrderedDict())
+                versions[version_id] = data
+                while len(versions) > VERSIONS_PER_GROUP:
+                    versions.popitem(last=False)
+
+            return data
+
+    def _cached(self, group_name: str, version_id: int) -> GroupData | None:
+        with self._lock:
+            versions = self._groups.get(group_name)
+            if versions is None or version_id not in versions:
+                return None
+            versions.move_to_end(version_id)
+            return versions[version_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups.clear()
+
+
+# プロセス全体で共有するストア
+climate_store = ClimateDataStore()
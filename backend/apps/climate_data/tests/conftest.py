@@ -0,0 +1,67 @@
+import csv
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+class FakeOWIDServer:
+    """
+    OWID の CSV 配信を模したフェイクサーバー。
+
+    ETag による条件付きリクエスト（304）にも対応する。
+    """
+
+    def __init__(self):
+        # URL → (本文, ETag)。キー None は全 URL 共通
+        self.sources: dict[str | None, tuple[bytes, str]] = {}
+        self.requests: list[dict] = []
+
+    def __call__(self, rows: list[dict], *, etag: str = '"v1"', url: str | None = None):
+        """
+        配信する CSV 行を設定する（url 省略時はすべての URL に同じ CSV を返す）
+        """
+        fieldnames: list[str] = []
+        for row in rows:
+            fieldnames += [key for key in row if key not in fieldnames]
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+
+        self.sources[url] = (buffer.getvalue().encode("utf-8"), etag)
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append({"url": url, "headers": headers})
+        body, etag = self.sources.get(url) or self.sources[None]
+
+        response = MagicMock()
+        response.__enter__.return_value = response
+
+        if etag and headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response.iter_content.return_value = iter([])
+        else:
+            response.status_code = 200
+            response.headers = {"ETag": etag}
+            response.iter_content.return_value = iter([body])
+
+        return response
+
+
+@pytest.fixture
+def owid_csv(settings, tmp_path):
+    """
+    requests.get を FakeOWIDServer に差し替え、ソースキャッシュを tmp_path に向ける。
+
+    使い方: owid_csv([{"Entity": "Japan", "Code": "JPN", ...}, ...])
+    """
+    settings.CLIMATE_SOURCE_CACHE_DIR = tmp_path / "sources"
+
+    server = FakeOWIDServer()
+    with patch(
+        "apps.climate_data.utils.source_cache.requests.get", side_effect=server.get
+    ):
+        yield server
@@ -0,0 +1,103 @@
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from apps.climate_data.importers.base import (
+    ChunkQueue,
+    ImportReport,
+    owid_region_keys,
+)
+from apps.climate_data.importers.co2 import CO2Importer
+from apps.climate_data.models import Region
+
+
+def test_owid_region_keys_generates_missing_codes():
+    codes, names = owid_region_keys(
+        np.array(["JPN", "", ""], dtype=object),
+        np.array(["Japan", "North America", "North America"], dtype=object),
+    )
+
+    assert codes.tolist() == ["JPN", "AUTO_NORTH_AMERICA", "AUTO_NORTH_AMERICA"]
+    assert names.tolist() == ["Japan", "North America", "North America"]
+
+
+def test_parse_yields_columnar_chunks(owid_csv):
+    owid_csv(
+        [
+            {"Entity": "Japan", "Code": "JPN", "Year": "2000", "emissions_total": "1"},
+            {"Entity": "Europe", "Code": "", "Year": "2001", "emissions_total": "2"},
+            # Year が不正 / int64 に収まらない / 値がない行は含めない
+            {"Entity": "Japan", "Code": "JPN", "Year": "20XX", "emissions_total": "3"},
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "99999999999999999999",
+                "emissions_total": "4",
+            },
+            {"Entity": "Empty", "Code": "EMP", "Year": "2000", "emissions_total": ""},
+        ]
+    )
+    importer = CO2Importer()
+    source = importer.fetch(ImportReport(name="CO2"))
+
+    (chunk,) = importer.parse(source)
+
+    assert chunk.region_codes.tolist() == ["JPN", "AUTO_EUROPE"]
+    assert chunk.region_names.tolist() == ["Japan", "Europe"]
+    assert chunk.years.dtype == np.int64
+    assert chunk.years.tolist() == [2000, 2001]
+    assert chunk.values["emissions_total"].tolist() == [1.0, 2.0]
+
+
+@pytest.mark.django_db
+def test_write_parsed_consumes_worker_chunks_without_reparsing(owid_csv):
+    owid_csv(
+        [
+            {"Entity": "Japan", "Code": "JPN", "Year": "2000", "emissions_total": "1"},
+            {"Entity": "Europe", "Code": "", "Year": "2001", "emissions_total": "3"},
+        ]
+    )
+    importer = CO2Importer()
+    report, source = importer.prepare()
+    chunks = ChunkQueue(maxsize=1)
+
+    worker = threading.Thread(target=importer.parse_into, args=(source, chunks, report))
+    with patch.object(importer, "parse", wraps=importer.parse) as parse:
+        worker.start()
+        importer.write_parsed(report, source, chunks)
+        worker.join()
+
+    # パースはワーカーでの 1 回だけ（書き込み側でもう一度パースしない）
+    parse.assert_called_once()
+    assert report.result.created == 2
+    assert report.parse_seconds > 0
+    assert set(Region.objects.values_list("code", flat=True)) == {
+        "JPN",
+        "AUTO_EUROPE",
+    }
+
+
+def test_chunk_queue_is_bounded_and_stops_after_close():
+    chunks = ChunkQueue(maxsize=1)
+    assert chunks.put("first")
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(chunks.put("second")))
+    worker.start()
+    # 書き込み側が読まない間は 2 つ目を保持しない
+    worker.join(timeout=0.3)
+    assert worker.is_alive()
+
+    chunks.close()
+    worker.join()
+    assert results == [False]
+
+
+def test_chunk_queue_raises_parse_errors():
+    chunks = ChunkQueue(maxsize=2)
+    chunks.put(ValueError("broken csv"))
+
+    with pytest.raises(ValueError, match="broken csv"):
+        list(chunks)
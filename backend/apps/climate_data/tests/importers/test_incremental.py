@@ -0,0 +1,138 @@
+import pytest
+
+from apps.climate_data.importers.incremental import plan_incremental
+from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+from apps.climate_data.utils.upsert_helpers import ClimateRecord
+
+
+@pytest.fixture
+def series():
+    """
+    JPN の 2000〜2010 年のデータ（値 = 年 / 1000）
+    """
+    group = IndicatorGroup.objects.create(name="CO2")
+    indicator = Indicator.objects.create(
+        group=group,
+        name="Total CO2 emissions",
+        unit="tonnes",
+        data_source_name="OWID",
+        data_source_url="https://ourworldindata.org/",
+    )
+    region = Region.objects.create(name="Japan", code="JPN")
+    for year in range(2000, 2011):
+        ClimateData.objects.create(
+            region=region, indicator=indicator, year=year, value=year / 1000
+        )
+    return indicator, region
+
+
+def _records(indicator, region, years, *, overrides=None):
+    overrides = overrides or {}
+    return [
+        ClimateRecord(region.pk, indicator.pk, year, overrides.get(year, year / 1000))
+        for year in years
+    ]
+
+
+@pytest.mark.django_db
+def test_plan_keeps_only_recent_window(series):
+    indicator, region = series
+
+    # 2011 年が追加され、2010 年が改訂された
+    records = _records(indicator, region, range(2000, 2012), overrides={2010: 9.9})
+    plan = plan_incremental(records, [indicator.pk], window_years=3)
+
+    assert plan.is_incremental
+    assert plan.window_start == 2008
+    assert [record.year for record in plan.records] == [2008, 2009, 2010, 2011]
+
+
+@pytest.mark.django_db
+def test_plan_falls_back_when_old_year_revised(series):
+    indicator, region = series
+
+    records = _records(indicator, region, range(2000, 2012), overrides={2001: 9.9})
+    plan = plan_incremental(records, [indicator.pk], window_years=3)
+
+    assert not plan.is_incremental
+    assert "revisions detected before 2008" in plan.fallback_reason
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        # 2 つの年の値が入れ替わった（合計は変わらない）
+        {2001: 2.002, 2002: 2.001},
+        # 年をまたいで +x と -x で相殺された
+        {2001: 2.001 + 0.5, 2004: 2.004 - 0.5},
+    ],
+)
+def test_plan_falls_back_when_old_revision_keeps_sum(series, overrides):
+    indicator, region = series
+
+    records = _records(indicator, region, range(2000, 2012), overrides=overrides)
+    plan = plan_incremental(records, [indicator.pk], window_years=3)
+
+    assert not plan.is_incremental
+    assert "revisions detected before 2008" in plan.fallback_reason
+
+
+@pytest.mark.django_db
+def test_plan_falls_back_on_small_revision_of_large_value():
+    """
+    大きな値（約 3.7e10）のわずかな改訂も見逃さないことを確認する
+    """
+    group = IndicatorGroup.objects.create(name="CO2")
+    indicator = Indicator.objects.create(
+        group=group,
+        name="Total CO2 emissions",
+        unit="tonnes",
+        data_source_name="OWID",
+        data_source_url="https://ourworldindata.org/",
+    )
+    region = Region.objects.create(name="World", code="OWID_WRL")
+    values = {year: 3.7e10 * (year - 1749) / 275 for year in range(1750, 2025)}
+    ClimateData.objects.bulk_create(
+        ClimateData(region=region, indicator=indicator, year=year, value=value)
+        for year, value in values.items()
+    )
+
+    records = [
+        ClimateRecord(
+            region.pk, indicator.pk, year, value + 1.0 if year == 1900 else value
+        )
+        for year, value in values.items()
+    ]
+    plan = plan_incremental(records, [indicator.pk], window_years=3)
+
+    assert plan.fallback_reason == "revisions detected before 2022"
+
+
+@pytest.mark.django_db
+def test_plan_falls_back_when_old_year_removed(series):
+    indicator, region = series
+
+    records = _records(indicator, region, range(2001, 2012))
+    plan = plan_incremental(records, [indicator.pk], window_years=3)
+
+    assert not plan.is_incremental
+
+
+@pytest.mark.django_db
+def test_plan_falls_back_when_new_series_appears(series):
+    indicator, region = series
+    usa = Region.objects.create(name="USA", code="USA")
+
+    records = _records(indicator, region, range(2000, 2012))
+    records += _records(indicator, usa, [2000])
+    plan = plan_incremental(records, [indicator.pk], window_years=3)
+
+    assert plan.fallback_reason == "series changed before 2008"
+
+
+@pytest.mark.django_db
+def test_plan_falls_back_without_existing_data():
+    plan = plan_incremental([], [12345])
+
+    assert plan.fallback_reason == "no existing data"
@@ -0,0 +1,47 @@
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.importers.base import OWIDImporter
+from apps.climate_data.importers.co2 import CO2Importer
+from apps.climate_data.importers.registry import IMPORTER_CLASSES, _importer_class
+from apps.climate_data.importers.temperature import TemperatureImporter
+
+
+def test_every_group_has_an_importer():
+    assert IMPORTER_CLASSES == {
+        "TEMPERATURE": TemperatureImporter,
+        "CO2": CO2Importer,
+    }
+
+
+def test_group_without_subclass_is_imported_from_config(monkeypatch):
+    monkeypatch.setattr(OWIDImporter, "IMPORTERS", dict(OWIDImporter.IMPORTERS))
+    monkeypatch.setitem(
+        CLIMATE_GROUPS,
+        "SEA_LEVEL",
+        {
+            "group": {"name": "Sea level", "description": "Sea level rise"},
+            "source": {
+                "data_source_name": "OWID",
+                "data_source_url": "https://ourworldindata.org/",
+                "csv_url": "https://example.com/sea-level.csv",
+            },
+            "indicators": {
+                "sea_level": {"name": "Sea level", "unit": "mm", "description": ""},
+            },
+        },
+    )
+
+    importer = _importer_class("SEA_LEVEL")()
+
+    assert importer.csv_url == "https://example.com/sea-level.csv"
+    assert importer.indicator_defs() == {
+        "sea_level": {
+            "name": "Sea level",
+            "defaults": {
+                "unit": "mm",
+                "description": "",
+                "data_source_name": "OWID",
+                "data_source_url": "https://ourworldindata.org/",
+                "metadata_url": "",
+            },
+        }
+    }
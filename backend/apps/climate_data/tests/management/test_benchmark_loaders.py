@@ -0,0 +1,30 @@
+import pytest
+from django.core.management import call_command
+
+from apps.climate_data.models import ClimateData, Indicator, Region
+
+
+@pytest.mark.django_db
+def test_benchmark_loaders_leaves_database_unchanged(owid_csv, capsys):
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": str(year),
+                "emissions_total": "100",
+            }
+            for year in range(2000, 2010)
+        ]
+    )
+
+    call_command("benchmark_loaders", "--group", "CO2", "--repeat", "2")
+
+    captured = capsys.readouterr()
+    assert "10 records" in captured.out
+    assert "[orm] run 1" in captured.out
+    assert "[orm] run 2" in captured.out
+
+    assert ClimateData.objects.count() == 0
+    assert Region.objects.count() == 0
+    assert Indicator.objects.count() == 0
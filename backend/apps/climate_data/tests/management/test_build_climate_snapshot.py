@@ -0,0 +1,58 @@
+import pytest
+from django.core.management import call_command
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+from apps.climate_data.store import GroupData, build_snapshot, snapshot_path
+
+CO2_GROUP_NAME = CLIMATE_GROUPS["CO2"]["group"]["name"]
+
+
+@pytest.fixture
+def published():
+    group = IndicatorGroup.objects.create(name=CO2_GROUP_NAME)
+    indicator = Indicator.objects.create(name="CO2", group=group)
+    region = Region.objects.create(name="Japan", code="JPN")
+
+    version = DatasetVersion.objects.create(group=group)
+    ClimateData.objects.create(
+        region=region, indicator=indicator, year=2000, value=1.5, version=version
+    )
+    version.publish()
+    return version
+
+
+@pytest.mark.django_db
+def test_builds_snapshot_of_published_version(published, capsys):
+    call_command("build_climate_snapshot", "--group", "CO2")
+
+    captured = capsys.readouterr()
+    assert f"[{CO2_GROUP_NAME}] v{published.pk}" in captured.out
+
+    data = GroupData.open(snapshot_path(CO2_GROUP_NAME, published.pk))
+    assert [list(rows.tuples()) for rows in map(data.rows, data.series)] == [
+        [(2000, "JPN", 1.5)]
+    ]
+
+
+@pytest.mark.django_db
+def test_removes_snapshots_of_deleted_versions(published, capsys):
+    build_snapshot(CO2_GROUP_NAME, published.pk + 100)
+
+    call_command("build_climate_snapshot", "--group", "CO2")
+
+    assert f"removed snapshots: v{published.pk + 100}" in capsys.readouterr().out
+    assert not snapshot_path(CO2_GROUP_NAME, published.pk + 100).exists()
+
+
+@pytest.mark.django_db
+def test_skips_group_without_published_version(capsys):
+    call_command("build_climate_snapshot")
+
+    assert "no published version; skipped." in capsys.readouterr().out
@@ -0,0 +1,91 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.climate_data.importers.co2 import CO2Importer
+from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+
+
+def _values():
+    return list(
+        ClimateData.objects.published()
+        .order_by("indicator__name", "region__code", "year")
+        .values_list("region__code", "year", "value")
+    )
+
+
+@pytest.mark.django_db
+def test_generate_writes_requested_scale(capsys):
+    call_command(
+        "generate_synthetic_climate",
+        "--regions",
+        "3",
+        "--years",
+        "4",
+        "--indicators",
+        "2",
+    )
+
+    assert Region.objects.count() == 3
+    assert Indicator.objects.filter(group__name="Synthetic").count() == 2
+    assert ClimateData.objects.published().count() == 3 * 4 * 2
+    assert "24 rows written" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_generate_is_deterministic_for_seed():
+    args = ["generate_synthetic_climate", "--regions", "2", "--years", "5"]
+
+    call_command(*args, "--seed", "1")
+    first = _values()
+
+    call_command(*args, "--seed", "1")
+    assert _values() == first
+
+    call_command(*args, "--seed", "2")
+    assert _values() != first
+
+
+@pytest.mark.django_db
+def test_generate_skips_missing_values():
+    call_command(
+        "generate_synthetic_climate",
+        "--regions",
+        "10",
+        "--years",
+        "10",
+        "--indicators",
+        "1",
+        "--missing-rate",
+        "0.5",
+    )
+
+    assert 0 < ClimateData.objects.published().count() < 100
+
+
+@pytest.mark.django_db
+def test_generate_rejects_importer_group_name():
+    with pytest.raises(CommandError):
+        call_command("generate_synthetic_climate", "--group-name", "Temperature")
+
+
+@pytest.mark.django_db
+def test_generated_csv_can_be_imported_offline(tmp_path, settings):
+    settings.CLIMATE_SOURCE_CACHE_DIR = tmp_path / "cache"
+
+    call_command(
+        "generate_synthetic_climate",
+        "--regions",
+        "3",
+        "--years",
+        "4",
+        "--csv-dir",
+        str(tmp_path),
+    )
+
+    # requests をモックしていないので、ネットワークを使うと失敗する
+    report = CO2Importer(source_url=str(tmp_path / "co2.csv")).run()
+
+    assert report.result.created == 12
+    assert IndicatorGroup.objects.filter(name="CO₂ Emissions").exists()
+    assert (tmp_path / "temperature.csv").exists()
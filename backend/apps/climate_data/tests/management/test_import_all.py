@@ -0,0 +1,71 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.climate_data.constants import CLIMATE_GROUPS
+from apps.climate_data.models import ClimateData, Indicator, Region
+
+
+@pytest.fixture
+def owid_sources(owid_csv):
+    """
+    CO2 / Temperature それぞれの URL に CSV を設定する
+    """
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "1060000000",
+            }
+        ],
+        url=CLIMATE_GROUPS["CO2"]["source"]["csv_url"],
+    )
+    owid_csv(
+        [
+            {
+                "Entity": "World",
+                "Code": "OWID_WRL",
+                "Year": "2020",
+                "near_surface_temperature_anomaly": "0.98",
+                "near_surface_temperature_anomaly_lower": "0.85",
+                "near_surface_temperature_anomaly_upper": "1.12",
+            }
+        ],
+        url=CLIMATE_GROUPS["TEMPERATURE"]["source"]["csv_url"],
+    )
+    return owid_csv
+
+
+@pytest.mark.django_db
+def test_import_all_imports_every_group(owid_sources, capsys):
+    call_command("import_all", "--workers", "2")
+
+    assert Region.objects.filter(code__in=["JPN", "OWID_WRL"]).count() == 2
+    assert Indicator.objects.count() == 4
+    # CO2 1 件 + Temperature 3 指標
+    assert ClimateData.objects.count() == 4
+
+    captured = capsys.readouterr()
+    assert "[CO2] download" in captured.out
+    assert "[TEMPERATURE] download" in captured.out
+    assert "All imports completed" in captured.out
+
+
+@pytest.mark.django_db
+def test_import_all_skips_unchanged_sources(owid_sources, capsys):
+    call_command("import_all")
+    capsys.readouterr()
+
+    call_command("import_all")
+    captured = capsys.readouterr()
+
+    assert captured.out.count("Nothing changed") == 2
+    assert ClimateData.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_import_all_rejects_invalid_workers():
+    with pytest.raises(CommandError):
+        call_command("import_all", "--workers", "0")
@@ -3,12 +3,17 @@ from unittest.mock import patch
 import pytest
 from django.core.management import call_command
 
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
 
 
 @pytest.mark.django_db
-@patch("apps.climate_data.management.commands.import_co2.fetch_csv")
-def test_import_creates_regions_indicators_and_climate_data(mock_fetch_csv):
+def test_import_creates_regions_indicators_and_climate_data(owid_csv):
     """
     CO2 インポートコマンドが
     - IndicatorGroup
@@ -21,27 +26,29 @@ def test_import_creates_regions_indicators_and_climate_data(mock_fetch_csv):
     # -------------------------
     # モック CSV データ
     # -------------------------
-    mock_fetch_csv.return_value = [
-        {
-            "Entity": "World",
-            "Code": "OWID_WRL",
-            "Year": "2020",
-            "emissions_total": "35000000000",
-        },
-        {
-            "Entity": "Japan",
-            "Code": "JPN",
-            "Year": "2020",
-            "emissions_total": "1060000000",
-        },
-        # 不正な行（Year が数字でない）
-        {
-            "Entity": "Invalid",
-            "Code": "INV",
-            "Year": "20XX",
-            "emissions_total": "123",
-        },
-    ]
+    owid_csv(
+        [
+            {
+                "Entity": "World",
+                "Code": "OWID_WRL",
+                "Year": "2020",
+                "emissions_total": "35000000000",
+            },
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "1060000000",
+            },
+            # 不正な行（Year が数字でない）
+            {
+                "Entity": "Invalid",
+                "Code": "INV",
+                "Year": "20XX",
+                "emissions_total": "123",
+            },
+        ]
+    )
 
     # -------------------------
     # コマンド実行
@@ -59,6 +66,7 @@ def test_import_creates_regions_indicators_and_climate_data(mock_fetch_csv):
     # -------------------------
     indicator = Indicator.objects.get(group=group)
     assert indicator.name == "Total CO₂ emissions"
+    assert indicator.key == "emissions_total"
     assert indicator.unit == "tonnes"
     assert "carbon dioxide" in indicator.description.lower()
 
@@ -94,8 +102,7 @@ def test_import_creates_regions_indicators_and_climate_data(mock_fetch_csv):
 
 
 @pytest.mark.django_db
-@patch("apps.climate_data.management.commands.import_co2.fetch_csv")
-def test_import_updates_existing_data(mock_fetch_csv):
+def test_import_updates_existing_data(owid_csv):
     """
     既存 ClimateData がある場合、値が更新されることを確認
     """
@@ -126,14 +133,16 @@ def test_import_updates_existing_data(mock_fetch_csv):
     # -------------------------
     # CSV 側の更新データ
     # -------------------------
-    mock_fetch_csv.return_value = [
-        {
-            "Entity": "Japan",
-            "Code": "JPN",
-            "Year": "2020",
-            "emissions_total": "200",
-        }
-    ]
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "200",
+            }
+        ]
+    )
 
     # -------------------------
     # 実行
@@ -146,10 +155,13 @@ def test_import_updates_existing_data(mock_fetch_csv):
     cd = ClimateData.objects.get(region=region, year=2020)
     assert cd.value == 200
 
+    # key の導入前に作成された Indicator には key が設定される
+    indicator.refresh_from_db()
+    assert indicator.key == "emissions_total"
+
 
 @pytest.mark.django_db
-@patch("apps.climate_data.management.commands.import_co2.fetch_csv")
-def test_import_does_not_update_when_value_is_same(mock_fetch_csv):
+def test_import_does_not_update_when_value_is_same(owid_csv):
     """
     既存 ClimateData と同じ値の場合、更新されないことを確認
     """
@@ -174,14 +186,16 @@ def test_import_does_not_update_when_value_is_same(mock_fetch_csv):
         value=200,
     )
 
-    mock_fetch_csv.return_value = [
-        {
-            "Entity": "Japan",
-            "Code": "JPN",
-            "Year": "2020",
-            "emissions_total": "200",
-        }
-    ]
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "200",
+            }
+        ]
+    )
 
     call_command("import_co2")
 
@@ -191,15 +205,10 @@ def test_import_does_not_update_when_value_is_same(mock_fetch_csv):
 
 
 @pytest.mark.django_db
-@patch("apps.climate_data.management.commands.import_co2.fetch_csv")
-@patch(
-    "apps.climate_data.management.commands.import_co2.ClimateData.objects.bulk_update"
-)
-def test_import_does_not_call_bulk_update_when_value_same(
-    mock_bulk_update, mock_fetch_csv
-):
+@patch("apps.climate_data.utils.upsert_helpers.ClimateData.objects.bulk_create")
+def test_import_does_not_write_when_value_same(mock_bulk_create, owid_csv):
     """
-    値が変わらない場合に bulk_update が呼ばれないことを確認する。
+    値が変わらない場合に書き込み（bulk upsert）が行われないことを確認する。
     パフォーマンス最適化のリグレッション防止用テスト。
     """
     group = IndicatorGroup.objects.create(
@@ -219,15 +228,224 @@ def test_import_does_not_call_bulk_update_when_value_same(
         value=200,
     )
 
-    mock_fetch_csv.return_value = [
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "200",
+            }
+        ]
+    )
+
+    call_command("import_co2")
+
+    mock_bulk_create.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_import_skips_when_source_unchanged(owid_csv, capsys):
+    """
+    前回インポートから CSV が変わっていない場合（304）、取り込みをスキップすることを確認
+    """
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "200",
+            }
+        ]
+    )
+
+    call_command("import_co2")
+    capsys.readouterr()
+
+    call_command("import_co2")
+    captured = capsys.readouterr()
+
+    # 2 回目は条件付きリクエストになり、取り込みは行われない
+    assert owid_csv.requests[-1]["headers"]["If-None-Match"] == '"v1"'
+    assert "Nothing changed" in captured.out
+    assert ClimateData.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_import_force_reimports_unchanged_source(owid_csv, capsys):
+    """
+    --force 指定時は内容が同じでも取り込みを行うことを確認
+    """
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "emissions_total": "200",
+            }
+        ]
+    )
+
+    call_command("import_co2")
+    capsys.readouterr()
+
+    call_command("import_co2", "--force")
+    captured = capsys.readouterr()
+
+    assert "Nothing changed" not in captured.out
+    assert "1 unchanged" in captured.out
+
+
+@pytest.mark.django_db
+def test_import_region_queries_do_not_scale_with_rows(
+    owid_csv, django_assert_max_num_queries
+):
+    """
+    地域の解決が行ごとのクエリにならないことを確認する（リグレッション防止）
+    """
+    owid_csv(
+        [
+            {
+                "Entity": f"Region {i}",
+                "Code": f"R{i:03}",
+                "Year": "2020",
+                "emissions_total": "100",
+            }
+            for i in range(200)
+        ]
+    )
+
+    with django_assert_max_num_queries(30):
+        call_command("import_co2")
+
+    assert Region.objects.count() == 200
+    assert ClimateData.objects.count() == 200
+
+
+def _co2_rows(years, *, overrides=None):
+    overrides = overrides or {}
+    return [
         {
             "Entity": "Japan",
             "Code": "JPN",
-            "Year": "2020",
-            "emissions_total": "200",
+            "Year": str(year),
+            "emissions_total": str(overrides.get(year, year)),
         }
+        for year in years
     ]
 
+
+@pytest.mark.django_db
+def test_incremental_import_writes_only_recent_years(owid_csv, capsys):
+    owid_csv(_co2_rows(range(2000, 2011)))
+    call_command("import_co2")
+    capsys.readouterr()
+
+    # 2011 年を追加し、2010 年を改訂
+    owid_csv(_co2_rows(range(2000, 2012), overrides={2010: 1}), etag='"v2"')
+    call_command("import_co2", "--incremental")
+    captured = capsys.readouterr()
+
+    assert "1 created, 1 updated, 2 unchanged" in captured.out
+    assert "incremental from 2008" in captured.out
+    published = ClimateData.objects.published()
+    assert published.get(year=2010).value == 1
+    assert published.count() == 12
+
+
+@pytest.mark.django_db
+def test_import_writes_only_changed_rows(owid_csv, capsys):
+    """
+    新しいバージョンには変更のあった行だけが書き込まれ、
+    公開中のバージョンの行は複製されないことを確認する
+    """
+    owid_csv(_co2_rows(range(2000, 2100)))
     call_command("import_co2")
+    assert ClimateData.objects.count() == 100
+
+    owid_csv(_co2_rows(range(2000, 2101), overrides={2099: 1}), etag='"v2"')
+    call_command("import_co2", "--incremental")
+
+    version = IndicatorGroup.objects.get().active_version
+    assert ClimateData.objects.filter(version=version).count() == 2
+    assert ClimateData.objects.count() == 102
+    published = ClimateData.objects.published()
+    assert published.count() == 101
+    assert published.get(year=2099).value == 1
+
+
+@pytest.mark.django_db
+def test_unchanged_import_writes_no_rows(owid_csv):
+    owid_csv(_co2_rows(range(2000, 2100)))
+    call_command("import_co2")
+
+    call_command("import_co2", "--force")
+
+    assert ClimateData.objects.count() == 100
+    assert DatasetVersion.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_incremental_import_falls_back_to_full_import(owid_csv, capsys):
+    owid_csv(_co2_rows(range(2000, 2011)))
+    call_command("import_co2")
+    capsys.readouterr()
+
+    # ウィンドウより前の 2001 年が改訂された
+    owid_csv(_co2_rows(range(2000, 2011), overrides={2001: 1}), etag='"v2"')
+    call_command("import_co2", "--incremental")
+    captured = capsys.readouterr()
+
+    assert "full import: revisions detected before 2008" in captured.out
+    assert ClimateData.objects.published().get(year=2001).value == 1
+
+
+@pytest.mark.django_db
+def test_import_publishes_new_version(owid_csv):
+    owid_csv(_co2_rows([2020]))
+    call_command("import_co2")
+    first = IndicatorGroup.objects.get().active_version
+
+    owid_csv(_co2_rows([2020], overrides={2020: 1}), etag='"v2"')
+    call_command("import_co2")
+    group = IndicatorGroup.objects.get()
+    first.refresh_from_db()
+
+    assert group.active_version != first
+    assert first.status == DatasetVersion.Status.RETIRED
+    assert ClimateData.objects.published().get().value == 1
+    # 公開終了したバージョンは猶予期間の間は残る
+    assert ClimateData.objects.filter(version=first).get().value == 2020
+
+
+@pytest.mark.django_db
+def test_import_discards_version_when_nothing_changed(owid_csv):
+    owid_csv(_co2_rows([2020]))
+    call_command("import_co2")
+    active = IndicatorGroup.objects.get().active_version
+
+    call_command("import_co2", "--force")
+
+    assert IndicatorGroup.objects.get().active_version == active
+    assert DatasetVersion.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_failed_import_keeps_active_version(owid_csv):
+    owid_csv(_co2_rows([2020]))
+    call_command("import_co2")
+    active = IndicatorGroup.objects.get().active_version
+
+    owid_csv(_co2_rows([2020], overrides={2020: 1}), etag='"v2"')
+    with patch(
+        "apps.climate_data.importers.base.load_climate_data",
+        side_effect=RuntimeError("boom"),
+    ):
+        with pytest.raises(RuntimeError):
+            call_command("import_co2")
 
-    mock_bulk_update.assert_not_called()
+    assert IndicatorGroup.objects.get().active_version == active
+    assert DatasetVersion.objects.count() == 1
+    assert ClimateData.objects.published().get().value == 2020
@@ -1,5 +1,3 @@
-from unittest.mock import patch
-
 import pytest
 from django.core.management import call_command
 
@@ -7,8 +5,7 @@ from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Reg
 
 
 @pytest.mark.django_db
-@patch("apps.climate_data.management.commands.import_temperature.fetch_csv")
-def test_temperature_import_creates_data(mock_fetch_csv, capsys):
+def test_temperature_import_creates_data(owid_csv, capsys):
     """
     Temperature import コマンドのテスト
     - IndicatorGroup
@@ -21,31 +18,33 @@ def test_temperature_import_creates_data(mock_fetch_csv, capsys):
     # -----------------------------
     # モックCSVデータ
     # -----------------------------
-    mock_fetch_csv.return_value = [
-        {
-            "Entity": "Japan",
-            "Code": "JPN",
-            "Year": "2020",
-            "near_surface_temperature_anomaly": "0.98",
-            "near_surface_temperature_anomaly_lower": "0.85",
-            "near_surface_temperature_anomaly_upper": "1.12",
-        },
-        {
-            "Entity": "Japan",
-            "Code": "JPN",
-            "Year": "2021",
-            "near_surface_temperature_anomaly": "1.02",
-            "near_surface_temperature_anomaly_lower": "0.90",
-            "near_surface_temperature_anomaly_upper": "1.15",
-        },
-        # 不正な行（Year が数字でない）
-        {
-            "Entity": "Invalid",
-            "Code": "INV",
-            "Year": "20XX",
-            "near_surface_temperature_anomaly": "1.0",
-        },
-    ]
+    owid_csv(
+        [
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2020",
+                "near_surface_temperature_anomaly": "0.98",
+                "near_surface_temperature_anomaly_lower": "0.85",
+                "near_surface_temperature_anomaly_upper": "1.12",
+            },
+            {
+                "Entity": "Japan",
+                "Code": "JPN",
+                "Year": "2021",
+                "near_surface_temperature_anomaly": "1.02",
+                "near_surface_temperature_anomaly_lower": "0.90",
+                "near_surface_temperature_anomaly_upper": "1.15",
+            },
+            # 不正な行（Year が数字でない）
+            {
+                "Entity": "Invalid",
+                "Code": "INV",
+                "Year": "20XX",
+                "near_surface_temperature_anomaly": "1.0",
+            },
+        ]
+    )
 
     # -----------------------------
     # コマンド実行
@@ -93,8 +92,8 @@ def test_temperature_import_creates_data(mock_fetch_csv, capsys):
     assert "created" in captured.out
 
     # -----------------------------
-    # 再実行して更新されること
+    # 再実行して更新されること（--force で未変更ソースも取り込む）
     # -----------------------------
-    call_command("import_temperature")
+    call_command("import_temperature", "--force")
     captured = capsys.readouterr()
     assert "updated" in captured.out
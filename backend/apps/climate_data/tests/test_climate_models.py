@@ -1,8 +1,18 @@
+from datetime import timedelta
+
 import pytest
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from django.utils import timezone
 
-from apps.climate_data.models import ClimateData, Indicator, IndicatorGroup, Region
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+from apps.climate_data.utils.upsert_helpers import ClimateRecord, upsert_climate_data
 
 
 @pytest.mark.django_db
@@ -80,6 +90,43 @@ class TestRegion:
         assert cache["AUTO_SOUTH_AMERICA"] == region
         assert Region.objects.count() == 1
 
+    # -----------------------------------------
+    # owid_key / bulk_resolve のテスト
+    # -----------------------------------------
+    def test_owid_key_uses_generated_code_when_code_missing(self):
+        assert Region.owid_key({"Entity": " Japan ", "Code": "JPN"}) == ("JPN", "Japan")
+        assert Region.owid_key({"Entity": "Europe", "Code": ""}) == (
+            "AUTO_EUROPE",
+            "Europe",
+        )
+
+    def test_bulk_resolve_creates_missing_regions(self):
+        existing = Region.objects.create(name="Japan", code="JPN")
+
+        region_ids = Region.bulk_resolve(
+            {"JPN": "Japan", "USA": "United States", "AUTO_EUROPE": "Europe"}
+        )
+
+        assert region_ids["JPN"] == existing.pk
+        assert set(region_ids) == {"JPN", "USA", "AUTO_EUROPE"}
+        assert Region.objects.get(pk=region_ids["USA"]).name == "United States"
+        assert Region.objects.count() == 3
+
+    def test_bulk_resolve_query_count_does_not_depend_on_region_count(
+        self, django_assert_max_num_queries, monkeypatch
+    ):
+        monkeypatch.setattr(Region, "BULK_CHUNK_SIZE", 100)
+        names_by_code = {f"R{i:03}": f"Region {i}" for i in range(100)}
+
+        # SELECT + INSERT + SELECT
+        with django_assert_max_num_queries(3):
+            region_ids = Region.bulk_resolve(names_by_code)
+
+        assert len(region_ids) == 100
+
+    def test_bulk_resolve_empty(self):
+        assert Region.bulk_resolve({}) == {}
+
 
 @pytest.mark.django_db
 class TestIndicatorGroup:
@@ -211,3 +258,180 @@ class TestClimateData:
 
         with pytest.raises(ValidationError):
             climate_data.full_clean()
+
+
+@pytest.mark.django_db
+class TestDatasetVersion:
+    def _create_base_objects(self):
+        region = Region.objects.create(name="Japan", code="JP")
+        group = IndicatorGroup.objects.create(name="CO2")
+        indicator = Indicator.objects.create(
+            group=group,
+            name="Total CO2 emissions",
+            unit="tonnes",
+            data_source_name="OWID",
+            data_source_url="https://ourworldindata.org/",
+        )
+        return region, indicator
+
+    def test_copy_unversioned_rows(self):
+        region, indicator = self._create_base_objects()
+        ClimateData.objects.create(
+            region=region, indicator=indicator, year=2020, value=1.0
+        )
+        version = DatasetVersion.objects.create(group=indicator.group)
+
+        assert version.copy_unversioned_rows() == 1
+        assert ClimateData.objects.get(version=version).value == 1.0
+
+    def test_copy_unversioned_rows_only_copies_own_group(self):
+        region, indicator = self._create_base_objects()
+        other_group = IndicatorGroup.objects.create(name="Temperature")
+        other_indicator = Indicator.objects.create(
+            group=other_group,
+            name="Mean temperature",
+            unit="℃",
+            data_source_name="NOAA",
+            data_source_url="https://example.com/source",
+        )
+        ClimateData.objects.create(
+            region=region, indicator=other_indicator, year=2020, value=1.0
+        )
+        version = DatasetVersion.objects.create(group=indicator.group)
+
+        assert version.copy_unversioned_rows() == 0
+
+    def test_publish_switches_active_version(self):
+        region, indicator = self._create_base_objects()
+        group = indicator.group
+        ClimateData.objects.create(
+            region=region, indicator=indicator, year=2020, value=1.0
+        )
+
+        first = DatasetVersion.objects.create(group=group)
+        first.copy_unversioned_rows()
+        first.publish()
+
+        group.refresh_from_db()
+        assert group.active_version == first
+        # 初回公開でバージョンなしのデータは置き換えられる
+        assert not ClimateData.objects.filter(version__isnull=True).exists()
+
+        second = DatasetVersion.objects.create(group=group)
+        upsert_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2020, 2.0)], version_id=second.pk
+        )
+        second.publish()
+
+        group.refresh_from_db()
+        first.refresh_from_db()
+        assert group.active_version == second
+        assert first.status == DatasetVersion.Status.RETIRED
+        assert first.retired_at is not None
+        assert ClimateData.objects.published().get().value == 2.0
+
+    def test_published_returns_unversioned_data_before_first_publish(self):
+        region, indicator = self._create_base_objects()
+        ClimateData.objects.create(
+            region=region, indicator=indicator, year=2020, value=1.0
+        )
+        # 構築中のバージョンは読み取り側に見えない
+        building = DatasetVersion.objects.create(group=indicator.group)
+        building.copy_unversioned_rows()
+
+        assert ClimateData.objects.published().get().version is None
+
+    def test_collect_garbage_keeps_versions_within_grace_period(self):
+        _, indicator = self._create_base_objects()
+        group = indicator.group
+        old = DatasetVersion.objects.create(group=group)
+        old.publish()
+        new = DatasetVersion.objects.create(group=group)
+        new.publish()
+
+        assert DatasetVersion.collect_garbage(grace_period=timedelta(hours=1)) == 0
+        assert DatasetVersion.objects.filter(pk=old.pk).exists()
+
+        DatasetVersion.objects.filter(pk=old.pk).update(
+            retired_at=timezone.now() - timedelta(hours=2)
+        )
+        DatasetVersion.collect_garbage(grace_period=timedelta(hours=1))
+
+        assert not DatasetVersion.objects.filter(pk=old.pk).exists()
+        assert DatasetVersion.objects.filter(pk=new.pk).exists()
+
+    def test_new_version_holds_only_changed_rows(self):
+        region, indicator = self._create_base_objects()
+        first = DatasetVersion.objects.create(group=indicator.group)
+        upsert_climate_data(
+            [
+                ClimateRecord(region.pk, indicator.pk, year, float(year))
+                for year in range(2000, 2010)
+            ],
+            version_id=first.pk,
+        )
+        first.publish()
+
+        second = DatasetVersion.objects.create(group=indicator.group)
+        upsert_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2009, 0.0)], version_id=second.pk
+        )
+
+        # 新バージョンには変更した 1 行だけが書き込まれ、残りは以前のバージョンの行が見える
+        assert ClimateData.objects.filter(version=second).count() == 1
+        visible = ClimateData.objects.in_version(second.pk)
+        assert visible.count() == 10
+        assert visible.get(year=2009).value == 0.0
+        # 公開前は以前のバージョンの値のまま
+        assert ClimateData.objects.published().get(year=2009).value == 2009.0
+
+        second.publish()
+        assert ClimateData.objects.published().get(year=2009).value == 0.0
+        assert ClimateData.objects.in_version(first.pk).get(year=2009).value == 2009.0
+
+    def test_deleting_building_version_restores_superseded_rows(self):
+        region, indicator = self._create_base_objects()
+        first = DatasetVersion.objects.create(group=indicator.group)
+        upsert_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2020, 1.0)], version_id=first.pk
+        )
+        first.publish()
+
+        building = DatasetVersion.objects.create(group=indicator.group)
+        upsert_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2020, 2.0)], version_id=building.pk
+        )
+        building.delete()
+
+        assert ClimateData.objects.get().superseded_by is None
+        assert ClimateData.objects.published().get().value == 1.0
+
+    def test_collect_garbage_keeps_rows_still_visible(self):
+        region, indicator = self._create_base_objects()
+        old = DatasetVersion.objects.create(group=indicator.group)
+        upsert_climate_data(
+            [
+                ClimateRecord(region.pk, indicator.pk, 2019, 1.0),
+                ClimateRecord(region.pk, indicator.pk, 2020, 1.0),
+            ],
+            version_id=old.pk,
+        )
+        old.publish()
+        new = DatasetVersion.objects.create(group=indicator.group)
+        upsert_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2020, 2.0)], version_id=new.pk
+        )
+        new.publish()
+        DatasetVersion.objects.filter(pk=old.pk).update(
+            retired_at=timezone.now() - timedelta(hours=2)
+        )
+
+        DatasetVersion.collect_garbage(grace_period=timedelta(hours=1))
+
+        # 置き換えられた 2020 年の行だけが削除され、2019 年の行は old に残る
+        assert DatasetVersion.objects.filter(pk=old.pk).exists()
+        assert dict(ClimateData.objects.published().values_list("year", "value")) == {
+            2019: 1.0,
+            2020: 2.0,
+        }
+        assert ClimateData.objects.count() == 2
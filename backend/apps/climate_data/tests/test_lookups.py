@@ -0,0 +1,88 @@
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.climate_data.lookups import get_indicator_ids, get_indicators
+from apps.climate_data.models import DatasetVersion, Indicator, IndicatorGroup
+
+
+@pytest.mark.django_db
+class TestGetIndicatorIds:
+    @pytest.fixture
+    def group(self):
+        return IndicatorGroup.objects.create(name="Temperature")
+
+    def test_returns_existing_indicators_only(self, group):
+        upper = Indicator.objects.create(name="Upper", group=group)
+
+        assert get_indicator_ids("Temperature", ["Upper", "Lower"]) == {
+            "Upper": upper.pk
+        }
+
+    def test_result_is_cached(self, group, django_assert_num_queries):
+        Indicator.objects.create(name="Upper", group=group)
+        get_indicator_ids("Temperature", ["Upper"])
+
+        with django_assert_num_queries(0):
+            get_indicator_ids("Temperature", ["Upper"])
+
+    def test_created_indicator_invalidates_cache(self, group):
+        assert get_indicator_ids("Temperature", ["Upper"]) == {}
+
+        upper = Indicator.objects.create(name="Upper", group=group)
+
+        assert get_indicator_ids("Temperature", ["Upper"]) == {"Upper": upper.pk}
+
+    def test_publish_keeps_cache(self, group, django_assert_num_queries):
+        Indicator.objects.create(name="Upper", group=group)
+        get_indicator_ids("Temperature", ["Upper"])
+
+        DatasetVersion.objects.create(group=group).publish()
+
+        with django_assert_num_queries(0):
+            get_indicator_ids("Temperature", ["Upper"])
+
+
+@pytest.mark.django_db
+class TestGetIndicators:
+    @pytest.fixture
+    def indicator(self):
+        group = IndicatorGroup.objects.create(name="CO2")
+        return Indicator.objects.create(
+            name="Total", key="emissions_total", unit="t", group=group
+        )
+
+    def test_resolves_ids_and_keys(self, indicator):
+        info = {
+            "id": indicator.pk,
+            "key": "emissions_total",
+            "name": "Total",
+            "unit": "t",
+            "group": "CO2",
+        }
+
+        assert get_indicators([str(indicator.pk), "emissions_total", "unknown"]) == {
+            str(indicator.pk): info,
+            "emissions_total": info,
+        }
+
+    def test_changed_key_invalidates_cache(self, indicator):
+        assert "emissions_total" in get_indicators(["emissions_total"])
+
+        indicator.key = "co2_total"
+        indicator.save()
+
+        assert get_indicators(["emissions_total"]) == {}
+
+    def test_cache_is_shared_by_any_refs(self, indicator, django_assert_num_queries):
+        get_indicators(["emissions_total"])
+
+        # クライアントの指定ごとにキャッシュのキーを作らない
+        with django_assert_num_queries(0):
+            assert list(get_indicators([str(indicator.pk)])) == [str(indicator.pk)]
+            assert get_indicators([f"unknown{i}" for i in range(1000)]) == {}
+
+    def test_key_must_not_be_numeric(self, indicator):
+        indicator.key = "123"
+
+        with pytest.raises(ValidationError):
+            indicator.full_clean()
@@ -0,0 +1,193 @@
+import math
+
+import numpy as np
+import pytest
+
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+from apps.climate_data.store import (
+    ClimateDataStore,
+    GroupData,
+    build_snapshot,
+    prune_snapshots,
+    snapshot_path,
+)
+
+
+@pytest.mark.django_db
+class TestClimateDataStore:
+    @pytest.fixture
+    def group(self):
+        return IndicatorGroup.objects.create(name="Temperature")
+
+    @pytest.fixture
+    def indicators(self, group):
+        return (
+            Indicator.objects.create(name="Upper", group=group),
+            Indicator.objects.create(name="Lower", group=group),
+        )
+
+    @pytest.fixture
+    def version(self, group, indicators):
+        upper, lower = indicators
+        world = Region.objects.create(name="World", code="OWID_WRL")
+        japan = Region.objects.create(name="Japan", code="JPN")
+
+        version = DatasetVersion.objects.create(group=group)
+        for year in [2001, 2000, 2002]:
+            for region in [world, japan]:
+                ClimateData.objects.create(
+                    region=region,
+                    indicator=upper,
+                    year=year,
+                    value=year + 0.5,
+                    version=version,
+                )
+        # Lower は World の 2000 年だけ
+        ClimateData.objects.create(
+            region=world, indicator=lower, year=2000, value=-1.0, version=version
+        )
+        version.publish()
+        return version
+
+    def _data(self, group, version) -> GroupData:
+        return GroupData.load(group.name, version.pk)
+
+    # ===============================
+    # ✅ 指標ごとの行
+    # ===============================
+    def test_rows_are_ordered_by_year_and_code(self, group, version, indicators):
+        rows = self._data(group, version).rows(indicators[0].pk)
+
+        assert list(rows.tuples()) == [
+            (2000, "JPN", 2000.5),
+            (2000, "OWID_WRL", 2000.5),
+            (2001, "JPN", 2001.5),
+            (2001, "OWID_WRL", 2001.5),
+            (2002, "JPN", 2002.5),
+            (2002, "OWID_WRL", 2002.5),
+        ]
+
+    def test_load_skips_years_outside_int16(self, group, version, indicators, caplog):
+        ClimateData.objects.create(
+            region=Region.objects.get(code="JPN"),
+            indicator=indicators[0],
+            year=40000,
+            value=1.0,
+            version=version,
+        )
+
+        rows = self._data(group, version).rows(indicators[0].pk)
+
+        # 桁あふれした年（40000 → -25536）として返さない
+        assert sorted(set(rows.years.tolist())) == [2000, 2001, 2002]
+        assert "Skipped 1 rows" in caplog.text
+
+    def test_rows_filtered_by_year_and_region(self, group, version, indicators):
+        rows = self._data(group, version).rows(
+            indicators[0].pk,
+            {"year__gte": 2001, "year__lte": 2002, "region__code__in": ["JPN"]},
+        )
+
+        assert list(rows.tuples()) == [(2001, "JPN", 2001.5), (2002, "JPN", 2002.5)]
+        assert rows.region_names.tolist() == ["Japan", "Japan"]
+
+    def test_unknown_region_and_indicator_are_empty(self, group, version, indicators):
+        data = self._data(group, version)
+
+        assert len(data.rows(indicators[0].pk, {"region__code__in": ["USA"]})) == 0
+        assert len(data.rows(0)) == 0
+
+    # ===============================
+    # ✅ ピボット
+    # ===============================
+    def test_pivot_fills_missing_values_with_nan(self, group, version, indicators):
+        upper, lower = indicators
+        names, years, columns = self._data(group, version).pivot(
+            {"upper": upper.pk, "lower": lower.pk}, {"year__lte": 2001}
+        )
+
+        # 地域名 → year の順
+        assert names.tolist() == ["Japan", "Japan", "World", "World"]
+        assert years.tolist() == [2000, 2001, 2000, 2001]
+        assert columns["upper"].tolist() == [2000.5, 2001.5, 2000.5, 2001.5]
+        lower_values = columns["lower"].tolist()
+        assert [math.isnan(value) for value in lower_values] == [
+            True,
+            True,
+            False,
+            True,
+        ]
+        assert lower_values[2] == -1.0
+
+    # ===============================
+    # ✅ バージョンごとのキャッシュ
+    # ===============================
+    def test_version_is_loaded_once(self, group, version, django_assert_num_queries):
+        store = ClimateDataStore()
+        data = store.get(group.name, version.pk)
+
+        with django_assert_num_queries(0):
+            assert store.get(group.name, version.pk) is data
+
+    def test_keeps_latest_versions_only(self, group, version):
+        store = ClimateDataStore()
+        first = store.get(group.name, version.pk)
+
+        for _ in range(2):
+            newer = DatasetVersion.objects.create(group=group)
+            newer.publish()
+            store.get(group.name, newer.pk)
+
+        # 最も古いバージョンは破棄され、再度読み込まれる
+        assert store.get(group.name, version.pk) is not first
+
+    # ===============================
+    # ✅ スナップショット（mmap）
+    # ===============================
+    def test_store_maps_snapshot(self, group, version, indicators):
+        data = ClimateDataStore().get(group.name, version.pk)
+
+        assert snapshot_path(group.name, version.pk).is_dir()
+        assert isinstance(data.series[indicators[0].pk].values, np.memmap)
+
+    def test_snapshot_has_same_contents(self, group, version, indicators):
+        upper, lower = indicators
+        loaded = self._data(group, version)
+        mapped = GroupData.open(build_snapshot(group.name, version.pk))
+
+        filters = {"year__gte": 2001, "region__code__in": ["OWID_WRL"]}
+        assert list(mapped.rows(upper.pk, filters).tuples()) == list(
+            loaded.rows(upper.pk, filters).tuples()
+        )
+        indicator_ids = {"upper": upper.pk, "lower": lower.pk}
+        for expected, actual in zip(
+            loaded.pivot(indicator_ids), mapped.pivot(indicator_ids)
+        ):
+            if isinstance(expected, dict):
+                for field in expected:
+                    np.testing.assert_array_equal(actual[field], expected[field])
+            else:
+                np.testing.assert_array_equal(actual, expected)
+
+    def test_existing_snapshot_is_reused(
+        self, group, version, django_assert_num_queries
+    ):
+        build_snapshot(group.name, version.pk)
+
+        # 別プロセスのストアも DB にアクセスせずにスナップショットを開く
+        with django_assert_num_queries(0):
+            ClimateDataStore().get(group.name, version.pk)
+
+    def test_prune_removes_other_versions(self, group, version):
+        build_snapshot(group.name, version.pk)
+        build_snapshot(group.name, version.pk + 1)
+
+        assert prune_snapshots(group.name, [version.pk]) == [version.pk + 1]
+        assert snapshot_path(group.name, version.pk).is_dir()
+        assert not snapshot_path(group.name, version.pk + 1).exists()
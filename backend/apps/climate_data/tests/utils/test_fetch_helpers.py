@@ -0,0 +1,25 @@
+from apps.climate_data.utils.fetch_helpers import iter_decoded_lines
+
+# =========================
+# iter_decoded_lines のテスト
+# =========================
+
+
+def test_iter_decoded_lines_joins_lines_across_chunks():
+    chunks = [b"a,b\n1,", b"2\n3,4", b"\n"]
+    assert list(iter_decoded_lines(chunks)) == ["a,b\n", "1,2\n", "3,4\n"]
+
+
+def test_iter_decoded_lines_handles_split_multibyte_char():
+    encoded = "°C\n".encode("utf-8")
+    # "°" (2 バイト) の途中でチャンクを分割する
+    chunks = [encoded[:1], encoded[1:]]
+    assert list(iter_decoded_lines(chunks)) == ["°C\n"]
+
+
+def test_iter_decoded_lines_without_trailing_newline():
+    assert list(iter_decoded_lines([b"a\nb"])) == ["a\n", "b"]
+
+
+def test_iter_decoded_lines_empty():
+    assert list(iter_decoded_lines([])) == []
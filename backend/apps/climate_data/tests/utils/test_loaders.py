@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+from apps.climate_data.utils.loaders import (
+    copy_upsert_climate_data,
+    load_climate_data,
+)
+from apps.climate_data.utils.upsert_helpers import ClimateRecord, UpsertResult
+
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="COPY requires PostgreSQL"
+)
+
+
+@pytest.fixture
+def base_objects():
+    group = IndicatorGroup.objects.create(name="CO2")
+    indicator = Indicator.objects.create(
+        group=group,
+        name="Total CO2 emissions",
+        unit="tonnes",
+        data_source_name="OWID",
+        data_source_url="https://ourworldindata.org/",
+    )
+    region = Region.objects.create(name="Japan", code="JPN")
+    version = DatasetVersion.objects.create(group=group)
+    return indicator, region, version
+
+
+@pytest.mark.django_db
+def test_load_falls_back_to_orm_without_copy_support(base_objects):
+    indicator, region, version = base_objects
+
+    with patch(
+        "apps.climate_data.utils.loaders.copy_upsert_climate_data"
+    ) as mock_copy, patch(
+        "apps.climate_data.utils.loaders.supports_copy", return_value=False
+    ):
+        result = load_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2020, 1.0)],
+            version_id=version.pk,
+            loader="copy",
+        )
+
+    mock_copy.assert_not_called()
+    assert result.created == 1
+    assert ClimateData.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_load_orm_never_uses_copy(base_objects):
+    indicator, region, version = base_objects
+
+    with patch(
+        "apps.climate_data.utils.loaders.copy_upsert_climate_data"
+    ) as mock_copy, patch(
+        "apps.climate_data.utils.loaders.supports_copy", return_value=True
+    ):
+        load_climate_data(
+            [ClimateRecord(region.pk, indicator.pk, 2020, 1.0)],
+            version_id=version.pk,
+            loader="orm",
+        )
+
+    mock_copy.assert_not_called()
+
+
+def test_load_rejects_unknown_loader():
+    with pytest.raises(ValueError):
+        load_climate_data([], version_id=1, loader="unknown")
+
+
+@requires_postgresql
+@pytest.mark.django_db
+def test_copy_upsert_counts_and_merges(base_objects):
+    indicator, region, version = base_objects
+    ClimateData.objects.create(
+        version=version, region=region, indicator=indicator, year=2019, value=1.0
+    )
+    ClimateData.objects.create(
+        version=version, region=region, indicator=indicator, year=2020, value=1.0
+    )
+
+    result = copy_upsert_climate_data(
+        [
+            ClimateRecord(region.pk, indicator.pk, 2019, 1.0),  # 変更なし
+            ClimateRecord(region.pk, indicator.pk, 2020, 2.0),  # 更新
+            ClimateRecord(region.pk, indicator.pk, 2021, 3.0),
+            ClimateRecord(region.pk, indicator.pk, 2021, 4.0),  # 新規（後勝ち）
+        ],
+        version_id=version.pk,
+    )
+
+    assert result == UpsertResult(created=1, updated=1, unchanged=1)
+    assert ClimateData.objects.get(year=2020).value == 2.0
+    assert ClimateData.objects.get(year=2021).value == 4.0
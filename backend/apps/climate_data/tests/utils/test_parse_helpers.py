@@ -1,51 +1,54 @@
+import math
+
+import numpy as np
 import pytest
 
-from apps.climate_data.utils.parse_helpers import parse_float, parse_year
+from apps.climate_data.utils.parse_helpers import (
+    parse_float,
+    parse_float_array,
+    parse_str_array,
+    parse_year,
+    parse_year_array,
+)
+
+# スカラー版・バッチ版で共通のテストケース
+FLOAT_VALID_CASES = [
+    (1, 1.0),
+    (1.23, 1.23),
+    ("1", 1.0),
+    ("1.23", 1.23),
+    (" 2.5 ", 2.5),
+    (0, 0.0),
+    ("0", 0.0),
+]
+FLOAT_INVALID_CASES = [None, "", "abc", "1,23", {}, []]
+FLOAT_NAN_CASES = [float("nan"), "NaN", "nan"]
+
+YEAR_VALID_CASES = [
+    (2020, 2020),
+    ("2020", 2020),
+    (" 1999 ", 1999),
+    (0, 0),
+    ("0", 0),
+]
+YEAR_INVALID_CASES = [None, "", "abc", "20.5", "NaN", float("nan"), {}, []]
 
 # =========================
 # parse_float のテスト
 # =========================
 
 
-@pytest.mark.parametrize(
-    "value_raw, expected",
-    [
-        (1, 1.0),
-        (1.23, 1.23),
-        ("1", 1.0),
-        ("1.23", 1.23),
-        (" 2.5 ", 2.5),
-        (0, 0.0),
-        ("0", 0.0),
-    ],
-)
+@pytest.mark.parametrize("value_raw, expected", FLOAT_VALID_CASES)
 def test_parse_float_valid(value_raw, expected):
     assert parse_float(value_raw) == expected
 
 
-@pytest.mark.parametrize(
-    "value_raw",
-    [
-        None,
-        "",
-        "abc",
-        "1,23",
-        {},
-        [],
-    ],
-)
+@pytest.mark.parametrize("value_raw", FLOAT_INVALID_CASES)
 def test_parse_float_invalid(value_raw):
     assert parse_float(value_raw) is None
 
 
-@pytest.mark.parametrize(
-    "value_raw",
-    [
-        float("nan"),
-        "NaN",
-        "nan",
-    ],
-)
+@pytest.mark.parametrize("value_raw", FLOAT_NAN_CASES)
 def test_parse_float_nan(value_raw):
     assert parse_float(value_raw) is None
 
@@ -55,32 +58,94 @@ def test_parse_float_nan(value_raw):
 # =========================
 
 
-@pytest.mark.parametrize(
-    "value_raw, expected",
-    [
-        (2020, 2020),
-        ("2020", 2020),
-        (" 1999 ", 1999),
-        (0, 0),
-        ("0", 0),
-    ],
-)
+@pytest.mark.parametrize("value_raw, expected", YEAR_VALID_CASES)
 def test_parse_year_valid(value_raw, expected):
     assert parse_year(value_raw) == expected
 
 
-@pytest.mark.parametrize(
-    "value_raw",
-    [
-        None,
-        "",
-        "abc",
-        "20.5",
-        "NaN",
-        float("nan"),
-        {},
-        [],
-    ],
-)
+@pytest.mark.parametrize("value_raw", YEAR_INVALID_CASES)
 def test_parse_year_invalid(value_raw):
     assert parse_year(value_raw) is None
+
+
+# =========================
+# parse_float_array のテスト（スカラー版と同じケース）
+# =========================
+
+
+@pytest.mark.parametrize("value_raw, expected", FLOAT_VALID_CASES)
+def test_parse_float_array_valid(value_raw, expected):
+    values, valid = parse_float_array([value_raw])
+    assert valid.tolist() == [True]
+    assert values[0] == expected
+
+
+@pytest.mark.parametrize("value_raw", FLOAT_INVALID_CASES + FLOAT_NAN_CASES)
+def test_parse_float_array_invalid(value_raw):
+    values, valid = parse_float_array([value_raw])
+    assert valid.tolist() == [False]
+    assert math.isnan(values[0])
+
+
+def test_parse_float_array_matches_scalar_for_mixed_chunk():
+    """
+    不正な値を含むチャンク（フォールバック経路）でも要素ごとの結果が一致する
+    """
+    raw = [value for value, _ in FLOAT_VALID_CASES]
+    raw += FLOAT_INVALID_CASES + FLOAT_NAN_CASES
+
+    values, valid = parse_float_array(raw)
+
+    expected = [parse_float(value) for value in raw]
+    assert valid.tolist() == [value is not None for value in expected]
+    assert values[valid].tolist() == [value for value in expected if value is not None]
+
+
+def test_parse_float_array_empty():
+    values, valid = parse_float_array([])
+    assert values.dtype == np.float64
+    assert len(values) == len(valid) == 0
+
+
+# =========================
+# parse_year_array のテスト（スカラー版と同じケース）
+# =========================
+
+
+@pytest.mark.parametrize("value_raw, expected", YEAR_VALID_CASES)
+def test_parse_year_array_valid(value_raw, expected):
+    values, valid = parse_year_array([value_raw])
+    assert valid.tolist() == [True]
+    assert values[0] == expected
+
+
+@pytest.mark.parametrize("value_raw", YEAR_INVALID_CASES)
+def test_parse_year_array_invalid(value_raw):
+    _, valid = parse_year_array([value_raw])
+    assert valid.tolist() == [False]
+
+
+def test_parse_year_array_matches_scalar_for_mixed_chunk():
+    raw = [value for value, _ in YEAR_VALID_CASES] + YEAR_INVALID_CASES
+
+    values, valid = parse_year_array(raw)
+
+    expected = [parse_year(value) for value in raw]
+    assert valid.tolist() == [value is not None for value in expected]
+    assert values[valid].tolist() == [value for value in expected if value is not None]
+
+
+def test_parse_year_array_out_of_range_is_invalid():
+    values, valid = parse_year_array(["99999999999999999999", "2000"])
+
+    assert valid.tolist() == [False, True]
+    assert values[valid].tolist() == [2000]
+
+
+# =========================
+# parse_str_array のテスト
+# =========================
+
+
+def test_parse_str_array_strips_and_fills_missing():
+    assert parse_str_array([" JPN ", None, ""]).tolist() == ["JPN", "", ""]
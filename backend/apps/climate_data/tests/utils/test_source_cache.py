@@ -0,0 +1,76 @@
+import pytest
+
+from apps.climate_data.utils.source_cache import fetch_source
+
+URL = "https://example.com/data.csv"
+
+
+@pytest.fixture
+def rows():
+    return [
+        {"Entity": "Japan", "Code": "JPN", "Year": "2020"},
+        {"Entity": "World", "Code": "OWID_WRL", "Year": "2020"},
+    ]
+
+
+def test_fetch_source_downloads_and_caches(owid_csv, rows):
+    owid_csv(rows)
+
+    source = fetch_source(URL)
+
+    assert not source.not_modified
+    assert source.body_path.exists()
+    assert len(source.sha256) == 64
+    assert list(source.rows()) == rows
+    # rows() は何度でも読み直せる
+    assert list(source.rows()) == rows
+
+
+def test_fetch_source_sends_conditional_request(owid_csv, rows):
+    owid_csv(rows)
+
+    first = fetch_source(URL)
+    second = fetch_source(URL)
+
+    assert owid_csv.requests[0]["headers"] == {}
+    assert owid_csv.requests[1]["headers"]["If-None-Match"] == '"v1"'
+    assert second.not_modified
+    assert second.sha256 == first.sha256
+    assert list(second.rows()) == rows
+
+
+def test_mark_imported_is_persisted(owid_csv, rows):
+    owid_csv(rows)
+
+    source = fetch_source(URL)
+    assert not source.is_imported
+
+    source.mark_imported()
+
+    assert fetch_source(URL).is_imported
+
+
+def test_changed_content_is_not_imported(owid_csv, rows):
+    owid_csv(rows)
+    fetch_source(URL).mark_imported()
+
+    # 内容と ETag が変わった場合は再ダウンロードされ、未取り込み扱いになる
+    owid_csv(rows[:1], etag='"v2"')
+    source = fetch_source(URL)
+
+    assert not source.not_modified
+    assert not source.is_imported
+    assert list(source.rows()) == rows[:1]
+
+
+def test_fetch_source_reads_local_file(tmp_path, settings, rows):
+    settings.CLIMATE_SOURCE_CACHE_DIR = tmp_path / "sources"
+    path = tmp_path / "data.csv"
+    path.write_text("Entity,Code,Year\nJapan,JPN,2020\nWorld,OWID_WRL,2020\n")
+
+    first = fetch_source(str(path))
+    second = fetch_source(path.as_uri())
+
+    assert list(first.rows()) == rows
+    assert first.sha256 == second.sha256
+    assert fetch_source(str(path)).not_modified
@@ -0,0 +1,150 @@
+import pytest
+
+from apps.climate_data.models import (
+    ClimateData,
+    DatasetVersion,
+    Indicator,
+    IndicatorGroup,
+    Region,
+)
+from apps.climate_data.utils.upsert_helpers import (
+    ClimateRecord,
+    UpsertResult,
+    iter_batches,
+    upsert_climate_data,
+)
+
+
+@pytest.fixture
+def base_objects():
+    group = IndicatorGroup.objects.create(name="Temperature")
+    indicator = Indicator.objects.create(
+        group=group,
+        name="Mean temperature",
+        unit="℃",
+        data_source_name="NOAA",
+        data_source_url="https://example.com/source",
+    )
+    jpn = Region.objects.create(name="Japan", code="JPN")
+    usa = Region.objects.create(name="USA", code="USA")
+    version = DatasetVersion.objects.create(group=group)
+    return indicator, jpn, usa, version
+
+
+# =========================
+# iter_batches のテスト
+# =========================
+
+
+def test_iter_batches_splits_iterable():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_iter_batches_empty():
+    assert list(iter_batches([], 3)) == []
+
+
+# =========================
+# upsert_climate_data のテスト
+# =========================
+
+
+@pytest.mark.django_db
+def test_upsert_creates_records(base_objects):
+    indicator, jpn, usa, version = base_objects
+
+    result = upsert_climate_data(
+        [
+            ClimateRecord(jpn.pk, indicator.pk, 2020, 1.0),
+            ClimateRecord(usa.pk, indicator.pk, 2020, 2.0),
+        ],
+        version_id=version.pk,
+    )
+
+    assert result == UpsertResult(created=2, updated=0, unchanged=0)
+    assert ClimateData.objects.get(region=jpn, year=2020).value == 1.0
+    assert ClimateData.objects.get(region=usa, year=2020).value == 2.0
+
+
+@pytest.mark.django_db
+def test_upsert_counts_updated_and_unchanged(base_objects):
+    indicator, jpn, usa, version = base_objects
+    ClimateData.objects.create(
+        version=version, region=jpn, indicator=indicator, year=2020, value=1.0
+    )
+    ClimateData.objects.create(
+        version=version, region=usa, indicator=indicator, year=2020, value=2.0
+    )
+
+    result = upsert_climate_data(
+        [
+            ClimateRecord(jpn.pk, indicator.pk, 2020, 1.0),  # 変更なし
+            ClimateRecord(usa.pk, indicator.pk, 2020, 3.0),  # 更新
+            ClimateRecord(usa.pk, indicator.pk, 2021, 4.0),  # 新規
+        ],
+        version_id=version.pk,
+    )
+
+    assert result == UpsertResult(created=1, updated=1, unchanged=1)
+    assert result.written == 2
+    assert ClimateData.objects.get(region=usa, year=2020).value == 3.0
+    assert ClimateData.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_upsert_does_not_touch_unchanged_rows(base_objects):
+    indicator, jpn, _, version = base_objects
+    cd = ClimateData.objects.create(
+        version=version, region=jpn, indicator=indicator, year=2020, value=1.0
+    )
+
+    upsert_climate_data(
+        [ClimateRecord(jpn.pk, indicator.pk, 2020, 1.0)], version_id=version.pk
+    )
+
+    cd_after = ClimateData.objects.get(pk=cd.pk)
+    assert cd_after.updated_at == cd.updated_at
+
+
+@pytest.mark.django_db
+def test_upsert_duplicate_keys_last_wins(base_objects):
+    indicator, jpn, _, version = base_objects
+
+    result = upsert_climate_data(
+        [
+            ClimateRecord(jpn.pk, indicator.pk, 2020, 1.0),
+            ClimateRecord(jpn.pk, indicator.pk, 2020, 5.0),
+        ],
+        version_id=version.pk,
+    )
+
+    assert result.created == 1
+    assert ClimateData.objects.get(region=jpn, year=2020).value == 5.0
+
+
+@pytest.mark.django_db
+def test_upsert_processes_multiple_batches(base_objects):
+    indicator, jpn, _, version = base_objects
+
+    records = (ClimateRecord(jpn.pk, indicator.pk, year, 0.5) for year in range(10))
+    result = upsert_climate_data(records, version_id=version.pk, batch_size=3)
+
+    assert result.created == 10
+    assert ClimateData.objects.count() == 10
+
+
+@pytest.mark.django_db
+def test_upsert_does_not_touch_other_versions(base_objects):
+    indicator, jpn, _, version = base_objects
+    other = DatasetVersion.objects.create(group=indicator.group)
+    ClimateData.objects.create(
+        version=other, region=jpn, indicator=indicator, year=2020, value=1.0
+    )
+
+    result = upsert_climate_data(
+        [ClimateRecord(jpn.pk, indicator.pk, 2020, 2.0)], version_id=version.pk
+    )
+
+    assert result.created == 1
+    assert ClimateData.objects.get(version=other).value == 1.0
+    assert ClimateData.objects.get(version=version).value == 2.0
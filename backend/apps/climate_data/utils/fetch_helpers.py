@@ -1,21 +1,31 @@
-import csv
+import codecs
+from typing import Iterable, Iterator
 
-import requests
+# ストリーミング受信時のチャンクサイズ（バイト）
+CHUNK_SIZE = 64 * 1024
 
+# (接続タイムアウト, 読み込みタイムアウト) 秒
+REQUEST_TIMEOUT = (10, 60)
 
-def fetch_csv(url: str):
-    # 指定した URL から CSV データを取得
-    response = requests.get(url)
-    # 文字コードを UTF-8 に設定
-    response.encoding = "utf-8"
 
-    # 取得した CSV データを行ごとのリストに分割
-    lines = response.text.splitlines()
+def iter_decoded_lines(
+    chunks: Iterable[bytes], encoding: str = "utf-8"
+) -> Iterator[str]:
+    """
+    バイト列のチャンクを逐次デコードし、1 行ずつ（改行付きで）返す。
 
-    # csv.DictReader を使って CSV を辞書として読み込む
-    # これにより各行は {列名: 値} という辞書になる
-    reader = csv.DictReader(lines)
+    - マルチバイト文字がチャンク境界で分割されても正しくデコードする
+    - 保持するのは未完了の 1 行分だけなので、メモリ使用量はファイルサイズに依存しない
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    buffer = ""
 
-    # DictReader はイテレータなので、必要に応じて list() に変換すると
-    # 複数回アクセスできるリストの形になる
-    return reader
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
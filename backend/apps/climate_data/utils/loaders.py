@@ -0,0 +1,136 @@
+from typing import Iterable
+
+from django.db import connection, transaction
+
+from apps.climate_data.models import ClimateData
+from apps.climate_data.utils.upsert_helpers import (
+    ClimateRecord,
+    UpsertResult,
+    upsert_climate_data,
+)
+
+# ローダーの種類
+# - auto: PostgreSQL なら copy、それ以外は orm
+# - orm:  バッチ単位の INSERT ... ON CONFLICT（upsert_climate_data）
+# - copy: COPY FROM STDIN + ステージングテーブルからのマージ（PostgreSQL 専用）
+LOADER_CHOICES = ("auto", "orm", "copy")
+
+STAGING_TABLE = "climate_data_staging"
+
+
+def supports_copy() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def copy_upsert_climate_data(
+    records: Iterable[ClimateRecord], *, version_id: int
+) -> UpsertResult:
+    """
+    PostgreSQL の COPY を使って ClimateData を一括 upsert する。
+
+    1. 一時テーブル（WAL を書かない）を作成し、COPY FROM STDIN で全件流し込む
+    2. 変更のあった行だけを 1 文で本テーブルにマージする
+
+    - 同一キーが複数ある場合は後勝ち（seq の大きい方）
+    - 値が変わらない行は更新しない（updated_at も変わらない）
+    - 以前のバージョンの行は置き換え済みにするだけで書き換えない（upsert_climate_data と同じ）
+    """
+    table = ClimateData._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                seq bigint NOT NULL,
+                region_id bigint NOT NULL,
+                indicator_id bigint NOT NULL,
+                year integer NOT NULL,
+                value double precision NOT NULL
+            )
+            """
+        )
+
+        # psycopg3 の Cursor.copy（Django の CursorWrapper 経由で委譲される）
+        with cursor.copy(
+            f"COPY {STAGING_TABLE} (seq, region_id, indicator_id, year, value) "
+            "FROM STDIN"
+        ) as copy:
+            for seq, record in enumerate(records):
+                copy.write_row((seq, *record))
+
+        # このバージョンから見えている行と比較し、変更のあったものだけを書き込む。
+        # 以前のバージョンの行は書き換えず、置き換え済みにする
+        cursor.execute(
+            f"""
+            WITH src AS (
+                SELECT DISTINCT ON (region_id, indicator_id, year)
+                    region_id, indicator_id, year, value
+                FROM {STAGING_TABLE}
+                ORDER BY region_id, indicator_id, year, seq DESC
+            ),
+            changed AS (
+                SELECT src.*, cur.id AS current_id, cur.version_id AS current_version
+                FROM src
+                LEFT JOIN {table} AS cur
+                    ON cur.region_id = src.region_id
+                    AND cur.indicator_id = src.indicator_id
+                    AND cur.year = src.year
+                    AND cur.version_id <= %(version_id)s
+                    AND (
+                        cur.superseded_by_id IS NULL
+                        OR cur.superseded_by_id > %(version_id)s
+                    )
+                WHERE cur.id IS NULL OR cur.value IS DISTINCT FROM src.value
+            ),
+            superseded AS (
+                UPDATE {table} SET superseded_by_id = %(version_id)s
+                WHERE id IN (
+                    SELECT current_id FROM changed
+                    WHERE current_version <> %(version_id)s
+                )
+            ),
+            upserted AS (
+                INSERT INTO {table}
+                    (version_id, region_id, indicator_id, year, value, updated_at)
+                SELECT %(version_id)s, region_id, indicator_id, year, value, now()
+                FROM changed
+                ON CONFLICT (version_id, region_id, indicator_id, year) DO UPDATE
+                    SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+            )
+            SELECT
+                (SELECT count(*) FROM src),
+                count(*) FILTER (WHERE current_id IS NULL),
+                count(*) FILTER (WHERE current_id IS NOT NULL)
+            FROM changed
+            """,
+            {"version_id": version_id},
+        )
+        total, created, updated = cursor.fetchone()
+
+        # 外側のトランザクション内で複数回呼ばれても衝突しないよう明示的に削除
+        cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+
+    return UpsertResult(
+        created=created,
+        updated=updated,
+        unchanged=total - created - updated,
+    )
+
+
+def load_climate_data(
+    records: Iterable[ClimateRecord], *, version_id: int, loader: str = "auto"
+) -> UpsertResult:
+    """
+    指定されたローダーで ClimateData を version_id のバージョンに一括 upsert する。
+
+    version_id のバージョンには変更のあった行だけが書き込まれる。
+
+    copy が使えない DB（SQLite など）では自動的に orm にフォールバックする。
+    """
+    if loader not in LOADER_CHOICES:
+        raise ValueError(f"Unknown loader: {loader}")
+
+    if loader != "orm" and supports_copy():
+        return copy_upsert_climate_data(records, version_id=version_id)
+
+    return upsert_climate_data(records, version_id=version_id)
@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 
 def parse_float(value_raw) -> Optional[float]:
@@ -32,3 +34,91 @@ def parse_year(value_raw) -> Optional[int]:
         return None
 
     return year
+
+
+# =========================
+# バッチ（カラム単位）版
+# =========================
+
+
+INT64_MIN = int(np.iinfo(np.int64).min)
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+
+def _to_object_array(values: Sequence) -> np.ndarray:
+    # np.asarray だと list / dict 要素が次元として展開されるため fromiter を使う
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _cast_strings(
+    raw: np.ndarray, dtype, missing_fill: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    object 配列を前後空白を除いた文字列配列にし、dtype へ一括変換する。
+
+    None / 空文字の位置は missing_fill に置き換えてから変換し、
+    (変換結果, 欠損マスク) を返す。
+    変換できない要素が 1 つでもあれば ValueError / OverflowError を送出する。
+    """
+    strings = np.char.strip(raw.astype(str))
+    missing = np.equal(raw, None) | (strings == "")
+    strings[missing] = missing_fill
+    return strings.astype(dtype), missing
+
+
+def parse_str_array(values: Sequence) -> np.ndarray:
+    """
+    カラム 1 チャンク分を前後空白を除いた文字列の配列（object）に変換する（None → 空文字）
+    """
+    raw = _to_object_array(values)
+    raw[np.equal(raw, None)] = ""
+    return np.char.strip(raw.astype(str)).astype(object)
+
+
+def parse_float_array(values: Sequence) -> tuple[np.ndarray, np.ndarray]:
+    """
+    parse_float のバッチ版。カラム 1 チャンク分をまとめて float64 配列に変換する。
+
+    戻り値は (値の配列, 有効マスク)。無効な位置の値は NaN。
+    判定ルールは parse_float と同じ（None / 空文字 / 不正文字列 / NaN → 無効）。
+    通常はチャンク全体を 1 回の astype で変換し、
+    不正な値を含むチャンクだけ要素ごとの parse_float にフォールバックする。
+    """
+    raw = _to_object_array(values)
+
+    try:
+        result, _ = _cast_strings(raw, np.float64, "nan")
+    except (ValueError, OverflowError):
+        result = np.array(
+            [np.nan if (value := parse_float(v)) is None else value for v in raw],
+            dtype=np.float64,
+        )
+
+    return result, ~np.isnan(result)
+
+
+def parse_year_array(values: Sequence) -> tuple[np.ndarray, np.ndarray]:
+    """
+    parse_year のバッチ版。カラム 1 チャンク分をまとめて int64 配列に変換する。
+
+    戻り値は (値の配列, 有効マスク)。無効な位置の値は 0。
+    判定ルールは parse_year と同じ（None / 空文字 / 不正文字列 → 無効）。
+    ただし int64 に収まらない値は、例外にせず無効とする。
+    """
+    raw = _to_object_array(values)
+
+    try:
+        result, missing = _cast_strings(raw, np.int64, "0")
+    except (ValueError, OverflowError):
+        parsed = [parse_year(v) for v in raw]
+        valid = np.array(
+            [year is not None and INT64_MIN <= year <= INT64_MAX for year in parsed],
+            dtype=bool,
+        )
+        result = np.array(
+            [year if is_valid else 0 for year, is_valid in zip(parsed, valid)],
+            dtype=np.int64,
+        )
+        return result, valid
+
+    return result, ~missing
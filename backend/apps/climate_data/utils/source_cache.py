@@ -0,0 +1,187 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import unquote, urlparse
+
+import requests
+from django.conf import settings
+
+from apps.climate_data.utils.fetch_helpers import (
+    CHUNK_SIZE,
+    REQUEST_TIMEOUT,
+    iter_decoded_lines,
+)
+
+
+@dataclass
+class SourceMeta:
+    """
+    キャッシュ済みソースのメタデータ（<key>.json に保存）
+    """
+
+    url: str
+    etag: str = ""
+    last_modified: str = ""
+    # 本文（展開後の CSV バイト列）の SHA-256
+    sha256: str = ""
+    # 最後にインポートが成功したときの sha256
+    imported_sha256: str = ""
+
+
+@dataclass
+class CachedSource:
+    """
+    ディスクキャッシュ上の CSV ソース。
+
+    本文は gzip 圧縮して保存され、rows() でストリーミングに読み出す。
+    """
+
+    meta: SourceMeta
+    body_path: Path
+    meta_path: Path
+    # 条件付きリクエストに 304 が返り、キャッシュを再利用したか
+    not_modified: bool = False
+
+    @property
+    def sha256(self) -> str:
+        return self.meta.sha256
+
+    @property
+    def is_imported(self) -> bool:
+        """
+        前回インポート成功時と内容が同一か
+        """
+        return bool(self.meta.sha256) and self.meta.sha256 == self.meta.imported_sha256
+
+    def rows(self) -> Iterator[dict[str, str]]:
+        """
+        キャッシュされた CSV を 1 行ずつ辞書として返す（何度でも読み直せる）
+        """
+        with gzip.open(self.body_path, "rb") as f:
+            chunks = iter(lambda: f.read(CHUNK_SIZE), b"")
+            yield from csv.DictReader(iter_decoded_lines(chunks))
+
+    def mark_imported(self) -> None:
+        """
+        インポート成功を記録する。次回同じ内容なら取り込みをスキップできる。
+        """
+        self.meta.imported_sha256 = self.meta.sha256
+        _write_meta(self.meta_path, self.meta)
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def _write_meta(path: Path, meta: SourceMeta) -> None:
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(asdict(meta)), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _read_meta(path: Path, url: str) -> SourceMeta | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if data.get("url") != url:
+        return None
+
+    return SourceMeta(**data)
+
+
+def _local_path(url: str) -> Path | None:
+    """
+    ローカルファイル（file:// またはスキームなしのパス）ならそのパスを返す
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return Path(unquote(parsed.path))
+    if parsed.scheme == "":
+        return Path(url)
+    return None
+
+
+def _save_body(chunks: Iterable[bytes], body_path: Path) -> str:
+    """
+    本文を gzip 圧縮しつつ保存し、展開後の SHA-256 を返す
+    """
+    digest = hashlib.sha256()
+    tmp_path = body_path.with_suffix(".gz.tmp")
+    with gzip.open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            digest.update(chunk)
+            f.write(chunk)
+
+    os.replace(tmp_path, body_path)
+    return digest.hexdigest()
+
+
+def fetch_source(url: str, *, cache_dir: Path | None = None) -> CachedSource:
+    """
+    URL の CSV を条件付きリクエストで取得し、ディスクキャッシュ経由で返す。
+
+    - 前回の ETag / Last-Modified を If-None-Match / If-Modified-Since として送る
+    - 304 の場合はダウンロードせずキャッシュを返す
+    - 200 の場合は本文をストリーミングで gzip 圧縮しつつ SHA-256 を計算して保存する
+    - ローカルファイル（合成データなど）の場合はネットワークを使わずに読み込む
+    """
+    cache_dir = Path(cache_dir or settings.CLIMATE_SOURCE_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    key = _cache_key(url)
+    body_path = cache_dir / f"{key}.csv.gz"
+    meta_path = cache_dir / f"{key}.json"
+
+    meta = _read_meta(meta_path, url) if body_path.exists() else None
+
+    local_path = _local_path(url)
+    if local_path is not None:
+        with local_path.open("rb") as f:
+            sha256 = _save_body(iter(lambda: f.read(CHUNK_SIZE), b""), body_path)
+
+        new_meta = SourceMeta(
+            url=url,
+            sha256=sha256,
+            imported_sha256=meta.imported_sha256 if meta is not None else "",
+        )
+        _write_meta(meta_path, new_meta)
+
+        not_modified = meta is not None and meta.sha256 == sha256
+        return CachedSource(new_meta, body_path, meta_path, not_modified=not_modified)
+
+    headers = {}
+    if meta is not None:
+        if meta.etag:
+            headers["If-None-Match"] = meta.etag
+        if meta.last_modified:
+            headers["If-Modified-Since"] = meta.last_modified
+
+    with requests.get(
+        url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT
+    ) as response:
+        if meta is not None and response.status_code == 304:
+            return CachedSource(meta, body_path, meta_path, not_modified=True)
+
+        response.raise_for_status()
+
+        sha256 = _save_body(response.iter_content(chunk_size=CHUNK_SIZE), body_path)
+
+        new_meta = SourceMeta(
+            url=url,
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+            sha256=sha256,
+            # 取り込み済みの記録は内容が変わっても引き継ぐ（比較に使うため）
+            imported_sha256=meta.imported_sha256 if meta is not None else "",
+        )
+
+    _write_meta(meta_path, new_meta)
+
+    return CachedSource(new_meta, body_path, meta_path)
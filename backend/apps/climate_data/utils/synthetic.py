@@ -0,0 +1,103 @@
+import csv
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+# 乱数を生成する地域数の単位。
+# 系列ごとの乱数列はこの単位で順に生成するため、出力先（DB / CSV）によらず同じ値になる
+REGION_CHUNK_SIZE = 1000
+
+# 値の小数点以下の桁数（CSV に書き出した値を読み戻しても DB と一致させるため）
+VALUE_DECIMALS = 4
+
+# 最初の年（OWID の CO2 データと同じく 1750 年から。generate_synthetic_climate の既定値）
+DEFAULT_START_YEAR = 1750
+
+
+class SyntheticSpec(NamedTuple):
+    """
+    合成データの規模と乱数シード
+    """
+
+    regions: int
+    years: int
+    start_year: int = DEFAULT_START_YEAR
+    seed: int = 0
+    # 値を欠損させる割合（OWID の空セルを模す）
+    missing_rate: float = 0.0
+
+    @property
+    def year_range(self) -> range:
+        return range(self.start_year, self.start_year + self.years)
+
+
+def synthetic_regions(count: int) -> dict[str, str]:
+    """
+    地域コード → 地域名 を返す（例: "SYN00001" → "Synthetic Region 1"）
+    """
+    return {f"SYN{i:05}": f"Synthetic Region {i}" for i in range(1, count + 1)}
+
+
+def iter_synthetic_values(
+    spec: SyntheticSpec, series: int
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    series 番目の系列の値を地域チャンクごとに返す。
+
+    (先頭の地域インデックス, 値の行列 [地域, 年], 有効な値のマスク) を yield する。
+    値は地域ごとの基準値にランダムウォークを足したもので、
+    (seed, series) が同じなら常に同じ値になる。
+    """
+    rng = np.random.default_rng([spec.seed, series])
+
+    for start in range(0, spec.regions, REGION_CHUNK_SIZE):
+        size = min(REGION_CHUNK_SIZE, spec.regions - start)
+
+        base = rng.uniform(0, 100, size=(size, 1))
+        steps = rng.normal(0, 1, size=(size, spec.years))
+        values = np.round(base + np.cumsum(steps, axis=1), VALUE_DECIMALS)
+        valid = rng.random(size=(size, spec.years)) >= spec.missing_rate
+
+        yield start, values, valid
+
+
+def _cells(values: np.ndarray, valid: np.ndarray) -> list[list]:
+    """
+    値の行列を CSV のセル（欠損は空文字）のリストに変換する。
+
+    ndarray.astype(str) は遅いため、Python の float のまま csv に渡す。
+    """
+    return [
+        [value if is_valid else "" for value, is_valid in zip(value_row, valid_row)]
+        for value_row, valid_row in zip(values.tolist(), valid.tolist())
+    ]
+
+
+def write_owid_csv(path: Path, spec: SyntheticSpec, column_keys: list[str]) -> int:
+    """
+    OWID 形式（Entity, Code, Year, <カラム>...）の CSV を書き出し、行数を返す。
+
+    column_keys の i 番目のカラムには i 番目の系列の値が入る。
+    """
+    regions = list(synthetic_regions(spec.regions).items())
+    years = list(spec.year_range)
+    rows = 0
+
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Entity", "Code", "Year", *column_keys])
+
+        chunks = zip(*(iter_synthetic_values(spec, i) for i in range(len(column_keys))))
+        for series_chunks in chunks:
+            start = series_chunks[0][0]
+            columns = [_cells(values, valid) for _, values, valid in series_chunks]
+
+            for offset, cells in enumerate(zip(*columns)):
+                code, name = regions[start + offset]
+                writer.writerows(
+                    [name, code, year, *values] for year, *values in zip(years, *cells)
+                )
+                rows += len(years)
+
+    return rows
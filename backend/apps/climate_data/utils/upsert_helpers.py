@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple
+
+from django.db import transaction
+
+from apps.climate_data.models import ClimateData
+
+# 1 バッチあたりの件数。
+# SQLite / PostgreSQL のバインド変数上限に余裕を持たせた値。
+DEFAULT_BATCH_SIZE = 2000
+
+
+class ClimateRecord(NamedTuple):
+    """
+    upsert 対象の 1 レコード。
+
+    モデルインスタンスではなく ID だけを持つ軽量なタプル。
+    """
+
+    region_id: int
+    indicator_id: int
+    year: int
+    value: float
+
+
+@dataclass
+class UpsertResult:
+    """
+    upsert の集計結果
+    """
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(
+            created=self.created + other.created,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+        )
+
+    @property
+    def written(self) -> int:
+        return self.created + self.updated
+
+
+def iter_batches(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    iterable を size 件ずつのリストに分割して返す
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _upsert_batch(batch: list[ClimateRecord], version_id: int) -> UpsertResult:
+    # 同一キーがバッチ内に複数ある場合は後勝ち
+    # （ON CONFLICT DO UPDATE は 1 文の中で同じ行を 2 回更新できないため）
+    records = {(r.region_id, r.indicator_id, r.year): r.value for r in batch}
+
+    # このバージョンから見えている現在の行をまとめて取得し、新規 / 更新 / 変更なし を判定する
+    current = {
+        (region_id, indicator_id, year): (pk, row_version_id, value)
+        for pk, row_version_id, region_id, indicator_id, year, value in (
+            ClimateData.objects.in_version(version_id)
+            .filter(
+                region_id__in={key[0] for key in records},
+                indicator_id__in={key[1] for key in records},
+                year__in={key[2] for key in records},
+            )
+            .values_list(
+                "pk", "version_id", "region_id", "indicator_id", "year", "value"
+            )
+        )
+    }
+
+    result = UpsertResult()
+    to_write: list[ClimateData] = []
+    superseded: list[int] = []
+
+    for (region_id, indicator_id, year), value in records.items():
+        row = current.get((region_id, indicator_id, year))
+        if row is None:
+            result.created += 1
+        elif row[2] != value:
+            result.updated += 1
+            # 以前のバージョンの行は書き換えず、このバージョンの行で置き換える
+            if row[1] != version_id:
+                superseded.append(row[0])
+        else:
+            result.unchanged += 1
+            continue
+
+        to_write.append(
+            ClimateData(
+                version_id=version_id,
+                region_id=region_id,
+                indicator_id=indicator_id,
+                year=year,
+                value=value,
+            )
+        )
+
+    if superseded:
+        ClimateData.objects.filter(pk__in=superseded).update(
+            superseded_by_id=version_id
+        )
+
+    if to_write:
+        # INSERT ... ON CONFLICT (version, region, indicator, year) DO UPDATE
+        ClimateData.objects.bulk_create(
+            to_write,
+            update_conflicts=True,
+            unique_fields=["version", "region", "indicator", "year"],
+            update_fields=["value", "updated_at"],
+        )
+
+    return result
+
+
+def upsert_climate_data(
+    records: Iterable[ClimateRecord],
+    *,
+    version_id: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> UpsertResult:
+    """
+    ClimateData を (region, indicator, year) をキーに version_id のバージョンへ一括 upsert する。
+
+    - records は iterable のまま batch_size 件ずつ処理する（全件をメモリに載せない）
+    - 値が変わらない行は書き込まない（updated_at も更新されない）
+    - 以前のバージョンの行は書き換えず、新しい行を書き込んで置き換え済みにする
+      （書き込み件数は変更のあった行数に比例する）
+    - PostgreSQL / SQLite では INSERT ... ON CONFLICT DO UPDATE が発行される
+    """
+    result = UpsertResult()
+
+    with transaction.atomic():
+        for batch in iter_batches(records, batch_size):
+            result += _upsert_batch(batch, version_id)
+
+    return result
@@ -213,6 +213,36 @@ WSGI_APPLICATION = "config.wsgi.application"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 DATABASES = {"default": env.dj_db_url("DATABASE_URL", default="sqlite:///db.sqlite3")}
 
+# ================================
+# Cache
+# ================================
+# 共有キャッシュ（utils.cache.TieredCache の L2）。
+# 本番は CACHE_URL（例: redis://...）、開発環境はファイル、それ以外はプロセス内メモリ
+# NOTE: CACHE_URL が未指定の本番（プロセス内メモリ）では、TieredCache の計算のロック・
+# 無効化（invalidate）・公開時のスタンプ更新はワーカーごとにしか効かない。
+# 複数のワーカー / インスタンスで動かす場合は CACHE_URL を必ず指定すること
+CACHES = {
+    "default": env.dj_cache_url(
+        "CACHE_URL",
+        default=(
+            f"file://{BASE_DIR / '.cache' / 'django'}"
+            if IS_DEVELOPMENT
+            else "locmem://"
+        ),
+    )
+}
+# プロセス内 LRU キャッシュ（L1）の既定の保持秒数と件数。
+# 別プロセスでの更新（公開・無効化）は最大でこの秒数だけ遅れて反映される
+CACHE_L1_TIMEOUT = env.int("CACHE_L1_TIMEOUT", default=5)
+CACHE_L1_MAX_ENTRIES = env.int("CACHE_L1_MAX_ENTRIES", default=256)
+# 保持秒数を過ぎた値を、裏で再計算している間に返してよい秒数（stale-while-revalidate）
+CACHE_STALE_TIMEOUT = env.int("CACHE_STALE_TIMEOUT", default=300)
+# キャッシュにない値を 1 つのプロセスだけが計算するためのロックの秒数。
+# 他のプロセスはこの秒数まで結果を待ち、それでも保存されなければ自分で計算する
+CACHE_LOCK_TIMEOUT = env.int("CACHE_LOCK_TIMEOUT", default=30)
+# 名前空間ごとの L2 の保持秒数の上書き（例: CACHE_TTLS=climate-indicator=600）
+CACHE_TTLS = env.dict("CACHE_TTLS", subcast_values=int, default={})
+
 # ================================
 # 認証ユーザモデル
 # ================================
@@ -270,6 +300,21 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # ================================
 # App-specific settings
 # ================================
+# OWID などから取得した CSV のディスクキャッシュ（条件付きリクエスト用）
+CLIMATE_SOURCE_CACHE_DIR = env.path(
+    "CLIMATE_SOURCE_CACHE_DIR", default=BASE_DIR / ".cache" / "sources"
+)
+# 公開中バージョンのスナップショット（gunicorn のワーカー間で mmap して共有する）
+CLIMATE_SNAPSHOT_DIR = env.path(
+    "CLIMATE_SNAPSHOT_DIR", default=BASE_DIR / ".cache" / "snapshots"
+)
+# 公開終了した DatasetVersion を削除するまでの猶予期間
+CLIMATE_VERSION_GRACE_PERIOD = timedelta(
+    hours=env.int("CLIMATE_VERSION_GRACE_HOURS", default=24)
+)
+# 公開中バージョンの ID（レスポンスキャッシュのキー）をキャッシュする秒数。
+# 公開時には即座に更新される（別プロセスには CACHE_L1_TIMEOUT 以内に反映）
+CLIMATE_RESPONSE_STAMP_TTL = env.int("CLIMATE_RESPONSE_STAMP_TTL", default=60)
 
 # ================================
 # 警告無視設定（古い allauth 設定による UserWarning を無視）
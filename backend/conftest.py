@@ -0,0 +1,31 @@
+import pytest
+from django.core.cache import cache
+
+from utils.cache import clear_local_caches
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(settings, tmp_path):
+    """
+    気候データのスナップショットをテストごとの一時ディレクトリに書き出す
+    """
+    settings.CLIMATE_SNAPSHOT_DIR = tmp_path / "snapshots"
+    return settings.CLIMATE_SNAPSHOT_DIR
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    キャッシュ（共有キャッシュ / プロセス内の L1 / 気候データのストア）が
+    テスト間で共有されないようにする
+    """
+    from apps.climate_data.store import climate_store
+
+    def clear():
+        cache.clear()
+        clear_local_caches()
+        climate_store.clear()
+
+    clear()
+    yield
+    clear()
@@ -11,6 +11,10 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+echo "Building climate data snapshots..."
+# 公開中バージョンを mmap 用のファイルに書き出しておき、ワーカーは起動直後から共有して読む
+python manage.py build_climate_snapshot
+
 echo "Starting Gunicorn on port $PORT..."
 # 0.0.0.0 でバインド、ワーカー数は必要に応じて調整
 exec gunicorn config.wsgi:application \
@@ -0,0 +1,471 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Iterable, NamedTuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# キャッシュに無いことを表す値（None もキャッシュできるようにするため）
+MISSING = object()
+
+# 他のプロセスの計算結果を待つときに共有キャッシュを確認する間隔（秒）
+LOCK_POLL_INTERVAL = 0.05
+
+
+class CacheEntry(NamedTuple):
+    """
+    キャッシュに保存する値と、その値が新しいとみなせる期限（time.time()。None は無期限）
+    """
+
+    value: Any
+    fresh_until: float | None
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.fresh_until is None or time.time() < self.fresh_until
+
+
+class _Flight:
+    """
+    プロセス内で実行中の計算。同じキーを要求したスレッドは完了を待って結果を受け取る
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def start_background(target: Callable[[], None]) -> None:
+    """
+    target を別スレッドで実行する（stale-while-revalidate の再計算用）。
+
+    スレッドで開いた DB 接続は終了時に閉じる。
+    """
+
+    def run():
+        try:
+            target()
+        except Exception:
+            logger.exception("Background cache refresh failed")
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+class LocalLRUCache:
+    """
+    プロセス内の LRU キャッシュ（TieredCache の L1）。
+
+    件数の上限を超えると、最も長く参照されていないものから捨てる。
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        if timeout <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache:
+    """
+    名前空間ごとの 2 段キャッシュ。
+
+    - L1: プロセス内の LRU（LocalLRUCache）。短時間だけ保持する
+    - L2: settings.CACHES の共有キャッシュ（ローカルはファイル、本番は CACHE_URL）
+
+    キーには名前空間のバージョンを含め、invalidate() でバージョンを上げると
+    名前空間のすべてのキーが参照されなくなる（L2 は期限切れで消える）。
+    別プロセスの L1 には、最大で L1 の保持秒数だけ古い値が残る。
+
+    L2 の保持秒数は settings.CACHE_TTLS[名前空間] で上書きできる。
+
+    get_or_set() は
+    - 同じキーの計算をプロセス内で 1 回、プロセス間でも共有キャッシュのロックで 1 回に絞り、
+      待っている側には計算結果を返す（single-flight）
+    - 保持秒数を過ぎても stale_timeout の間は古い値を返し、裏で再計算する
+      （stale-while-revalidate）
+    """
+
+    # 作成された名前空間の一覧（統計の表示やテストでの L1 のクリア用）
+    registry: dict[str, "TieredCache"] = {}
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        timeout: float | None = None,
+        l1_timeout: float | None = None,
+        l1_max_entries: int | None = None,
+        stale_timeout: float | None = None,
+        alias: str = "default",
+    ):
+        self.namespace = namespace
+        self._timeout = timeout
+        self._l1_timeout = l1_timeout
+        self._stale_timeout = stale_timeout
+        self.alias = alias
+        self.local = LocalLRUCache(
+            settings.CACHE_L1_MAX_ENTRIES if l1_max_entries is None else l1_max_entries
+        )
+        # L1 ヒット / L2 ヒット / ミスの回数（プロセスごと）
+        self.counters: Counter[str] = Counter()
+        # 実行中の計算（キー → _Flight）と、裏で再計算中のキー
+        self._flights: dict[str, _Flight] = {}
+        self._refreshing: set[str] = set()
+        self._flights_lock = threading.Lock()
+        self.registry[namespace] = self
+
+    # ===============================
+    # 🔹 設定
+    # ===============================
+    @property
+    def timeout(self) -> float | None:
+        """
+        L2 の保持秒数（None は期限なし）
+        """
+        ttls = getattr(settings, "CACHE_TTLS", {})
+        if self.namespace in ttls:
+            return ttls[self.namespace]
+        return self._timeout
+
+    @property
+    def l1_timeout(self) -> float:
+        if self._l1_timeout is not None:
+            return self._l1_timeout
+        return settings.CACHE_L1_TIMEOUT
+
+    @property
+    def stale_timeout(self) -> float:
+        """
+        保持秒数を過ぎた値を、再計算中に返してよい秒数
+        """
+        if self._stale_timeout is not None:
+            return self._stale_timeout
+        return settings.CACHE_STALE_TIMEOUT
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # ===============================
+    # 🔹 キー
+    # ===============================
+    def _version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    def _version(self) -> int:
+        """
+        名前空間の現在のバージョン（L2 に保存し、L1 にも短時間保持する）
+        """
+        key = self._version_key()
+        version = self.local.get(key)
+        if version is MISSING:
+            version = self.shared.get(key)
+            if version is None:
+                # 未保存（または追い出された）ときは、以前のどの値とも重ならない値にする
+                # （1 から数え直すと、無効化前に同じ番号で保存した値が再び見えてしまう）
+                seed = time.time_ns()
+                self.shared.add(key, seed, None)
+                version = self.shared.get(key, seed)
+            self.local.set(key, version, settings.CACHE_L1_TIMEOUT)
+        return version
+
+    def make_key(self, key: str) -> str:
+        # memcached でも使えるよう、空白や ASCII 以外の文字はエスケープする
+        return quote(f"{self.namespace}:v{self._version()}:{key}", safe=":-_.")
+
+    def _l1_timeout_for(self, timeout: float | None) -> float:
+        if timeout is None:
+            return self.l1_timeout
+        return min(self.l1_timeout, timeout)
+
+    # ===============================
+    # 🔹 読み書き
+    # ===============================
+    def get(self, key: str, default: Any = None) -> Any:
+        values = self.get_many([key])
+        return values.get(key, default)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        キャッシュにある（保持秒数内の）ものだけを キー → 値 の辞書で返す
+        """
+        return {
+            key: entry.value
+            for key, entry in self._get_entries(keys).items()
+            if entry.is_fresh
+        }
+
+    def _get_entries(self, keys: Iterable[str]) -> dict[str, CacheEntry]:
+        """
+        キー → CacheEntry（保持秒数を過ぎたものも含む）を返す。
+
+        L1 で見つからなかったものは L2 からまとめて取得し、L1 に入れる。
+        """
+        full_keys = {self.make_key(key): key for key in keys}
+        found: dict[str, CacheEntry] = {}
+        remaining: list[str] = []
+
+        for full_key, key in full_keys.items():
+            entry = self.local.get(full_key)
+            if entry is MISSING:
+                remaining.append(full_key)
+            else:
+                found[key] = entry
+                self.counters["l1_hits"] += 1
+
+        if remaining:
+            shared_entries = self.shared.get_many(remaining)
+            for full_key in remaining:
+                if full_key in shared_entries:
+                    entry = shared_entries[full_key]
+                    self.local.set(full_key, entry, self.l1_timeout)
+                    found[full_keys[full_key]] = entry
+                    self.counters["l2_hits"] += 1
+                else:
+                    self.counters["misses"] += 1
+
+        return found
+
+    def set(self, key: str, value: Any, timeout: float | None = MISSING) -> None:
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, mapping: dict[str, Any], timeout: float | None = MISSING):
+        """
+        L2 と L1 に書き込む。timeout を省略した場合は名前空間の保持秒数。
+
+        L2 には保持秒数 + stale_timeout の間残し、その間は get_or_set() が古い値を返せる
+        """
+        if timeout is MISSING:
+            timeout = self.timeout
+
+        if timeout is None:
+            fresh_until, shared_timeout = None, None
+        else:
+            fresh_until = time.time() + timeout
+            shared_timeout = timeout + self.stale_timeout
+
+        entries = {
+            self.make_key(key): CacheEntry(value, fresh_until)
+            for key, value in mapping.items()
+        }
+        self.shared.set_many(entries, shared_timeout)
+
+        l1_timeout = self._l1_timeout_for(timeout)
+        for full_key, entry in entries.items():
+            self.local.set(full_key, entry, l1_timeout)
+
+    def get_or_set(
+        self, key: str, compute: Callable[[], Any], timeout: float | None = MISSING
+    ) -> Any:
+        """
+        キャッシュにあればその値を、なければ compute() の結果を保存して返す。
+
+        - 同時に同じキーを要求した場合、compute() を実行するのは 1 つだけ（single-flight）
+        - 保持秒数を過ぎた値は stale_timeout の間そのまま返し、裏で再計算する
+        """
+        entry = self._get_entries([key]).get(key)
+        if entry is not None:
+            if not entry.is_fresh:
+                self._refresh_in_background(key, compute, timeout)
+            return entry.value
+
+        return self._compute_once(key, compute, timeout)
+
+    # ===============================
+    # 🔹 single-flight / stale-while-revalidate
+    # ===============================
+    def _lock_key(self, key: str) -> str:
+        return self.make_key(f"{key}:lock")
+
+    def _fresh_value(self, key: str) -> Any:
+        entry = self._get_entries([key]).get(key)
+        if entry is None or not entry.is_fresh:
+            return MISSING
+        return entry.value
+
+    def _compute_once(
+        self, key: str, compute: Callable[[], Any], timeout: float | None
+    ) -> Any:
+        """
+        プロセス内で同じキーの計算が実行中なら、その完了を待って結果を返す
+        """
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self.counters["coalesced"] += 1
+            return flight.wait()
+
+        try:
+            flight.value = self._compute_with_lock(key, compute, timeout)
+            return flight.value
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _compute_with_lock(
+        self, key: str, compute: Callable[[], Any], timeout: float | None
+    ) -> Any:
+        """
+        共有キャッシュのロックを取れたプロセスだけが計算する。
+
+        取れなかった場合は、他のプロセスの結果が保存されるのを待って返す。
+        settings.CACHE_LOCK_TIMEOUT 秒待っても保存されない場合
+        （計算中のプロセスが落ちたなど）は自分で計算する。
+        """
+        lock_key = self._lock_key(key)
+        lock_timeout = settings.CACHE_LOCK_TIMEOUT
+        deadline = time.monotonic() + lock_timeout
+
+        locked = self.shared.add(lock_key, 1, lock_timeout)
+        while not locked and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = self._fresh_value(key)
+            if value is not MISSING:
+                self.counters["coalesced"] += 1
+                return value
+            # ロックが解放された（計算が失敗した）場合は自分で計算する
+            locked = self.shared.add(lock_key, 1, lock_timeout)
+
+        try:
+            value = compute()
+            self.set(key, value, timeout)
+            return value
+        finally:
+            if locked:
+                self.shared.delete(lock_key)
+
+    def _refresh_in_background(
+        self, key: str, compute: Callable[[], Any], timeout: float | None
+    ) -> None:
+        """
+        古い値を返している間に、裏で 1 回だけ再計算する
+        （別プロセスが再計算中でロックが取れない場合は何もしない）
+        """
+        with self._flights_lock:
+            if key in self._refreshing or key in self._flights:
+                return
+            self._refreshing.add(key)
+
+        self.counters["stale_hits"] += 1
+
+        def refresh():
+            lock_key = self._lock_key(key)
+            try:
+                if self.shared.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT):
+                    try:
+                        self.set(key, compute(), timeout)
+                    finally:
+                        self.shared.delete(lock_key)
+            finally:
+                with self._flights_lock:
+                    self._refreshing.discard(key)
+
+        start_background(refresh)
+
+    def delete(self, key: str) -> None:
+        full_key = self.make_key(key)
+        self.shared.delete(full_key)
+        self.local.delete(full_key)
+
+    def invalidate(self) -> None:
+        """
+        名前空間のバージョンを上げ、すべてのキーを無効にする
+        """
+        key = self._version_key()
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            # バージョンが未保存（または期限切れ）。以前のどの値とも重ならない値にする
+            self.shared.set(key, time.time_ns(), None)
+        self.local.clear()
+
+    # ===============================
+    # 🔹 統計
+    # ===============================
+    def stats(self) -> dict[str, int]:
+        return {
+            "l1_hits": self.counters["l1_hits"],
+            "l2_hits": self.counters["l2_hits"],
+            "misses": self.counters["misses"],
+            # 古い値を返して裏で再計算した回数
+            "stale_hits": self.counters["stale_hits"],
+            # 他のリクエストの計算結果を待って受け取った回数
+            "coalesced": self.counters["coalesced"],
+            "l1_entries": len(self.local),
+        }
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """
+    名前空間ごとのヒット / ミスの回数（このプロセス内）
+    """
+    return {
+        namespace: tiered.stats()
+        for namespace, tiered in sorted(TieredCache.registry.items())
+    }
+
+
+def clear_local_caches() -> None:
+    """
+    すべての名前空間の L1 と統計をクリアする（テストで L2 と一緒に消すため）
+    """
+    for tiered in TieredCache.registry.values():
+        tiered.local.clear()
+        tiered.counters.clear()
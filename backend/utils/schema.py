@@ -18,7 +18,9 @@ def schema(
     summary: str,
     description: str = "",
     tags: list[str] | None = None,
+    request: Any = None,
     responses: Any = None,
+    parameters: list[Any] | None = None,
 ):
     """
     extend_schema を簡略化するための共通ヘルパー
@@ -31,7 +33,13 @@ def schema(
     if tags is not None:
         kwargs["tags"] = tags
 
+    if request is not None:
+        kwargs["request"] = request
+
     if responses is not None:
         kwargs["responses"] = responses
 
+    if parameters is not None:
+        kwargs["parameters"] = parameters
+
     return extend_schema(**kwargs)
@@ -0,0 +1,219 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.cache import cache
+
+from utils.cache import MISSING, LocalLRUCache, TieredCache, cache_stats
+
+
+@pytest.fixture
+def tiered():
+    return TieredCache("test-namespace", timeout=60, l1_timeout=60, l1_max_entries=2)
+
+
+# ===============================
+# 🔹 LocalLRUCache
+# ===============================
+def test_lru_evicts_least_recently_used():
+    lru = LocalLRUCache(max_entries=2)
+    lru.set("a", 1, 60)
+    lru.set("b", 2, 60)
+    lru.get("a")
+    lru.set("c", 3, 60)
+
+    assert lru.get("a") == 1
+    assert lru.get("b") is MISSING
+    assert lru.get("c") == 3
+
+
+def test_lru_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("utils.cache.time.monotonic", lambda: now[0])
+    lru = LocalLRUCache(max_entries=2)
+    lru.set("a", 1, 10)
+
+    now[0] += 11
+
+    assert lru.get("a") is MISSING
+    assert len(lru) == 0
+
+
+# ===============================
+# 🔹 TieredCache
+# ===============================
+def test_l1_hit_after_l2_hit(tiered):
+    tiered.set("key", "value")
+    tiered.local.clear()
+
+    assert tiered.get("key") == "value"
+    assert tiered.get("key") == "value"
+    assert tiered.get("missing") is None
+    assert tiered.stats() == {
+        "l1_hits": 1,
+        "l2_hits": 1,
+        "misses": 1,
+        "stale_hits": 0,
+        "coalesced": 0,
+        "l1_entries": 2,
+    }
+
+
+def test_shared_value_is_visible_to_other_instances(tiered):
+    tiered.set("key", "value")
+    other = TieredCache("test-namespace", timeout=60)
+
+    assert other.get("key") == "value"
+
+
+def test_get_or_set_caches_none(tiered):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert tiered.get_or_set("key", compute) is None
+    assert tiered.get_or_set("key", compute) is None
+    assert len(calls) == 1
+
+
+def test_invalidate_hides_all_keys(tiered):
+    tiered.set_many({"a": 1, "b": 2})
+
+    tiered.invalidate()
+
+    assert tiered.get_many(["a", "b"]) == {}
+
+
+def test_invalidate_after_shared_cache_cleared(tiered):
+    tiered.set("a", 1)
+    cache.clear()
+
+    tiered.invalidate()
+    tiered.set("a", 2)
+
+    assert tiered.get("a") == 2
+
+
+def test_evicted_version_does_not_resurrect_old_values(tiered):
+    tiered.set("a", 1)
+    old_key = tiered.make_key("a")
+    tiered.invalidate()
+    tiered.set("a", 2)
+
+    # バージョンのキーだけが追い出された
+    cache.delete(tiered._version_key())
+    tiered.local.clear()
+
+    assert tiered.make_key("a") != old_key
+    assert tiered.get("a") is None
+
+
+def test_namespace_ttl_can_be_overridden(tiered, settings):
+    settings.CACHE_TTLS = {"test-namespace": 5}
+
+    assert tiered.timeout == 5
+
+
+def test_keys_are_escaped(tiered):
+    tiered.set("CO₂ Emissions", 1)
+
+    assert tiered.make_key("CO₂ Emissions").isascii()
+    assert " " not in tiered.make_key("CO₂ Emissions")
+    assert tiered.get("CO₂ Emissions") == 1
+
+
+def test_cache_stats_lists_namespaces(tiered):
+    assert "test-namespace" in cache_stats()
+
+
+# ===============================
+# 🔹 single-flight
+# ===============================
+def test_concurrent_misses_compute_once(tiered):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(
+            executor.map(lambda _: tiered.get_or_set("key", compute), range(5))
+        )
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert tiered.stats()["coalesced"] == 4
+
+
+def test_waiters_receive_the_error(tiered):
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(tiered.get_or_set, "key", compute)
+        started.wait()
+        waiter = executor.submit(tiered.get_or_set, "key", compute)
+
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_waits_for_other_process_holding_the_lock(tiered):
+    # 別プロセスが計算中（ロックを保持）で、少し後に結果を保存する
+    cache.add(tiered._lock_key("key"), 1, 30)
+    timer = threading.Timer(0.1, lambda: tiered.set("key", "from other process"))
+    timer.start()
+
+    value = tiered.get_or_set("key", lambda: pytest.fail("should not compute"))
+
+    timer.join()
+    assert value == "from other process"
+
+
+def test_computes_when_lock_is_never_released(tiered, settings):
+    settings.CACHE_LOCK_TIMEOUT = 0.1
+    cache.add(tiered._lock_key("key"), 1, 30)
+
+    assert tiered.get_or_set("key", lambda: "value") == "value"
+
+
+# ===============================
+# 🔹 stale-while-revalidate
+# ===============================
+def test_stale_value_is_served_while_refreshing(tiered, monkeypatch):
+    refreshes = []
+    monkeypatch.setattr("utils.cache.start_background", refreshes.append)
+    tiered.set("key", "old", timeout=0.01)
+    time.sleep(0.02)
+
+    assert tiered.get("key") is None
+    assert tiered.get_or_set("key", lambda: "new") == "old"
+
+    # 裏での再計算（ここでは同期的に実行する）
+    assert len(refreshes) == 1
+    refreshes[0]()
+
+    assert tiered.get_or_set("key", lambda: "newer") == "new"
+    assert tiered.stats()["stale_hits"] == 1
+
+
+def test_stale_refresh_runs_once(tiered, monkeypatch):
+    refreshes = []
+    monkeypatch.setattr("utils.cache.start_background", refreshes.append)
+    tiered.set("key", "old", timeout=0.01)
+    time.sleep(0.02)
+
+    tiered.get_or_set("key", lambda: "new")
+    tiered.get_or_set("key", lambda: "new")
+
+    assert len(refreshes) == 1
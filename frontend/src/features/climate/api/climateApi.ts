@@ -1,6 +1,7 @@
 import { apiClient } from "@/features/auth/api/apiClient";
 import {
   TEMPERATURE_ENDPOINT,
+  TEMPERATURE_MAX_POINTS,
   CO2_ENDPOINT,
 } from "@/features/climate/api/constants";
 import type {
@@ -12,7 +13,9 @@ import type {
  * 温度データを取得する関数
  */
 export async function fetchTemperatureData(): Promise<TemperatureData> {
-  const res = await apiClient.get<TemperatureData>(TEMPERATURE_ENDPOINT);
+  const res = await apiClient.get<TemperatureData>(TEMPERATURE_ENDPOINT, {
+    params: { max_points: TEMPERATURE_MAX_POINTS },
+  });
   return res.data;
 }
 
@@ -1,2 +1,5 @@
 export const TEMPERATURE_ENDPOINT = "/climate/temperature/";
 export const CO2_ENDPOINT = "/climate/co2-data/";
+
+// グラフに描く 1 地域あたりの点数の上限（超える分はサーバー側で間引く）
+export const TEMPERATURE_MAX_POINTS = 500;
@@ -4,6 +4,26 @@
  */
 
 export interface paths {
+    "/api/v1/climate/batch/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * 時系列データの一括取得
+         * @description series API と同じ条件（indicator / regions / from / to / year）を requests に最大 50 件まで指定し、id ごとの結果を返します。指標グループが異なる指標も 1 回で取得できます。存在しない指標を指定した条件は errors に id ごとに返します。
+         */
+        post: operations["climate_batch_create"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/climate/co2-data/": {
         parameters: {
             query?: never;
@@ -12,8 +32,16 @@ export interface paths {
             cookie?: never;
         };
         /**
+         * CO2 排出量データ取得
          * @description フロント用 API
          *     /climate/co2-data/
+         *
+         *     ?format=columnar を指定すると years / regions / values（行列）の形で返す。
+         *     Accept（または ?format=msgpack / ?format=arrow）で MessagePack /
+         *     Arrow IPC（year: int16, region: 辞書エンコード文字列, value: float64）でも返す。
+         *     year / year_from / year_to / regions で絞り込める。
+         *     ?stream=true を指定すると JSON をストリーミングで返す（既定の形の JSON のみ）。
+         *     Accept-Encoding に応じて br / gzip で圧縮済みの本文を返す。
          */
         get: operations["climate_co2_data_retrieve"];
         put?: never;
@@ -24,6 +52,26 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/climate/series/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * 時系列データ取得
+         * @description Indicator.id または key（カンマ区切りで複数可、同じ指標グループのもの）を指定し、指標・地域ごとの時系列を years / values の配列で返します。regions（地域コード）/ from / to / year で絞り込めます。
+         */
+        get: operations["climate_series_retrieve"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/climate/temperature/": {
         parameters: {
             query?: never;
@@ -33,7 +81,7 @@ export interface paths {
         };
         /**
          * 気温データ取得
-         * @description 地域・年ごとの気温データを返します。upper, lower, global_average を含みます。
+         * @description 地域・年ごとの気温データを返します。upper, lower, global_average を含みます。year / year_from / year_to / regions（地域コード）で絞り込めます。stream=true の場合は JSON をストリーミングで返します。max_points を指定すると、地域ごとに max_points 点以下に間引いて返します（upper / lower は global_average で選んだ年の値。ストリーミングはしない）。Accept: application/msgpack / application/vnd.apache.arrow.stream でMessagePack / Arrow IPC（列指向）形式でも返します。
          */
         get: operations["climate_temperature_retrieve"];
         put?: never;
@@ -329,6 +377,53 @@ export interface paths {
 export type webhooks = Record<string, never>;
 export interface components {
     schemas: {
+        BatchRequest: {
+            requests: components["schemas"]["BatchSpec"][];
+        };
+        /**
+         * @description バッチ API のレスポンス。
+         *
+         *     - results: id → series API と同じ形の結果
+         *     - errors: id → エラーの内容（存在しない指標など）
+         */
+        BatchResponse: {
+            results: {
+                [key: string]: components["schemas"]["Series"];
+            };
+            errors: {
+                [key: string]: string;
+            };
+        };
+        /**
+         * @description バッチ API の 1 件分の条件（series API のクエリパラメータと同じ）。
+         *
+         *     例: {"id": "world", "indicator": "emissions_total", "regions": ["OWID_WRL"], "from": 2000}
+         *     - id は結果のキー（リクエスト内で一意）
+         *     - regions は地域コードのリスト（カンマ区切りの文字列も可）
+         */
+        BatchSpec: {
+            /** @description 地域（系列）ごとの点数の上限。超える場合は間引いて返す */
+            max_points?: number;
+            /**
+             * @description 間引きの方式。lttb は折れ線の形を保つ代表点、minmax は区間ごとの最小値・最大値（既定: lttb）
+             *
+             *     * `lttb` - lttb
+             *     * `minmax` - minmax
+             */
+            downsample?: components["schemas"]["DownsampleEnum"];
+            /** @description この年のデータだけを返す（from / to とは併用不可） */
+            year?: number;
+            /** @description カンマ区切りの地域コード（例: JPN,USA,OWID_WRL） */
+            regions?: string;
+            /** @description カンマ区切りの Indicator.id または key（例: emissions_total） */
+            indicator: string;
+            /** @description 結果のキー（リクエスト内で一意） */
+            id: string;
+            /** @description この年以降のデータを返す */
+            from?: number;
+            /** @description この年以前のデータを返す */
+            to?: number;
+        };
         /**
          * @description 年ごとの国別CO2排出量を返すSerializer。
          *
@@ -349,6 +444,12 @@ export interface components {
                 };
             };
         };
+        /**
+         * @description * `lttb` - lttb
+         *     * `minmax` - minmax
+         * @enum {string}
+         */
+        DownsampleEnum: "lttb" | "minmax";
         /** @description Serializer for JWT authentication. */
         JWT: {
             access: string;
@@ -413,6 +514,40 @@ export interface components {
         RestAuthDetail: {
             readonly detail: string;
         };
+        /**
+         * @description 汎用の時系列 API のレスポンス。
+         *
+         *     構造例:
+         *     {
+         *         "indicators": [{"id": 3, "key": "emissions_total", "name": "...", "unit": "tonnes"}],
+         *         "series": [
+         *             {"indicator": 3, "region": "JPN", "region_name": "Japan",
+         *              "years": [2000, 2001], "values": [1000.0, 1100.0]}
+         *         ]
+         *     }
+         *     - series は指定した指標の順、同じ指標の中では地域コード順
+         */
+        Series: {
+            indicators: components["schemas"]["SeriesIndicator"][];
+            series: components["schemas"]["SeriesItem"][];
+        };
+        SeriesIndicator: {
+            id: number;
+            key: string | null;
+            name: string;
+            unit: string;
+        };
+        /** @description 1 指標・1 地域分の時系列。years[i] 年の値が values[i] */
+        SeriesItem: {
+            /** @description Indicator.id */
+            indicator: number;
+            /** @description 地域コード */
+            region: string;
+            region_name: string;
+            years: number[];
+            /** Format: double */
+            values: number[];
+        };
         TokenRefresh: {
             readonly access: string;
             refresh: string;
@@ -451,13 +586,50 @@ export interface components {
 }
 export type $defs = Record<string, never>;
 export interface operations {
-    climate_co2_data_retrieve: {
+    climate_batch_create: {
         parameters: {
             query?: never;
             header?: never;
             path?: never;
             cookie?: never;
         };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["BatchRequest"];
+                "application/x-www-form-urlencoded": components["schemas"]["BatchRequest"];
+                "multipart/form-data": components["schemas"]["BatchRequest"];
+            };
+        };
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["BatchResponse"];
+                };
+            };
+        };
+    };
+    climate_co2_data_retrieve: {
+        parameters: {
+            query?: {
+                format?: "arrow" | "columnar" | "json" | "msgpack";
+                /** @description カンマ区切りの地域コード（例: JPN,USA,OWID_WRL） */
+                regions?: string;
+                /** @description true の場合、年順に読み出しながら JSON をストリーミングで返す */
+                stream?: boolean;
+                /** @description この年のデータだけを返す（year_from / year_to とは併用不可） */
+                year?: number;
+                /** @description この年以降のデータを返す */
+                year_from?: number;
+                /** @description この年以前のデータを返す */
+                year_to?: number;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
         requestBody?: never;
         responses: {
             200: {
@@ -466,13 +638,75 @@ export interface operations {
                 };
                 content: {
                     "application/json": components["schemas"]["CO2DataByYear"];
+                    "application/msgpack": components["schemas"]["CO2DataByYear"];
+                    "application/vnd.apache.arrow.stream": components["schemas"]["CO2DataByYear"];
+                };
+            };
+        };
+    };
+    climate_series_retrieve: {
+        parameters: {
+            query: {
+                /**
+                 * @description 間引きの方式。lttb は折れ線の形を保つ代表点、minmax は区間ごとの最小値・最大値（既定: lttb）
+                 *
+                 *     * `lttb` - lttb
+                 *     * `minmax` - minmax
+                 */
+                downsample?: "lttb" | "minmax";
+                /** @description この年以降のデータを返す */
+                from?: number;
+                /** @description カンマ区切りの Indicator.id または key（例: emissions_total） */
+                indicator: string;
+                /** @description 地域（系列）ごとの点数の上限。超える場合は間引いて返す */
+                max_points?: number;
+                /** @description カンマ区切りの地域コード（例: JPN,USA,OWID_WRL） */
+                regions?: string;
+                /** @description この年以前のデータを返す */
+                to?: number;
+                /** @description この年のデータだけを返す（from / to とは併用不可） */
+                year?: number;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["Series"];
                 };
             };
         };
     };
     climate_temperature_retrieve: {
         parameters: {
-            query?: never;
+            query?: {
+                /**
+                 * @description 間引きの方式。lttb は折れ線の形を保つ代表点、minmax は区間ごとの最小値・最大値（既定: lttb）
+                 *
+                 *     * `lttb` - lttb
+                 *     * `minmax` - minmax
+                 */
+                downsample?: "lttb" | "minmax";
+                format?: "arrow" | "json" | "msgpack";
+                /** @description 地域（系列）ごとの点数の上限。超える場合は間引いて返す */
+                max_points?: number;
+                /** @description カンマ区切りの地域コード（例: JPN,USA,OWID_WRL） */
+                regions?: string;
+                /** @description true の場合、年順に読み出しながら JSON をストリーミングで返す */
+                stream?: boolean;
+                /** @description この年のデータだけを返す（year_from / year_to とは併用不可） */
+                year?: number;
+                /** @description この年以降のデータを返す */
+                year_from?: number;
+                /** @description この年以前のデータを返す */
+                year_to?: number;
+            };
             header?: never;
             path?: never;
             cookie?: never;
@@ -495,6 +729,28 @@ export interface operations {
                             global_average?: number | null;
                         }[];
                     };
+                    "application/msgpack": {
+                        [key: string]: {
+                            year?: number;
+                            /** Format: double */
+                            upper?: number | null;
+                            /** Format: double */
+                            lower?: number | null;
+                            /** Format: double */
+                            global_average?: number | null;
+                        }[];
+                    };
+                    "application/vnd.apache.arrow.stream": {
+                        [key: string]: {
+                            year?: number;
+                            /** Format: double */
+                            upper?: number | null;
+                            /** Format: double */
+                            lower?: number | null;
+                            /** Format: double */
+                            global_average?: number | null;
+                        }[];
+                    };
                 };
             };
         };